@@ -0,0 +1,124 @@
+# alert_benchmark.py - 합성 신호 알림 수천 건을 알림 경로로 보내 발송 처리량/지연/유실 측정 (오프라인)
+#
+# 실행: python3 alert_benchmark.py --count 5000 --latency-ms 80 --fail-rate 0.01
+#       python3 alert_benchmark.py --count 300 --sync          (동기 발송 경로와 비교)
+#       python3 alert_benchmark.py --url http://127.0.0.1:8080/api/webhooks/1/stub   (별도 실행한 대체 서버)
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from api.discord_webhook import DiscordWebhook
+from discord_stub_server import StubWebhookServer
+
+def synthetic_alert(index):
+    """전체 시장 급등 상황을 흉내 낸 (티커, 분석 데이터)"""
+    price = random.uniform(10, 100000)
+    coin_data = {
+        'market': f"KRW-SYN{index:05d}",
+        'trade_price': price,
+        'signed_change_rate': random.uniform(0.0, 0.2),
+        'acc_trade_price_24h': random.uniform(1e8, 1e11),
+        'acc_trade_volume_24h': random.uniform(1e3, 1e7),
+    }
+    analysis_data = {
+        'current_price': price,
+        'rsi': random.uniform(45, 80),
+        'ma25': price * 0.97,
+        'conditions': {'ma_breakout': True, 'price_above_ma25': True, 'macd_golden_cross': True,
+                       'rsi_condition': True, 'max_increase': True},
+    }
+    return coin_data, analysis_data
+
+def percentile_ms(values, q):
+    return float(np.percentile(values, q) * 1000) if len(values) else float('nan')
+
+def main():
+    parser = argparse.ArgumentParser(description="디스코드 알림 발송 처리량 측정")
+    parser.add_argument("--count", type=int, default=2000, help="보낼 합성 알림 수")
+    parser.add_argument("--rate", type=float, default=0, help="초당 알림 생성 수 (0이면 한꺼번에)")
+    parser.add_argument("--sync", action="store_true", help="발송 대기열 없이 동기 발송 경로 측정")
+    parser.add_argument("--flush-timeout", type=float, default=120, help="생성 후 남은 알림 발송 대기 시간 (초)")
+    parser.add_argument("--url", default="", help="외부 웹훅 URL (기본: 프로세스 안에서 대체 서버 실행)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="대체 서버 응답 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="대체 서버 응답 지연 편차 (±ms)")
+    parser.add_argument("--fail-rate", type=float, default=0, help="대체 서버 5xx 비율")
+    parser.add_argument("--drop-rate", type=float, default=0, help="대체 서버 연결 끊김 비율")
+    parser.add_argument("--bucket-limit", type=int, default=5, help="대체 서버 버킷 창당 요청 수")
+    parser.add_argument("--bucket-window", type=float, default=2.0, help="대체 서버 버킷 창 길이 (초)")
+    parser.add_argument("--verbose", action="store_true", help="알림별 발송 로그 출력")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server = StubWebhookServer(
+            latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, fail_rate=args.fail_rate,
+            drop_rate=args.drop_rate, bucket_limit=args.bucket_limit, bucket_window=args.bucket_window
+        )
+        url = server.start()
+
+    alerts = [synthetic_alert(index) for index in range(args.count)]
+    outbox_path = os.path.join(tempfile.mkdtemp(prefix="alert_bench_"), "outbox.jsonl")
+    webhook = DiscordWebhook(url, outbox_path=outbox_path, dispatch=not args.sync)
+
+    # 알림별 생성 → 발송 완료 지연 (동기 경로는 호출 시간이 곧 지연)
+    enqueued_at = {}
+    latencies = []
+    if webhook.dispatcher:
+        def on_delivered(batch):
+            now = time.monotonic()
+            latencies.extend(now - enqueued_at[label] for _, label, _ in batch)
+        webhook.dispatcher.on_delivered = on_delivered
+
+    mode = "동기 발송" if args.sync else "발송 대기열"
+    print(f"📨 알림 {args.count}건 발송 측정 ({mode}, {'한꺼번에' if not args.rate else f'초당 {args.rate:g}건'}) → {url}")
+    blocking = []
+    delivered_sync = 0
+    log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.monotonic()
+    with log:
+        for index, (coin_data, analysis_data) in enumerate(alerts):
+            if args.rate:
+                delay = start + index / args.rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            called = time.monotonic()
+            enqueued_at[coin_data['market']] = called
+            sent = webhook.send_signal_alert(coin_data, analysis_data)
+            blocking.append(time.monotonic() - called)
+            if args.sync and sent:
+                delivered_sync += 1
+                latencies.append(blocking[-1])
+        produced = time.monotonic() - start
+
+        dispatcher = webhook.dispatcher
+        webhook.close(flush_timeout=args.flush_timeout)
+    elapsed = time.monotonic() - start
+
+    delivered = delivered_sync if args.sync else len(latencies)
+    lost = args.count - delivered
+    print("\n📊 알림 발송 측정 결과")
+    print("=" * 64)
+    print(f"생성:        {args.count}건 / {produced:.2f}초 (스캔 루프 차단 p99 {percentile_ms(blocking, 99):.2f}ms, "
+          f"최대 {max(blocking) * 1000:.2f}ms)")
+    print(f"발송 완료:   {delivered}건 / {elapsed:.2f}초 → {delivered / elapsed:.1f}건/초")
+    print(f"발송 지연:   p50 {percentile_ms(latencies, 50):.0f}ms, p99 {percentile_ms(latencies, 99):.0f}ms")
+    print(f"유실:        {lost}건 ({lost / args.count:.2%})" if args.count else "유실: 0건")
+    if dispatcher:
+        stats = dispatcher.stats
+        print(f"대기열:      메시지 {stats['messages']}개 (평균 임베드 {stats['sent'] / max(1, stats['messages']):.1f}개), "
+              f"429 {stats['throttled']}회, 오류 {stats['errors']}회, 폐기 {stats['dropped']}건")
+    if server:
+        server.print_stats()
+        server.stop()
+    print("=" * 64)
+
+if __name__ == "__main__":
+    main()
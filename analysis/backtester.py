@@ -0,0 +1,152 @@
+# analysis/backtester.py - 저장된 캔들 이력으로 신호 규칙을 재생하는 병렬 백테스트 (오프라인)
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analysis.candle_series import CandleSeries
+from analysis.indicator_plan import IndicatorPlan
+from analysis.signal_checker import SignalChecker
+from utils.candle_store import CandleStore
+from utils.resampler import resample_candles
+
+HORIZONS = (1, 4, 24)  # 신호 후 수익률 확인 구간 (시간)
+
+_plans = {}  # 작업 프로세스별 계획 캐시 (규칙 트리 대신 생성자 인자만 전달받음)
+
+def cached_plan(plan_args):
+    """생성자 인자로 만든 계획 (프로세스별 캐시)"""
+    key = json.dumps(plan_args, sort_keys=True)
+    if key not in _plans:
+        _plans[key] = IndicatorPlan(**plan_args)
+    return _plans[key]
+
+def load_hourly(store, market):
+    """저장된 캔들 → 1시간봉 (진행 중이었을 수 있는 마지막 저장 봉과 덜 찬 마지막 시간봉 제외)"""
+    timestamps, values = store.load(market)
+    if timestamps is None or len(timestamps) < 2:
+        return None, None
+
+    timestamps = np.asarray(timestamps[:-1], dtype=np.int64)
+    values = np.asarray(values[:, :-1], dtype=np.float64)
+    if store.unit == 60:
+        return timestamps, values
+
+    last_base = int(timestamps[-1])
+    timestamps, values = resample_candles(timestamps, values, 60)
+    if last_base + store.interval < int(timestamps[-1]) + 3600:
+        timestamps, values = timestamps[:-1], values[:, :-1]
+    return timestamps, values
+
+def signal_returns(candles, index, horizons=HORIZONS):
+    """신호 봉 종가로 진입했을 때 구간별 수익률과 최대 낙폭 (구간이 끝나지 않았으면 NaN)"""
+    close, low = candles.close, candles.low
+    length = len(close)
+    entry = close[index]
+    columns = {'timestamp': candles.timestamp[index], 'entry': entry}
+
+    # 진입 후 봉별 최저가의 누적 최소 → 구간별 최대 낙폭
+    window = index[:, None] + 1 + np.arange(max(horizons))
+    lowest = np.minimum.accumulate(low[np.minimum(window, length - 1)], axis=1)
+
+    for hours in horizons:
+        ahead = index + hours
+        complete = ahead < length
+        columns[f"ret_{hours}h"] = np.where(complete, close[np.minimum(ahead, length - 1)] / entry - 1, np.nan)
+        columns[f"dd_{hours}h"] = np.where(complete, np.minimum(lowest[:, hours - 1] / entry - 1, 0.0), np.nan)
+    return columns
+
+def backtest_market(task):
+    """한 마켓의 전체 이력 백테스트 (프로세스 풀 작업 단위) → 신호별 컬럼 또는 None"""
+    market, base_dir, unit, plan_args, horizons = task
+    try:
+        timestamps, values = load_hourly(CandleStore(base_dir=base_dir, unit=unit), market)
+        plan = cached_plan(plan_args)
+        if timestamps is None or len(timestamps) < plan.lookback:
+            return market, None, 0
+
+        candles = CandleSeries.from_arrays(timestamps, values)
+        signals, _, _ = SignalChecker.check_history(candles, plan)
+        return market, signal_returns(candles, np.flatnonzero(signals), horizons), len(candles)
+
+    except Exception as e:
+        print(f"❌ {market} 백테스트 오류: {e}")
+        return market, None, 0
+
+class Backtester:
+    """저장된 캔들 (CandleStore) 의 모든 마켓을 프로세스 풀로 나눠 신호 규칙 재생"""
+
+    def __init__(self, plan_args=None, base_dir="data/candles", unit=60, horizons=HORIZONS, workers=None):
+        self.plan_args = plan_args or IndicatorPlan.config_args()
+        self.base_dir = base_dir
+        self.unit = int(unit)
+        self.horizons = tuple(int(hours) for hours in horizons)
+        self.workers = workers or os.cpu_count() or 1
+
+    def markets(self):
+        """저장소에 캔들이 있는 마켓 목록"""
+        return CandleStore(base_dir=self.base_dir, unit=self.unit).markets()
+
+    def run(self, markets=None):
+        """백테스트 실행 → 신호별 컬럼 (market, timestamp, entry, 구간별 ret_Nh / dd_Nh)"""
+        markets = list(markets or self.markets())
+        tasks = [(market, self.base_dir, self.unit, self.plan_args, self.horizons) for market in markets]
+        print(f"🧪 백테스트 시작: {len(tasks)}개 마켓 / 작업 프로세스 {self.workers}개")
+        start_time = time.time()
+
+        if self.workers == 1 or len(tasks) < 2:
+            results = list(map(backtest_market, tasks))
+        else:
+            chunksize = max(1, len(tasks) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(backtest_market, tasks, chunksize=chunksize))
+
+        parts = [(market, columns) for market, columns, _ in results if columns is not None]
+        bars = sum(count for _, _, count in results)
+        names = ['timestamp', 'entry'] + [f"{kind}_{hours}h" for hours in self.horizons for kind in ('ret', 'dd')]
+        combined = {'market': np.array([market for market, columns in parts for _ in columns['entry']], dtype=str)}
+        for name in names:
+            combined[name] = np.concatenate([columns[name] for _, columns in parts]) if parts else np.empty(0)
+
+        print(f"✅ 백테스트 완료: {len(parts)}개 마켓, {bars:,}개 봉, 신호 {len(combined['entry'])}개 "
+              f"({time.time() - start_time:.1f}초)")
+        return combined
+
+    def summarize(self, columns):
+        """구간별 신호 수, 평균/중앙 수익률, 적중률 (수익률 > 0), 최대 낙폭 평균/최악"""
+        rows = []
+        for hours in self.horizons:
+            finished = ~np.isnan(columns[f"ret_{hours}h"])
+            returns, drawdown = columns[f"ret_{hours}h"][finished], columns[f"dd_{hours}h"][finished]
+            rows.append({
+                'horizon': f"{hours}h",
+                'signals': len(returns),
+                'mean': float(returns.mean()) if len(returns) else np.nan,
+                'median': float(np.median(returns)) if len(returns) else np.nan,
+                'hit_rate': float((returns > 0).mean()) if len(returns) else np.nan,
+                'avg_drawdown': float(drawdown.mean()) if len(drawdown) else np.nan,
+                'worst_drawdown': float(drawdown.min()) if len(drawdown) else np.nan
+            })
+        return rows
+
+    @staticmethod
+    def print_summary(rows):
+        """요약 표 출력"""
+        print("\n📊 백테스트 요약")
+        print("=" * 72)
+        print(f"{'구간':>6} {'신호':>8} {'평균':>9} {'중앙값':>9} {'적중률':>8} {'평균 낙폭':>10} {'최악 낙폭':>10}")
+        for row in rows:
+            print(f"{row['horizon']:>6} {row['signals']:>8} {row['mean']:>+9.2%} {row['median']:>+9.2%} "
+                  f"{row['hit_rate']:>8.1%} {row['avg_drawdown']:>+10.2%} {row['worst_drawdown']:>+10.2%}")
+        print("=" * 72)
+
+    @staticmethod
+    def save(columns, path="data/backtest/signals.npz"):
+        """신호별 컬럼을 압축 .npz로 저장"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, **columns)
+        print(f"💾 백테스트 결과 저장: {path}")
+        return path
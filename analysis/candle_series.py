@@ -0,0 +1,127 @@
+# analysis/candle_series.py - NumPy 기반 캔들/지표 시계열 (DataFrame 없는 스캔 경로)
+
+import numpy as np
+import pandas as pd
+
+class CandleSeries:
+    """고정 컬럼 캔들 시계열 (오래된 것부터, 끝부분 O(1) 접근)
+
+    컬럼이 2차원 (마켓 × 시간) 이면 여러 마켓을 한 번에 담은 배치 시계열이다.
+    """
+
+    __slots__ = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, timestamp, open, high, low, close, volume):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    @classmethod
+    def from_arrays(cls, timestamps, values):
+        """(타임스탬프, OHLCV (5, n)) 배열에서 생성"""
+        return cls(timestamps, values[0], values[1], values[2], values[3], values[4])
+
+    @classmethod
+    def stack(cls, series_list, length=200):
+        """여러 마켓 시계열의 최근 length개를 (마켓 × 시간) 배치 시계열로 묶음"""
+        tails = [series.tail(length) for series in series_list]
+        return cls(*(np.stack([getattr(series, name) for series in tails])
+                     for name in ('timestamp',) + cls.COLUMNS))
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """pandas DataFrame에서 생성 (대화형 분석용 어댑터)"""
+        timestamps = df['timestamp'].to_numpy() if 'timestamp' in df else np.arange(len(df))
+        if timestamps.dtype.kind not in 'iu':
+            timestamps = np.arange(len(df))  # 문자열 시각 등은 순번으로 대체
+        return cls(timestamps, *(df[col].to_numpy(dtype=np.float64) for col in cls.COLUMNS))
+
+    def __len__(self):
+        return self.close.shape[-1]
+
+    def tail(self, count):
+        """최근 count개 (복사 없는 뷰)"""
+        return CandleSeries(*(column[..., -count:] for column in
+                              (self.timestamp, self.open, self.high, self.low, self.close, self.volume)))
+
+    def validate(self, min_length=200):
+        """길이 + 결측/무한대 없음을 한 번에 확인"""
+        if len(self) < min_length:
+            return False
+        block = np.stack([self.open, self.high, self.low, self.close, self.volume])
+        return bool(np.isfinite(block).all())
+
+    def to_dataframe(self):
+        """pandas DataFrame으로 변환"""
+        return pd.DataFrame({'timestamp': self.timestamp, 'open': self.open, 'high': self.high,
+                             'low': self.low, 'close': self.close, 'volume': self.volume})
+
+class IndicatorFrame:
+    """캔들 + 지표 컬럼 묶음 (지표 계산/신호 체크가 직접 사용)
+
+    지표 컬럼은 캔들보다 짧을 수 있으며 이 경우 최근 봉들에 끝을 맞춘 값이다.
+    """
+
+    __slots__ = ('candles', 'columns')
+
+    def __init__(self, candles, columns=None):
+        self.candles = candles
+        self.columns = columns if columns is not None else {}
+
+    @classmethod
+    def wrap(cls, data):
+        """DataFrame / CandleSeries / IndicatorFrame 무엇이든 IndicatorFrame으로"""
+        if isinstance(data, IndicatorFrame):
+            return data
+        if isinstance(data, CandleSeries):
+            return cls(data)
+        return cls.from_dataframe(data)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """pandas DataFrame 어댑터 (캔들 외 컬럼은 지표로 취급)"""
+        candles = CandleSeries.from_dataframe(df)
+        skip = set(CandleSeries.COLUMNS) | {'timestamp'}
+        columns = {col: df[col].to_numpy(dtype=np.float64) for col in df.columns if col not in skip}
+        return cls(candles, columns)
+
+    def __len__(self):
+        return len(self.candles)
+
+    def __contains__(self, name):
+        return name in self.columns or name in CandleSeries.COLUMNS
+
+    def __getitem__(self, name):
+        """컬럼 전체 배열"""
+        column = self.columns.get(name)
+        if column is None:
+            return getattr(self.candles, name)
+        return column
+
+    def __setitem__(self, name, values):
+        self.columns[name] = values
+
+    def last(self, name, back=1):
+        """끝에서 back번째 값 (back=1이면 최신, 범위 밖이면 NaN, 배치면 마켓별 배열)"""
+        column = self[name]
+        if back > column.shape[-1]:
+            return np.full(column.shape[:-1], np.nan) if column.ndim > 1 else np.nan
+        return column[..., -back]
+
+    def tail(self, name, count):
+        """최근 count개 값 (뷰)"""
+        return self[name][..., -count:]
+
+    def to_dataframe(self):
+        """pandas DataFrame으로 변환 (대화형 분석/디버깅용)"""
+        df = self.candles.to_dataframe()
+        for name, values in self.columns.items():
+            padded = np.full(len(df), np.nan)
+            padded[len(df) - len(values):] = values
+            df[name] = padded
+        return df
@@ -0,0 +1,236 @@
+# analysis/incremental_indicators.py - 마켓별 증분 지표 계산 (체크포인트로 재시작 후에도 이어서)
+
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+
+from analysis.candle_series import IndicatorFrame
+from analysis.indicator_plan import MACD_COLUMNS, MACD_WARMUP_SPANS
+from analysis.indicators import TechnicalIndicators
+from config.settings import settings
+
+# 증분 상태로 갱신하는 지표 컬럼 순서 (이동평균 컬럼은 앞에 기간별로 붙음, MACD 계열은 종가 버퍼로 계산)
+BASE_COLUMNS = ('rsi',)
+
+# 누적합 부동소수점 오차가 쌓이지 않도록 주기적으로 버퍼에서 다시 합산
+RESYNC_INTERVAL = 1000
+
+class IndicatorState:
+    """한 마켓의 롤링 지표 상태 (확정된 봉까지 반영)"""
+
+    __slots__ = ('timestamp', 'count', 'closes', 'head', 'sums', 'prev_close',
+                 'gains', 'losses', 'gain_sum', 'loss_sum', 'rows')
+
+    def __init__(self, buffer_size, rsi_period, window):
+        self.timestamp = None                 # 마지막 확정 봉 시각
+        self.count = 0                        # 반영한 봉 수
+        self.closes = [0.0] * buffer_size     # 최근 종가 링 버퍼 (이동평균 창에서 빠질 값, MACD 창)
+        self.head = 0                         # 다음에 쓸 링 버퍼 위치
+        self.sums = {}                        # 기간 → 종가 누적합
+        self.prev_close = None
+        self.gains = [0.0] * rsi_period       # RSI 상승폭/하락폭 링 버퍼
+        self.losses = [0.0] * rsi_period
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.rows = deque(maxlen=window - 1)  # 최근 확정 봉 지표 값
+
+    def to_dict(self):
+        return {
+            'timestamp': self.timestamp, 'count': self.count, 'closes': self.closes, 'head': self.head,
+            'sums': {str(period): value for period, value in self.sums.items()},
+            'prev_close': self.prev_close, 'gains': self.gains, 'losses': self.losses,
+            'gain_sum': self.gain_sum, 'loss_sum': self.loss_sum,
+            'rows': [[None if math.isnan(v) else v for v in row] for row in self.rows]
+        }
+
+    @classmethod
+    def from_dict(cls, data, buffer_size, rsi_period, window):
+        state = cls(buffer_size, rsi_period, window)
+        state.timestamp = data['timestamp']
+        state.count = data['count']
+        state.closes = data['closes']
+        state.head = data['head']
+        state.sums = {int(period): value for period, value in data['sums'].items()}
+        state.prev_close = data['prev_close']
+        state.gains = data['gains']
+        state.losses = data['losses']
+        state.gain_sum = data['gain_sum']
+        state.loss_sum = data['loss_sum']
+        state.rows.extend(tuple(math.nan if v is None else v for v in row) for row in data['rows'])
+        return state
+
+class IncrementalIndicatorEngine:
+    """새 봉 1개마다 이동평균/RSI는 O(1), MACD는 종가 버퍼로 갱신하는 증분 지표 엔진
+
+    확정된 봉은 상태에 반영하고, 진행 중인 마지막 봉은 상태를 바꾸지 않고 미리 계산만 한다.
+    MACD 계열은 지연 프레임/백테스트와 같은 규약으로 봉마다 최근 macd_window개 종가로만
+    계산하므로 엔진이 언제부터 봉을 봤는지와 무관하게 같은 값이 나온다.
+    """
+
+    def __init__(self, ma_periods=None, rsi_period=None, macd=None, window=24, macd_window=None,
+                 checkpoint_path="data/indicator_state.json"):
+        self.ma_periods = tuple(int(p) for p in (ma_periods or settings.MA_PERIODS))
+        self.rsi_period = int(rsi_period or settings.RSI_PERIOD)
+        self.macd = tuple(macd or (settings.MACD_FAST, settings.MACD_SLOW, settings.MACD_SIGNAL))
+        self.macd_window = int(macd_window or MACD_WARMUP_SPANS * self.macd[1] + self.macd[2])
+        self.window = window  # 신호 체크가 보는 최근 봉 수
+        self.checkpoint_path = checkpoint_path
+        # 종가 버퍼: 이동평균 창과 (최근 window개 봉의 MACD 창) 중 긴 쪽
+        self.buffer_size = max(max(self.ma_periods), self.window + self.macd_window)
+        self.columns = tuple(f"ma{p}" for p in self.ma_periods) + BASE_COLUMNS
+        self.states = {}
+        self.stats = {'incremental': 0, 'rebuilt': 0}
+
+    def _new_state(self):
+        return IndicatorState(self.buffer_size, self.rsi_period, self.window)
+
+    def _step(self, state, close, commit):
+        """종가 1개 반영 후 지표 값 반환 (commit=False면 상태는 그대로)"""
+        count = state.count + 1
+        row = []
+
+        # 이동평균: 기간별 누적합 + 창에서 빠지는 종가 제거
+        sums = {}
+        for period in self.ma_periods:
+            total = state.sums.get(period, 0.0) + close
+            if count > period:
+                total -= state.closes[(state.head - period) % self.buffer_size]
+            sums[period] = total
+            row.append(total / period if count >= period else math.nan)
+
+        # RSI: 상승폭/하락폭 단순 평균 (첫 봉의 변화량은 0)
+        delta = 0.0 if state.prev_close is None else close - state.prev_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        slot = state.count % self.rsi_period
+        gain_sum = state.gain_sum + gain - (state.gains[slot] if count > self.rsi_period else 0.0)
+        loss_sum = state.loss_sum + loss - (state.losses[slot] if count > self.rsi_period else 0.0)
+        if count < self.rsi_period:
+            rsi = math.nan
+        elif loss_sum > 0:
+            rsi = 100 - 100 / (1 + gain_sum / loss_sum)
+        else:
+            rsi = 100.0 if gain_sum > 0 else math.nan
+        row.append(rsi)
+        row = tuple(row)
+
+        if commit:
+            state.count = count
+            state.sums = sums
+            state.closes[state.head] = close
+            state.head = (state.head + 1) % self.buffer_size
+            state.prev_close = close
+            state.gains[slot], state.losses[slot] = gain, loss
+            state.gain_sum, state.loss_sum = gain_sum, loss_sum
+            state.rows.append(row)
+            if count % RESYNC_INTERVAL == 0:
+                self._resync(state)
+        return row
+
+    def _resync(self, state):
+        """링 버퍼에서 누적합을 다시 계산 (오차 누적 방지)"""
+        for period in self.ma_periods:
+            recent = self._recent_closes(state, period)
+            state.sums[period] = math.fsum(recent)
+        state.gain_sum = math.fsum(state.gains)
+        state.loss_sum = math.fsum(state.losses)
+
+    def _recent_closes(self, state, count):
+        """링 버퍼의 최근 확정 종가 count개 (오래된 것부터)"""
+        return [state.closes[(state.head - k) % self.buffer_size] for k in range(count, 0, -1)]
+
+    def update(self, market, candles):
+        """마켓의 최신 캔들 시계열로 상태 갱신 후 최근 window개 지표가 담긴 IndicatorFrame 반환
+
+        마지막 확정 봉 이후의 봉만 반영하며, 시계열이 이어지지 않으면 처음부터 다시 쌓는다.
+        """
+        timestamps, closes = candles.timestamp, candles.close
+        state = self.states.get(market)
+        start = 0
+
+        if state is not None and state.timestamp is not None:
+            position = int(np.searchsorted(timestamps, state.timestamp))
+            if position < len(timestamps) - 1 and timestamps[position] == state.timestamp:
+                start = position + 1
+            else:
+                state = None
+
+        if state is None:
+            state = self._new_state()
+            self.states[market] = state
+            self.stats['rebuilt'] += 1
+        else:
+            self.stats['incremental'] += 1
+
+        # 진행 중인 마지막 봉을 제외한 확정 봉 반영
+        for index in range(start, len(closes) - 1):
+            self._step(state, float(closes[index]), commit=True)
+        if len(closes) > 1:
+            state.timestamp = int(timestamps[-2])
+
+        rows = list(state.rows)
+        rows.append(self._step(state, float(closes[-1]), commit=False))
+
+        columns = dict(zip(self.columns, np.array(rows, dtype=np.float64).T))
+
+        # MACD 계열: 각 봉까지 최근 macd_window개 종가 (확정 봉 버퍼 + 진행 중인 봉)
+        recent = self._recent_closes(state, len(rows) + self.macd_window - 2) + [float(closes[-1])]
+        macd_columns = TechnicalIndicators.windowed_macd(recent, *self.macd, self.macd_window)
+        columns.update(zip(MACD_COLUMNS, (column[-len(rows):] for column in macd_columns)))
+
+        # 배치 계산과 같은 결과 유지: 주어진 시계열 길이로는 창이 안 차는 구간은 NaN
+        periods = [(f"ma{p}", p) for p in self.ma_periods] + [('rsi', self.rsi_period)]
+        periods += [(name, self.macd_window) for name in MACD_COLUMNS]
+        for name, period in periods:
+            hidden = len(rows) - (len(closes) - period + 1)
+            if hidden > 0:
+                columns[name][:hidden] = np.nan
+
+        return IndicatorFrame(candles, columns)
+
+    def _params(self):
+        return {'ma_periods': list(self.ma_periods), 'rsi_period': self.rsi_period,
+                'macd': list(self.macd), 'macd_window': self.macd_window, 'window': self.window}
+
+    def load(self):
+        """체크포인트에서 상태 복원 (지표 설정이 다르면 무시)"""
+        if not os.path.exists(self.checkpoint_path):
+            return 0
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('params') != self._params():
+                print("📝 지표 설정이 바뀌어 증분 지표 체크포인트를 새로 만듭니다.")
+                return 0
+            self.states = {
+                market: IndicatorState.from_dict(state, self.buffer_size, self.rsi_period, self.window)
+                for market, state in data['markets'].items()
+            }
+            return len(self.states)
+        except Exception as e:
+            print(f"⚠️ 증분 지표 체크포인트 로드 오류: {e}")
+            self.states = {}
+            return 0
+
+    def save(self):
+        """상태를 체크포인트 파일에 저장 (임시 파일 후 교체)"""
+        try:
+            directory = os.path.dirname(self.checkpoint_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            data = {
+                'params': self._params(),
+                'markets': {market: state.to_dict() for market, state in self.states.items()}
+            }
+            tmp_path = self.checkpoint_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception as e:
+            print(f"❌ 증분 지표 체크포인트 저장 오류: {e}")
+
+    def get_stats(self):
+        """증분 갱신 / 재구축 횟수"""
+        return dict(self.stats)
@@ -0,0 +1,144 @@
+# analysis/indicator_plan.py - 설정에서 필요한 지표 컬럼과 최소 봉 수를 계산하는 지표 계획
+
+import hashlib
+import json
+
+from analysis.indicators import TechnicalIndicators
+from analysis.rule_engine import CANDLE_COLUMNS, DEFAULT_PARAMS, RuleSet
+from config.settings import settings
+
+# 신호 조건 (SignalChecker 조건 이름)
+CONDITIONS = ('ma_breakout', 'rsi_above_45', 'macd_golden_cross', 'price_above_ma25', 'not_overextended')
+
+# 조건별 사용 여부 설정 키 (목록에 없는 조건은 항상 사용)
+CONDITION_FLAGS = {
+    'ma_breakout': 'require_ma_breakout',
+    'macd_golden_cross': 'require_macd_golden_cross',
+    'price_above_ma25': 'require_price_above_ma25',
+}
+
+MACD_WARMUP_SPANS = 4   # EMA 초기값 영향이 충분히 줄어드는 길이 (느린 EMA 기간의 배수)
+MACD_COLUMNS = ('macd', 'macd_signal', 'macd_histogram')
+
+class IndicatorPlan:
+    """신호 규칙이 참조하는 지표 컬럼만 계산하는 실행 계획
+
+    ma_periods는 정렬 후 (단기, 중기, 장기, 초장기) 역할로 쓰인다 (기본 9/25/99/200).
+    규칙에서는 ma_fast/ma_mid/ma_slow/ma_long 별칭으로 참조한다.
+    """
+
+    __slots__ = ('ma_periods', 'rsi_period', 'macd', 'definition', 'params', 'rules', 'conditions',
+                 'columns', 'lookback', 'window', 'macd_window', 'key', 'signature')
+
+    def __init__(self, ma_periods=(9, 25, 99, 200), conditions=CONDITIONS, rsi_period=14, macd=(12, 26, 9),
+                 rules=None, params=None):
+        self.ma_periods = tuple(sorted(int(p) for p in ma_periods))
+        if len(self.ma_periods) != 4:
+            raise ValueError(f"이동평균 기간은 4개여야 합니다: {ma_periods}")
+        self.rsi_period = int(rsi_period)
+        self.macd = tuple(int(p) for p in macd)
+        # MACD 계열은 봉마다 최근 macd_window개 종가로만 계산 (EMA 시작점이 데이터 범위에 따라 달라지지 않도록)
+        self.macd_window = MACD_WARMUP_SPANS * self.macd[1] + self.macd[2]
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+
+        # 사용하지 않는 기본 조건은 규칙에서 제외
+        aliases = {'ma_fast': self.ma_fast, 'ma_mid': self.ma_mid, 'ma_slow': self.ma_slow, 'ma_long': self.ma_long}
+        disabled = [name for name in CONDITIONS if name not in conditions]
+        self.rules = RuleSet(rules, aliases, self.params, disabled)
+        self.definition = self.rules.definition
+        self.conditions = tuple(self.rules.names)
+        self.columns, self.lookback = self._compile()
+        self.window = self.rules.max_back() + 1
+
+        # 계산 결과에 영향을 주는 설정 묶음 (메모 캐시 키용)
+        rules = json.dumps(self.definition, sort_keys=True)
+        self.key = (self.ma_periods, self.rsi_period, self.macd, self.conditions, rules,
+                    tuple(sorted(self.params.items())))
+        # 프로세스/실행이 바뀌어도 같은 규칙 묶음이면 같은 짧은 식별자 (알림 상태 키용)
+        self.signature = hashlib.sha1(repr(self.key).encode('utf-8')).hexdigest()[:10]
+
+    @classmethod
+    def from_config(cls, config=None):
+        """signal_config.json 설정으로 계획 생성 (없는 키는 전역 설정 사용)"""
+        return cls(**cls.config_args(config))
+
+    @staticmethod
+    def config_args(config=None):
+        """설정 → 생성자 인자 (다른 프로세스에서 같은 계획을 만들 때 전달)"""
+        config = config or {}
+        conditions = tuple(
+            name for name in CONDITIONS
+            if name not in CONDITION_FLAGS or config.get(CONDITION_FLAGS[name], True)
+        )
+        return {
+            'ma_periods': tuple(config.get('ma_periods', settings.MA_PERIODS)),
+            'conditions': conditions,
+            'rsi_period': settings.RSI_PERIOD,
+            'macd': (settings.MACD_FAST, settings.MACD_SLOW, settings.MACD_SIGNAL),
+            'rules': config.get('signal_rules', settings.SIGNAL_RULES),
+            'params': {
+                'rsi_threshold': config.get('rsi_threshold', settings.RSI_THRESHOLD),
+                'max_increase': config.get('max_increase', settings.MAX_INCREASE)
+            }
+        }
+
+    @property
+    def ma_fast(self):
+        return f"ma{self.ma_periods[0]}"
+
+    @property
+    def ma_mid(self):
+        return f"ma{self.ma_periods[1]}"
+
+    @property
+    def ma_slow(self):
+        return f"ma{self.ma_periods[2]}"
+
+    @property
+    def ma_long(self):
+        return f"ma{self.ma_periods[3]}"
+
+    def bars_needed(self, name):
+        """컬럼 값이 처음 생기는 데 필요한 봉 수"""
+        if name in CANDLE_COLUMNS:
+            return 1
+        if name == 'rsi':
+            return self.rsi_period
+        if name in MACD_COLUMNS:
+            return self.macd_window
+        if name in {f"ma{period}" for period in self.ma_periods}:
+            return int(name[2:])
+        raise ValueError(f"규칙이 알 수 없는 컬럼을 참조합니다: {name}")
+
+    def _compile(self):
+        """규칙 → (필요한 지표 컬럼, 최소 봉 수)"""
+        referenced = [name for name in self.rules.columns() if name not in CANDLE_COLUMNS]
+        if any(name in MACD_COLUMNS for name in referenced):
+            referenced += ['macd', 'macd_signal']
+        columns = [self.ma_mid, 'rsi'] + referenced  # 알림에 표시하는 값은 항상 계산
+
+        # 초장기선처럼 대체 값이 있는 컬럼은 최신 봉에만 있으면 됨 (규칙 엔진이 계산)
+        lookback = max(self.ma_periods[1], self.rsi_period, self.rules.lookback(self.bars_needed))
+        return tuple(dict.fromkeys(columns)), lookback
+
+    def compute(self, frame):
+        """IndicatorFrame에 계획된 컬럼만 계산"""
+        close_prices = frame['close']
+        for period in dict.fromkeys(self.ma_periods):
+            if f"ma{period}" in self.columns:
+                frame[f"ma{period}"] = TechnicalIndicators.sma(close_prices, period)
+        if 'rsi' in self.columns:
+            frame['rsi'] = TechnicalIndicators.rsi(close_prices, self.rsi_period)
+        if 'macd' in self.columns:
+            frame['macd'], frame['macd_signal'], histogram = TechnicalIndicators.windowed_macd(
+                close_prices, *self.macd, self.macd_window)
+            if 'macd_histogram' in self.columns:
+                frame['macd_histogram'] = histogram
+        return frame
+
+    def describe(self):
+        """계획 요약 문자열"""
+        return f"지표 {', '.join(self.columns)} / 최소 {self.lookback}봉 / 조건 {len(self.conditions)}개"
+
+# 기존 고정 설정과 같은 기본 계획 (9/25/99/200, 기본 규칙)
+DEFAULT_PLAN = IndicatorPlan()
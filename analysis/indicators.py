@@ -3,43 +3,112 @@
 import pandas as pd
 import numpy as np
 
+from analysis.candle_series import IndicatorFrame
+
+# EMA 블록 내 최대 가중치 배율 (decay^-k 가 float 범위를 넘지 않는 선에서 블록을 최대한 길게)
+EMA_MAX_SCALE = 1e100
+
 class TechnicalIndicators:
     """발열 방지 최적화된 기술적 지표 계산"""
-    
+
+    @staticmethod
+    def sma(values, period):
+        """단순 이동평균 (NumPy, 마지막 축 기준, 앞쪽 period-1개는 NaN)"""
+        values = np.asarray(values, dtype=np.float64)
+        result = np.full(values.shape, np.nan)
+        if values.shape[-1] < period:
+            return result
+
+        cumsum = np.cumsum(values, axis=-1)
+        result[..., period - 1] = cumsum[..., period - 1]
+        result[..., period:] = cumsum[..., period:] - cumsum[..., :-period]
+        result[..., period - 1:] /= period
+        return result
+
+    @staticmethod
+    def ema(values, span):
+        """지수 이동평균 (pandas ewm(span).mean() 과 같은 adjust=True 가중치, 마지막 축 기준)"""
+        values = np.asarray(values, dtype=np.float64)
+        decay = 1.0 - 2.0 / (span + 1.0)
+        result = np.empty(values.shape)
+        numerator = np.zeros(values.shape[:-1])
+        denominator = np.zeros(values.shape[:-1])
+        block_size = max(1, int(np.log(EMA_MAX_SCALE) / -np.log(decay))) if 0 < decay < 1 else 1
+
+        # num_t = decay * num_(t-1) + x_t, den_t = decay * den_(t-1) + 1 을 블록 단위 누적합으로 계산
+        for start in range(0, values.shape[-1], block_size):
+            block = values[..., start:start + block_size]
+            steps = np.arange(block.shape[-1])
+            growth = decay ** steps
+            inverse = decay ** -steps
+
+            num = growth * (decay * numerator[..., None] + np.cumsum(block * inverse, axis=-1))
+            den = growth * (decay * denominator[..., None] + np.cumsum(inverse))
+            result[..., start:start + block.shape[-1]] = num / den
+            numerator, denominator = num[..., -1], den[..., -1]
+
+        return result
+
+    @staticmethod
+    def rsi(values, period=14):
+        """RSI (NumPy, 상승/하락폭 단순 평균, 마지막 축 기준)"""
+        values = np.asarray(values, dtype=np.float64)
+        delta = np.zeros(values.shape)
+        delta[..., 1:] = np.diff(values, axis=-1)
+
+        gain = TechnicalIndicators.sma(np.where(delta > 0, delta, 0.0), period)
+        loss = TechnicalIndicators.sma(np.where(delta < 0, -delta, 0.0), period)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 - (100 / (1 + gain / loss))
+
+    @staticmethod
+    def macd(values, fast=12, slow=26, signal=9):
+        """MACD (NumPy) → (macd, signal, histogram)"""
+        macd_line = TechnicalIndicators.ema(values, fast) - TechnicalIndicators.ema(values, slow)
+        signal_line = TechnicalIndicators.ema(macd_line, signal)
+        return macd_line, signal_line, macd_line - signal_line
+
+    @staticmethod
+    def windowed_macd(values, fast=12, slow=26, signal=9, window=113):
+        """봉마다 그 봉까지 최근 window개 종가로만 계산한 MACD → (macd, signal, histogram)
+
+        EMA 시작점을 각 봉의 창 첫 봉으로 고정해 시계열을 어디서부터 받았는지와 무관한 값이 된다
+        (스캔/증분/배치/백테스트 공통 규약). 창이 안 차는 앞쪽 window-1개는 NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        result = [np.full(values.shape, np.nan) for _ in range(3)]
+        if values.shape[-1] < window:
+            return tuple(result)
+
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=-1)
+        for target, column in zip(result, TechnicalIndicators.macd(windows, fast, slow, signal)):
+            target[..., window - 1:] = column[..., -1]
+        return tuple(result)
+
     @staticmethod
     def moving_average(data, period):
         """단순 이동평균선 계산"""
-        return data.rolling(window=period, min_periods=period).mean()
-    
+        return pd.Series(TechnicalIndicators.sma(data.to_numpy(dtype=np.float64), period), index=data.index)
+
     @staticmethod
     def calculate_rsi(data, period=14):
         """RSI 계산"""
         try:
-            delta = data.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi
+            return pd.Series(TechnicalIndicators.rsi(data.to_numpy(dtype=np.float64), period), index=data.index)
         except:
             return pd.Series([np.nan] * len(data))
-    
+
     @staticmethod
     def calculate_macd(data, fast=12, slow=26, signal=9):
         """MACD 계산"""
         try:
-            ema_fast = data.ewm(span=fast).mean()
-            ema_slow = data.ewm(span=slow).mean()
-            
-            macd_line = ema_fast - ema_slow
-            signal_line = macd_line.ewm(span=signal).mean()
-            histogram = macd_line - signal_line
-            
+            macd_line, signal_line, histogram = TechnicalIndicators.macd(data.to_numpy(dtype=np.float64), fast, slow, signal)
+
             return {
-                'macd': macd_line,
-                'signal': signal_line,
-                'histogram': histogram
+                'macd': pd.Series(macd_line, index=data.index),
+                'signal': pd.Series(signal_line, index=data.index),
+                'histogram': pd.Series(histogram, index=data.index)
             }
         except:
             return {
@@ -47,31 +116,39 @@ class TechnicalIndicators:
                 'signal': pd.Series([np.nan] * len(data)),
                 'histogram': pd.Series([np.nan] * len(data))
             }
-    
+
+    @staticmethod
+    def calculate_frame(frame):
+        """IndicatorFrame에 모든 지표 컬럼 계산 (DataFrame 없이)"""
+        close_prices = frame['close']
+
+        # 이동평균선 계산
+        frame['ma9'] = TechnicalIndicators.sma(close_prices, 9)
+        frame['ma25'] = TechnicalIndicators.sma(close_prices, 25)
+        frame['ma99'] = TechnicalIndicators.sma(close_prices, 99)
+        frame['ma200'] = TechnicalIndicators.sma(close_prices, 200)
+
+        # RSI 계산
+        frame['rsi'] = TechnicalIndicators.rsi(close_prices, 14)
+
+        # MACD 계산
+        frame['macd'], frame['macd_signal'], frame['macd_histogram'] = TechnicalIndicators.macd(close_prices)
+        return frame
+
     @staticmethod
     def calculate_all_indicators(df):
-        """모든 지표를 한번에 계산 (메모리 효율적)"""
+        """모든 지표를 한번에 계산 (DataFrame이면 컬럼 추가 후 반환, IndicatorFrame이면 그대로 계산)"""
         try:
-            close_prices = df['close']
-            
-            # 이동평균선 계산
-            df['ma9'] = TechnicalIndicators.moving_average(close_prices, 9)
-            df['ma25'] = TechnicalIndicators.moving_average(close_prices, 25)
-            df['ma99'] = TechnicalIndicators.moving_average(close_prices, 99)
-            df['ma200'] = TechnicalIndicators.moving_average(close_prices, 200)
-            
-            # RSI 계산
-            df['rsi'] = TechnicalIndicators.calculate_rsi(close_prices, 14)
-            
-            # MACD 계산
-            macd_data = TechnicalIndicators.calculate_macd(close_prices)
-            df['macd'] = macd_data['macd']
-            df['macd_signal'] = macd_data['signal']
-            df['macd_histogram'] = macd_data['histogram']
-            
+            if isinstance(df, IndicatorFrame):
+                return TechnicalIndicators.calculate_frame(df)
+
+            frame = TechnicalIndicators.calculate_frame(IndicatorFrame.wrap(df))
+            for name, values in frame.columns.items():
+                df[name] = values
+
             print(f"기술적 지표 계산 완료: {len(df)}개 데이터")
             return df
-            
+
         except Exception as e:
             print(f"지표 계산 오류: {e}")
-            return df
\ No newline at end of file
+            return df
@@ -0,0 +1,137 @@
+# analysis/lazy_indicators.py - 신호 조건이 요청하는 최근 구간만 계산하는 지연 지표 프레임
+
+import numpy as np
+
+from analysis.candle_series import CandleSeries, IndicatorFrame
+from analysis.indicator_plan import DEFAULT_PLAN, MACD_COLUMNS
+from analysis.indicators import TechnicalIndicators
+
+# 한 번에 계산할 최소 끝 구간 (신호 조건이 보는 가장 먼 봉, 상승률 제한 24봉)
+MIN_TAIL = 24
+
+class LazyIndicatorFrame(IndicatorFrame):
+    """IndicatorFrame과 같은 접근 방식이지만 지표 값은 요청될 때 필요한 끝 구간만 계산
+
+    이동평균/RSI는 요청된 봉의 창 합계로만 계산하고, MACD 계열은 요청된 봉까지 최근
+    plan.macd_window개 종가로만 계산한다 (증분 엔진/백테스트와 같은 규약).
+    materialize()로 전체 컬럼을 만들 수 있다 (디버깅/백테스트용).
+    """
+
+    __slots__ = ('plan', 'specs', 'tails', 'points')
+
+    def __init__(self, candles, plan=None):
+        super().__init__(candles)
+        self.plan = plan or DEFAULT_PLAN
+        # 계획에 있는 컬럼만 계산 대상
+        specs = {f"ma{period}": ('sma', period) for period in self.plan.ma_periods}
+        specs['rsi'] = ('rsi', self.plan.rsi_period)
+        # MACD 계열은 시그널선이 모든 과거 MACD 값에 의존하므로 함께 계산
+        specs.update((name, ('macd', None)) for name in MACD_COLUMNS)
+        self.specs = {name: spec for name, spec in specs.items() if name in self.plan.columns}
+        self.tails = {}   # 컬럼 → 지금까지 계산한 끝 구간
+        self.points = {}  # (컬럼, back) → 단일 봉 값
+
+    def __contains__(self, name):
+        return name in self.specs or super().__contains__(name)
+
+    def _compute_macd(self):
+        """MACD 계열 전체 컬럼 계산 (캐시)"""
+        columns = TechnicalIndicators.windowed_macd(self.candles.close, *self.plan.macd, self.plan.macd_window)
+        self.columns.update(zip(MACD_COLUMNS, columns))
+
+    def _macd_point(self, back):
+        """끝에서 back번째 봉의 MACD/시그널/히스토그램 (그 봉까지 최근 macd_window개 종가만 사용)"""
+        close = self.candles.close
+        end = close.shape[-1] - back + 1
+        window = self.plan.macd_window
+        if end < window:
+            values = [np.full(close.shape[:-1], np.nan) if close.ndim > 1 else np.nan] * len(MACD_COLUMNS)
+        else:
+            values = [column[..., -1] for column in TechnicalIndicators.macd(close[..., end - window:end], *self.plan.macd)]
+        self.points.update(((name, back), value) for name, value in zip(MACD_COLUMNS, values))
+
+    def _point_value(self, kind, period, back):
+        """끝에서 back번째 봉 하나의 이동평균/RSI (창 합계만 사용)"""
+        close = self.candles.close
+        end = close.shape[-1] - back + 1
+
+        if kind == 'sma':
+            start = end - period
+            if start < 0:
+                return np.full(close.shape[:-1], np.nan) if close.ndim > 1 else np.nan
+            return close[..., start:end].sum(axis=-1) / period
+
+        # RSI: 첫 봉의 변화량은 0이므로 창이 시계열 처음에 닿으면 변화량 1개가 줄어듦
+        if end < period:
+            return np.full(close.shape[:-1], np.nan) if close.ndim > 1 else np.nan
+        delta = np.diff(close[..., max(0, end - period - 1):end], axis=-1)
+        gain = np.where(delta > 0, delta, 0.0).sum(axis=-1) / period
+        loss = np.where(delta < 0, -delta, 0.0).sum(axis=-1) / period
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 - (100 / (1 + gain / loss))
+
+    def _tail_values(self, name, count):
+        """지표 컬럼의 최근 count개 (이미 계산한 구간이 충분하면 재사용)"""
+        if name in self.columns:
+            return self.columns[name][..., -count:]
+        cached = self.tails.get(name)
+        if cached is not None and cached.shape[-1] >= count:
+            return cached[..., -count:]
+
+        kind, period = self.specs[name]
+        close = self.candles.close
+        requested, count = count, max(count, MIN_TAIL)
+        if kind == 'macd':
+            self._compute_macd()
+            return self.columns[name][..., -requested:]
+
+        if kind == 'sma':
+            # 마지막 count개 평균에 필요한 종가만 사용
+            window = close[..., max(0, close.shape[-1] - count - period + 1):]
+            values = TechnicalIndicators.sma(window, period)[..., -count:]
+        else:
+            # 변화량 계산용 1봉 추가
+            window = close[..., max(0, close.shape[-1] - count - period):]
+            values = TechnicalIndicators.rsi(window, period)[..., -count:]
+
+        self.tails[name] = values
+        return values[..., -requested:]
+
+    def __getitem__(self, name):
+        """컬럼 전체 배열 (지표면 그때 전체 계산)"""
+        if name in CandleSeries.COLUMNS:
+            return getattr(self.candles, name)
+        if name not in self.columns:
+            self.columns[name] = self._tail_values(name, len(self))
+        return self.columns[name]
+
+    def last(self, name, back=1):
+        """끝에서 back번째 값 (필요한 끝 구간만 계산)"""
+        if name in CandleSeries.COLUMNS or name not in self.specs:
+            return super().last(name, back)
+        if back > len(self):
+            shape = self.candles.close.shape[:-1]
+            return np.full(shape, np.nan) if shape else np.nan
+        if name in self.columns:
+            return self.columns[name][..., -back]
+
+        key = (name, back)
+        if key not in self.points:
+            kind, period = self.specs[name]
+            if kind == 'macd':
+                self._macd_point(back)
+            else:
+                self.points[key] = self._point_value(kind, period, back)
+        return self.points[key]
+
+    def tail(self, name, count):
+        """최근 count개 값"""
+        if name in self.specs:
+            return self._tail_values(name, min(count, len(self)))
+        return super().tail(name, count)
+
+    def materialize(self):
+        """계획된 지표 컬럼을 전부 계산한 IndicatorFrame"""
+        for name in self.plan.columns:
+            self[name]
+        return IndicatorFrame(self.candles, dict(self.columns))
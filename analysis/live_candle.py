@@ -0,0 +1,72 @@
+# analysis/live_candle.py - 체결 데이터로 진행 중인 1시간봉을 로컬에서 생성
+
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+KST = timezone(timedelta(hours=9))
+
+class LiveCandleBuilder:
+    """마켓별 (과거 확정 봉 + 진행 중인 봉) 시계열 유지"""
+
+    def __init__(self, interval=3600, max_bars=200):
+        self.interval = interval
+        self.max_bars = max_bars
+        self.history = {}   # market → (timestamps, values) 과거 봉
+        self.live = {}      # market → [bucket, open, high, low, close, volume] 진행 중인 봉
+
+    @staticmethod
+    def parse_trade_time(cont_dtm):
+        """빗썸 체결 시각 문자열(KST) → epoch 초"""
+        return datetime.strptime(cont_dtm[:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=KST).timestamp()
+
+    def seed(self, market, timestamps, values):
+        """REST로 받은 과거 봉으로 초기화 (마지막 봉은 진행 중인 봉으로 사용)"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(timestamps):
+            return
+        self.history[market] = (timestamps[:-1][-self.max_bars:], values[:, :-1][:, -self.max_bars:])
+        self.live[market] = [int(timestamps[-1])] + [float(v) for v in values[:, -1]]
+
+    def apply_trade(self, market, price, quantity, trade_time):
+        """체결 1건 반영 (봉이 바뀌면 이전 봉을 확정), 반영된 경우 True"""
+        bucket = int(trade_time // self.interval) * self.interval
+        candle = self.live.get(market)
+
+        if candle is not None and bucket < candle[0]:
+            return False  # 이미 지난 봉의 지연 체결은 무시
+
+        if candle is None or bucket > candle[0]:
+            if candle is not None:
+                self._close_candle(market, candle)
+            self.live[market] = [bucket, price, price, price, price, quantity]
+            return True
+
+        candle[2] = max(candle[2], price)
+        candle[3] = min(candle[3], price)
+        candle[4] = price
+        candle[5] += quantity
+        return True
+
+    def _close_candle(self, market, candle):
+        """진행 중인 봉을 과거 봉으로 확정"""
+        timestamps, values = self.history.get(market, (np.empty(0, np.int64), np.empty((5, 0))))
+        timestamps = np.append(timestamps, candle[0])[-self.max_bars:]
+        values = np.concatenate((values, np.array(candle[1:], dtype=np.float64)[:, None]), axis=1)[:, -self.max_bars:]
+        self.history[market] = (timestamps, values)
+
+    def closed_candle(self, market):
+        """가장 최근 확정 봉 (timestamps, values 마지막 1개) - 저장소 병합용"""
+        timestamps, values = self.history.get(market, (None, None))
+        if timestamps is None or not len(timestamps):
+            return None, None
+        return timestamps[-1:], values[:, -1:]
+
+    def series(self, market, count=200):
+        """과거 봉 + 진행 중인 봉을 합친 최근 count개 (timestamps, values)"""
+        candle = self.live.get(market)
+        timestamps, values = self.history.get(market, (np.empty(0, np.int64), np.empty((5, 0))))
+        if candle is not None:
+            timestamps = np.append(timestamps, candle[0])
+            values = np.concatenate((values, np.array(candle[1:], dtype=np.float64)[:, None]), axis=1)
+        return timestamps[-count:], values[:, -count:]
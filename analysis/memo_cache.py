@@ -0,0 +1,59 @@
+# analysis/memo_cache.py - 지표/신호 계산 결과 메모 캐시 (크기 + 경과 시간 제한 LRU)
+
+import time
+from collections import OrderedDict
+
+class MemoCache:
+    """바뀌지 않은 입력에 대한 계산 결과 재사용 (가장 오래 안 쓴 항목부터 제거)"""
+
+    def __init__(self, max_size=1000, max_age=3600):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._entries = OrderedDict()  # 키 → (저장 시각, 결과)
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, key):
+        """저장된 결과 (없거나 만료되면 None)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if time.monotonic() - entry[0] > self.max_age:
+            del self._entries[key]
+            self.evicted += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        """결과 저장 (크기 초과 시 가장 오래 안 쓴 항목 제거)"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def get_or_compute(self, key, compute):
+        """저장된 결과가 없으면 compute() 결과를 저장 후 반환"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def reset_stats(self):
+        """스캔별 집계를 위해 횟수 초기화"""
+        self.hits = self.misses = self.evicted = 0
+
+    def get_stats(self):
+        """적중/미스/제거 횟수와 현재 항목 수"""
+        return {'hits': self.hits, 'misses': self.misses, 'evicted': self.evicted, 'size': len(self._entries)}
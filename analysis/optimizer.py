@@ -0,0 +1,175 @@
+# analysis/optimizer.py - 신호 파라미터 조합 탐색 (지표 배열 공유 + 표본 단계 가지치기)
+
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analysis.backtester import Backtester, cached_plan, load_hourly, signal_returns
+from analysis.candle_series import CandleSeries, IndicatorFrame
+from analysis.indicator_plan import IndicatorPlan
+from analysis.indicators import TechnicalIndicators
+from analysis.signal_checker import SignalChecker
+from utils.candle_store import CandleStore
+
+# 조합별 집계 컬럼: 신호 수, 수익률 합, 수익 신호 수, 최대 낙폭 합
+STAT_COLUMNS = 4
+
+def shared_frame(candles, plans):
+    """모든 조합이 쓰는 지표를 기간별로 한 번씩만 계산한 IndicatorFrame"""
+    frame = IndicatorFrame(candles)
+    close = candles.close
+    columns = set().union(*(plan.columns for plan in plans))
+
+    for period in sorted({period for plan in plans for period in plan.ma_periods if f"ma{period}" in columns}):
+        frame[f"ma{period}"] = TechnicalIndicators.sma(close, period)
+    if 'rsi' in columns:
+        frame['rsi'] = TechnicalIndicators.rsi(close, plans[0].rsi_period)
+    if columns & {'macd', 'macd_signal', 'macd_histogram'}:
+        frame['macd'], frame['macd_signal'], frame['macd_histogram'] = TechnicalIndicators.windowed_macd(
+            close, *plans[0].macd, plans[0].macd_window)
+    return frame
+
+def sweep_market(task):
+    """한 마켓에서 모든 조합 평가 (프로세스 풀 작업 단위) → (조합 수, STAT_COLUMNS) 집계"""
+    market, base_dir, unit, combo_args, horizon = task
+    stats = np.zeros((len(combo_args), STAT_COLUMNS))
+    try:
+        timestamps, values = load_hourly(CandleStore(base_dir=base_dir, unit=unit), market)
+        plans = [cached_plan(args) for args in combo_args]
+        if timestamps is None or len(timestamps) < min(plan.lookback for plan in plans):
+            return stats
+
+        candles = CandleSeries.from_arrays(timestamps, values)
+        frame = shared_frame(candles, plans)
+        for index, plan in enumerate(plans):
+            if len(candles) < plan.lookback:
+                continue
+            signals, _, _ = SignalChecker.evaluate_history(frame, plan)
+            columns = signal_returns(candles, np.flatnonzero(signals), (horizon,))
+            returns = columns[f"ret_{horizon}h"]
+            finished = ~np.isnan(returns)
+            stats[index] = (finished.sum(), returns[finished].sum(), (returns[finished] > 0).sum(),
+                            columns[f"dd_{horizon}h"][finished].sum())
+        return stats
+
+    except Exception as e:
+        print(f"❌ {market} 파라미터 탐색 오류: {e}")
+        return stats
+
+class ParameterSweep:
+    """signal_config.json 파라미터 조합을 저장된 캔들로 평가해 순위 매김
+
+    grid: {설정 키: [후보 값, ...]} (예: rsi_threshold, ma_periods, max_increase, require_*)
+    표본 마켓으로 먼저 평가해 평균 수익률 하위 조합을 버린 뒤 (keep 비율만 유지) 전체 마켓으로 평가한다.
+    """
+
+    def __init__(self, grid, base_config=None, base_dir="data/candles", unit=60, horizon=24,
+                 workers=None, min_signals=20, keep=0.5, sample=0.25):
+        self.grid = {key: list(values) for key, values in grid.items()}
+        self.base_config = dict(base_config or {})
+        self.base_dir = base_dir
+        self.unit = int(unit)
+        self.horizon = int(horizon)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_signals = min_signals
+        self.keep = keep
+        self.sample = sample
+
+    def combinations(self):
+        """그리드의 모든 파라미터 조합 (설정 키 → 값)"""
+        keys = list(self.grid)
+        return [dict(zip(keys, values)) for values in itertools.product(*(self.grid[key] for key in keys))]
+
+    def _evaluate(self, combos, markets):
+        """조합 × 마켓 평가 → 조합별 집계 합계"""
+        combo_args = [IndicatorPlan.config_args(dict(self.base_config, **combo)) for combo in combos]
+        tasks = [(market, self.base_dir, self.unit, combo_args, self.horizon) for market in markets]
+        if self.workers == 1 or len(tasks) < 2:
+            results = map(sweep_market, tasks)
+            return sum(results, np.zeros((len(combos), STAT_COLUMNS)))
+
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return sum(pool.map(sweep_market, tasks, chunksize=chunksize), np.zeros((len(combos), STAT_COLUMNS)))
+
+    @staticmethod
+    def _mean_returns(stats):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(stats[:, 0] > 0, stats[:, 1] / stats[:, 0], -np.inf)
+
+    def _prune(self, stats):
+        """표본 평균 수익률이 상위 keep 비율에 못 드는 조합 (또는 신호 없는 조합) 제외 → 유지할 인덱스"""
+        scores = self._mean_returns(stats)
+        finite = scores[np.isfinite(scores)]
+        if not len(finite):
+            return list(range(len(scores)))
+        threshold = np.quantile(finite, 1 - self.keep)
+        return [index for index, score in enumerate(scores) if np.isfinite(score) and score >= threshold]
+
+    def run(self, markets=None):
+        """탐색 실행 → 순위 목록 [{rank, params, signals, mean, hit_rate, avg_drawdown}]"""
+        markets = list(markets or Backtester(base_dir=self.base_dir, unit=self.unit).markets())
+        combos = self.combinations()
+        print(f"🔍 파라미터 탐색 시작: {len(combos)}개 조합 × {len(markets)}개 마켓 ({self.horizon}h 수익률 기준)")
+        start_time = time.time()
+
+        # 1단계: 표본 마켓으로 명백히 나쁜 조합 제외
+        step = max(1, round(1 / self.sample)) if self.sample else 1
+        if step > 1 and len(markets) >= 2 * step and len(combos) > 2:
+            sample = markets[::step]
+            kept = self._prune(self._evaluate(combos, sample))
+            print(f"✂️ 표본 {len(sample)}개 마켓 평가: {len(combos)}개 중 {len(kept)}개 조합 유지")
+            combos = [combos[index] for index in kept]
+
+        # 2단계: 남은 조합을 전체 마켓으로 평가
+        stats = self._evaluate(combos, markets)
+        rows = []
+        for combo, (signals, total, hits, drawdown) in zip(combos, stats):
+            rows.append({
+                'params': combo,
+                'signals': int(signals),
+                'mean': total / signals if signals else np.nan,
+                'hit_rate': hits / signals if signals else np.nan,
+                'avg_drawdown': drawdown / signals if signals else np.nan
+            })
+
+        # 신호가 min_signals 이상인 조합을 평균 수익률 순으로, 나머지는 뒤로
+        rows.sort(key=lambda row: (row['signals'] < self.min_signals, -np.nan_to_num(row['mean'], nan=-np.inf)))
+        for rank, row in enumerate(rows, 1):
+            row['rank'] = rank
+
+        print(f"✅ 파라미터 탐색 완료 ({time.time() - start_time:.1f}초)")
+        return rows
+
+    def print_ranking(self, rows, top=20):
+        """순위 표 출력"""
+        print(f"\n🏆 파라미터 순위 ({self.horizon}h 수익률, 최소 신호 {self.min_signals}개)")
+        print("=" * 96)
+        print(f"{'순위':>4} {'신호':>7} {'평균':>8} {'적중률':>7} {'평균 낙폭':>9}  파라미터")
+        for row in rows[:top]:
+            params = ", ".join(f"{key}={value}" for key, value in row['params'].items())
+            marker = "" if row['signals'] >= self.min_signals else " (신호 부족)"
+            print(f"{row['rank']:>4} {row['signals']:>7} {row['mean']:>+8.2%} {row['hit_rate']:>7.1%} "
+                  f"{row['avg_drawdown']:>+9.2%}  {params}{marker}")
+        print("=" * 96)
+
+    @staticmethod
+    def save(rows, path="data/backtest/sweep.json"):
+        """순위 목록을 JSON으로 저장"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False, default=float)
+        print(f"💾 탐색 결과 저장: {path}")
+        return path
+
+    @staticmethod
+    def load(path="data/backtest/sweep.json"):
+        """저장된 순위 목록 로드 (없으면 None)"""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
@@ -0,0 +1,488 @@
+# analysis/rule_engine.py - signal_config.json 규칙 정의를 벡터 조건식으로 컴파일하는 신호 규칙 엔진
+
+import numpy as np
+
+CANDLE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+COMPARE_OPS = {
+    '>': np.greater, '>=': np.greater_equal, '<': np.less,
+    '<=': np.less_equal, '==': np.equal, '!=': np.not_equal,
+}
+
+# 부정 연산자 (NaN은 양쪽 모두 거짓으로 취급해 기존 체크와 같은 결과)
+NEGATED_OPS = {'>': '<=', '>=': '<', '<': '>=', '<=': '>', '==': '!=', '!=': '=='}
+
+# 규칙에서 쓰는 설정값 기본값 ("$이름"으로 참조)
+DEFAULT_PARAMS = {'rsi_threshold': 45, 'max_increase': 0.20}
+
+# 규칙 형식 (signal_config.json "signal_rules"):
+#   비교     {"compare": [왼쪽, ">", 오른쪽], "missing": true(값이 없으면 통과)}
+#   돌파     {"cross": [왼쪽, "above"|"below", 오른쪽], "within": N}  최근 N봉 안에 돌파
+#   전환     {"became": 규칙, "bars": N}  지금은 만족, N봉 전에는 불만족
+#   묶음     {"all": [...]}, {"any": [...]}, {"k_of_n": [...], "k": 2}, {"not": 규칙}
+#   피연산자 숫자, "$설정값", 컬럼 (close, rsi, macd, ma25, 별칭 ma_fast/ma_mid/ma_slow/ma_long),
+#            {"col": 컬럼, "back": N}, {"coalesce": [...]}, {"change": 컬럼, "bars": N}
+#   "name"을 붙인 규칙은 조건별 결과로 알림에 표시된다.
+
+# 기존 5가지 조건과 같은 기본 규칙 (MACD는 직전 봉 대비 실제 골든크로스만 인정)
+DEFAULT_RULES = {
+    "all": [
+        {"name": "ma_breakout", "became": {"all": [
+            {"compare": ["ma_fast", ">", "ma_slow"]},
+            {"compare": ["ma_fast", ">", {"coalesce": ["ma_long", "ma_slow"]}]},
+            {"compare": ["ma_mid", ">", "ma_slow"]},
+            {"compare": ["ma_mid", ">", {"coalesce": ["ma_long", "ma_slow"]}]}
+        ]}, "bars": 9},
+        {"name": "rsi_above_45", "compare": ["rsi", ">=", "$rsi_threshold"]},
+        {"name": "macd_golden_cross", "cross": ["macd", "above", "macd_signal"], "within": 1},
+        {"name": "price_above_ma25", "compare": ["close", ">", "ma_mid"]},
+        {"name": "not_overextended", "compare": [{"change": "close", "bars": 23}, "<=", "$max_increase"],
+         "missing": True}
+    ]
+}
+
+def column_cost(name):
+    """컬럼 조회 비용 추정 (캔들 < 이동평균/RSI < MACD 계열)"""
+    if name in CANDLE_COLUMNS:
+        return 1
+    if name.startswith('macd'):
+        return 6
+    return 2
+
+class LastBarSource:
+    """최신 봉 기준 값 조회 (단일 마켓이면 스칼라, 배치면 마켓별 배열)"""
+
+    complete = False  # 모든 마켓이 탈락하면 나머지 조건 생략
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.shape = np.shape(frame.last('close'))
+
+    def value(self, column, back=0):
+        return self.frame.last(column, back + 1)
+
+class HistorySource:
+    """모든 봉 기준 값 조회 - back봉 전 값을 한 칸씩 민 배열 (시계열 앞쪽은 NaN)
+
+    complete=True면 생략 없이 모든 조건을 계산한다 (백테스트/튜닝용 조건별 배열).
+    window를 주면 각 봉에서 최근 window봉만 받은 스캔처럼, 그 창 밖의 봉이 필요한 값
+    (need(컬럼) + back > window) 은 NaN으로 본다 (대체 값/missing 처리가 스캔과 같아짐).
+    """
+
+    def __init__(self, frame, complete=True, window=None, need=None):
+        self.frame = frame
+        self.complete = complete
+        self.window = window
+        self.need = need
+        self.shape = np.shape(frame['close'])
+        self.shifted = {}  # (컬럼, back) → 배열
+
+    def value(self, column, back=0):
+        key = (column, back)
+        if key not in self.shifted:
+            result = np.full(self.shape, np.nan)
+            if self.window is None or self.need(column) + back <= self.window:
+                values = np.asarray(self.frame[column], dtype=np.float64)
+                length = self.shape[-1]
+                # result[t] = values[t - start] (지표 컬럼이 캔들보다 짧으면 끝에 맞춤)
+                start = back + length - values.shape[-1]
+                if start < length:
+                    result[..., start:] = values[..., :length - start]
+            self.shifted[key] = result
+        return self.shifted[key]
+
+# ---------------------------------------------------------------- 피연산자
+
+class Constant:
+    __slots__ = ('number',)
+
+    def __init__(self, number):
+        self.number = float(number)
+
+    def value(self, source, back=0):
+        return self.number
+
+    def cost(self):
+        return 0
+
+    def lookback(self, need, back=0):
+        return 0
+
+    def columns(self):
+        return ()
+
+    def max_back(self):
+        return 0
+
+class Column:
+    __slots__ = ('name', 'back')
+
+    def __init__(self, name, back=0):
+        self.name = name
+        self.back = int(back)
+
+    def value(self, source, back=0):
+        return source.value(self.name, self.back + back)
+
+    def cost(self):
+        return column_cost(self.name)
+
+    def lookback(self, need, back=0):
+        return need(self.name) + self.back + back
+
+    def columns(self):
+        return (self.name,)
+
+    def max_back(self):
+        return self.back
+
+class Coalesce:
+    """첫 번째로 값이 있는 피연산자 (예: 200일선이 없으면 99일선)"""
+
+    __slots__ = ('options',)
+
+    def __init__(self, options):
+        self.options = options
+
+    def value(self, source, back=0):
+        result = self.options[0].value(source, back)
+        for option in self.options[1:]:
+            result = np.where(np.isnan(result), option.value(source, back), result)
+        return result
+
+    def cost(self):
+        return sum(option.cost() for option in self.options)
+
+    def lookback(self, need, back=0):
+        # 최신 봉에서는 첫 번째 값이 있어야 하고, 과거 봉은 대체 값으로 충분
+        return max(self.options[0].lookback(need), min(option.lookback(need, back) for option in self.options))
+
+    def columns(self):
+        return tuple(name for option in self.options for name in option.columns())
+
+    def max_back(self):
+        return max(option.max_back() for option in self.options)
+
+class Change:
+    """bars봉 전 대비 변화율"""
+
+    __slots__ = ('column', 'bars')
+
+    def __init__(self, column, bars):
+        self.column = column
+        self.bars = int(bars)
+
+    def value(self, source, back=0):
+        current = self.column.value(source, back)
+        previous = self.column.value(source, back + self.bars)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (current - previous) / previous
+
+    def cost(self):
+        return 2 * self.column.cost()
+
+    def lookback(self, need, back=0):
+        return self.column.lookback(need, back + self.bars)
+
+    def columns(self):
+        return self.column.columns()
+
+    def max_back(self):
+        return self.column.max_back() + self.bars
+
+# ---------------------------------------------------------------- 조건 노드
+
+class Node:
+    """조건 노드 (name이 있으면 조건별 결과로 기록)"""
+
+    name = None
+
+    def evaluate(self, source, back=0, record=None):
+        result = np.asarray(self._evaluate(source, back, record), dtype=bool)
+        if self.name and record is not None and back == 0:
+            record[self.name] = result
+        return result
+
+    def negate(self):
+        return Not(self)
+
+class Compare(Node):
+    def __init__(self, left, op, right, missing=False):
+        if op not in COMPARE_OPS:
+            raise ValueError(f"지원하지 않는 비교 연산자: {op}")
+        self.left, self.op, self.right = left, op, right
+        self.missing = missing  # True면 값이 없을 때 (데이터 부족) 통과
+
+    def _evaluate(self, source, back, record):
+        left, right = self.left.value(source, back), self.right.value(source, back)
+        with np.errstate(invalid='ignore'):
+            result = COMPARE_OPS[self.op](left, right)
+        if self.op == '!=':
+            result = result & ~(np.isnan(left) | np.isnan(right))
+        if self.missing:
+            result = result | np.isnan(left) | np.isnan(right)
+        return result
+
+    def negate(self):
+        return Compare(self.left, NEGATED_OPS[self.op], self.right)
+
+    def cost(self):
+        return self.left.cost() + self.right.cost()
+
+    def lookback(self, need, back=0):
+        return max(self.left.lookback(need, back), self.right.lookback(need, back))
+
+    def columns(self):
+        return self.left.columns() + self.right.columns()
+
+    def max_back(self):
+        return max(self.left.max_back(), self.right.max_back())
+
+class Not(Node):
+    def __init__(self, child):
+        self.child = child
+
+    def _evaluate(self, source, back, record):
+        return ~self.child.evaluate(source, back, record)
+
+    def negate(self):
+        return self.child
+
+    def cost(self):
+        return self.child.cost()
+
+    def lookback(self, need, back=0):
+        return self.child.lookback(need, back)
+
+    def columns(self):
+        return self.child.columns()
+
+    def max_back(self):
+        return self.child.max_back()
+
+class Group(Node):
+    """자식 조건 묶음 - 비용 대비 판정력이 좋은 조건부터 평가하도록 통계로 순서 조정"""
+
+    def __init__(self, children):
+        self.children = list(children)
+        self.stats = {id(child): [0, 0] for child in self.children}  # 통과 수, 평가 수
+
+    def _pass_rate(self, child):
+        passed, seen = self.stats[id(child)]
+        return (passed + 1) / (seen + 2)
+
+    def _ordered(self, rejecting):
+        """rejecting=True면 잘 떨어뜨리는 조건, False면 잘 통과시키는 조건 우선"""
+        def rank(child):
+            rate = self._pass_rate(child)
+            return child.cost() / max(1 - rate if rejecting else rate, 0.05)
+        return sorted(self.children, key=rank)
+
+    def _observe(self, child, result):
+        stats = self.stats[id(child)]
+        stats[0] += int(np.count_nonzero(result))
+        stats[1] += result.size
+
+    def cost(self):
+        return sum(child.cost() for child in self.children)
+
+    def lookback(self, need, back=0):
+        return max((child.lookback(need, back) for child in self.children), default=0)
+
+    def columns(self):
+        return tuple(name for child in self.children for name in child.columns())
+
+    def max_back(self):
+        return max((child.max_back() for child in self.children), default=0)
+
+class All(Group):
+    def _evaluate(self, source, back, record):
+        result = np.ones(source.shape, dtype=bool)
+        for child in self._ordered(rejecting=True):
+            value = child.evaluate(source, back, record)
+            self._observe(child, value)
+            result &= value
+            if not source.complete and not result.any():
+                break  # 모든 마켓 탈락 → 나머지 조건 생략
+        return result
+
+    def negate(self):
+        return Any([child.negate() for child in self.children])
+
+class Any(Group):
+    def _evaluate(self, source, back, record):
+        result = np.zeros(source.shape, dtype=bool)
+        for child in self._ordered(rejecting=False):
+            value = child.evaluate(source, back, record)
+            self._observe(child, value)
+            result |= value
+            if not source.complete and result.all():
+                break
+        return result
+
+    def negate(self):
+        return All([child.negate() for child in self.children])
+
+class KOfN(Group):
+    def __init__(self, children, k):
+        super().__init__(children)
+        self.k = int(k)
+
+    def _evaluate(self, source, back, record):
+        count = np.zeros(source.shape, dtype=np.int64)
+        remaining = len(self.children)
+        for child in self._ordered(rejecting=False):
+            value = child.evaluate(source, back, record)
+            self._observe(child, value)
+            count += value
+            remaining -= 1
+            # 모든 위치가 이미 k개를 채웠거나 남은 조건으로 채울 수 없으면 중단
+            if not source.complete and ((count >= self.k) | (count + remaining < self.k)).all():
+                break
+        return count >= self.k
+
+    def negate(self):
+        return KOfN([child.negate() for child in self.children], len(self.children) - self.k + 1)
+
+class Became(Node):
+    """지금은 조건을 만족하고 bars봉 전에는 만족하지 않았음 (예: 최근 10시간 내 돌파)"""
+
+    def __init__(self, rule, bars):
+        self.rule = rule
+        self.negated = rule.negate()
+        self.bars = int(bars)
+
+    def _evaluate(self, source, back, record):
+        result = self.rule.evaluate(source, back, record)
+        if result.any():
+            result = result & self.negated.evaluate(source, back + self.bars)
+        return result
+
+    def cost(self):
+        return self.rule.cost() + self.negated.cost()
+
+    def lookback(self, need, back=0):
+        return max(self.rule.lookback(need, back), self.negated.lookback(need, back + self.bars))
+
+    def columns(self):
+        return self.rule.columns()
+
+    def max_back(self):
+        return self.rule.max_back() + self.bars
+
+class Cross(Node):
+    """left가 right를 최근 within봉 안에 상향(above)/하향(below) 돌파"""
+
+    def __init__(self, left, direction, right, within=1):
+        if direction not in ('above', 'below'):
+            raise ValueError(f"돌파 방향은 above/below 중 하나여야 합니다: {direction}")
+        self.now = Compare(left, '>' if direction == 'above' else '<', right)
+        self.before = self.now.negate()
+        self.within = int(within)
+
+    def _evaluate(self, source, back, record):
+        result = self.now.evaluate(source, back)
+        if not result.any():
+            return result
+        crossed = np.zeros(result.shape, dtype=bool)
+        for offset in range(1, self.within + 1):
+            crossed |= self.before.evaluate(source, back + offset)
+        return result & crossed
+
+    def cost(self):
+        return (self.within + 1) * self.now.cost()
+
+    def lookback(self, need, back=0):
+        return self.now.lookback(need, back + self.within)
+
+    def columns(self):
+        return self.now.columns()
+
+    def max_back(self):
+        return self.now.max_back() + self.within
+
+# ---------------------------------------------------------------- 컴파일
+
+class RuleSet:
+    """규칙 정의 (dict) → 조건 노드 트리
+
+    aliases: 컬럼 별칭 (예: ma_mid → ma25), params: "$이름" 설정값,
+    disabled: 사용하지 않는 이름 붙은 조건 (require_* 설정으로 끈 조건)
+    """
+
+    def __init__(self, definition=None, aliases=None, params=None, disabled=()):
+        self.definition = definition or DEFAULT_RULES
+        self.aliases = aliases or {}
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        self.disabled = set(disabled)
+        self.names = []
+        self.root = self._compile_node(self.definition) or All([])
+
+    def _compile_operand(self, spec):
+        if isinstance(spec, bool):
+            raise ValueError(f"잘못된 피연산자: {spec}")
+        if isinstance(spec, (int, float)):
+            return Constant(spec)
+        if isinstance(spec, str):
+            if spec.startswith('$'):
+                if spec[1:] not in self.params:
+                    raise ValueError(f"알 수 없는 설정값: {spec}")
+                return Constant(self.params[spec[1:]])
+            return Column(self.aliases.get(spec, spec))
+        if isinstance(spec, dict):
+            if 'col' in spec:
+                return Column(self.aliases.get(spec['col'], spec['col']), spec.get('back', 0))
+            if 'coalesce' in spec:
+                return Coalesce([self._compile_operand(option) for option in spec['coalesce']])
+            if 'change' in spec:
+                return Change(self._compile_operand(spec['change']), spec.get('bars', 1))
+        raise ValueError(f"잘못된 피연산자: {spec}")
+
+    def _compile_children(self, specs):
+        return [node for node in (self._compile_node(spec) for spec in specs) if node is not None]
+
+    def _compile_node(self, spec):
+        name = spec.get('name')
+        if name in self.disabled:
+            return None
+
+        if 'all' in spec:
+            node = All(self._compile_children(spec['all']))
+        elif 'any' in spec:
+            node = Any(self._compile_children(spec['any']))
+        elif 'k_of_n' in spec:
+            node = KOfN(self._compile_children(spec['k_of_n']), spec.get('k', 1))
+        elif 'not' in spec:
+            node = Not(self._compile_node(spec['not']))
+        elif 'compare' in spec:
+            left, op, right = spec['compare']
+            node = Compare(self._compile_operand(left), op, self._compile_operand(right), spec.get('missing', False))
+        elif 'cross' in spec:
+            left, direction, right = spec['cross']
+            node = Cross(self._compile_operand(left), direction, self._compile_operand(right), spec.get('within', 1))
+        elif 'became' in spec:
+            node = Became(self._compile_node(spec['became']), spec.get('bars', 1))
+        else:
+            raise ValueError(f"알 수 없는 규칙: {spec}")
+
+        if name:
+            node.name = name
+            self.names.append(name)
+        return node
+
+    def evaluate(self, source):
+        """(신호 여부, 조건 이름 → 결과) - 생략된 조건은 결과에 없음"""
+        record = {}
+        return self.root.evaluate(source, 0, record), record
+
+    def columns(self):
+        """규칙이 참조하는 컬럼 (중복 제거)"""
+        return tuple(dict.fromkeys(self.root.columns()))
+
+    def lookback(self, need):
+        """규칙 평가에 필요한 최소 봉 수 (need: 컬럼 → 값이 생기는 데 필요한 봉 수)"""
+        return self.root.lookback(need)
+
+    def max_back(self):
+        """규칙이 참조하는 가장 먼 과거 봉 (최신 봉 = 0)"""
+        return self.root.max_back()
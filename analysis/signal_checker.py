@@ -1,39 +1,46 @@
 # analysis/signal_checker.py - 완전한 5가지 신호 조건 체크
 
-import pandas as pd
 import numpy as np
 
+from analysis.candle_series import IndicatorFrame
+from analysis.indicator_plan import DEFAULT_PLAN
+from analysis.rule_engine import HistorySource, LastBarSource
+
 class SignalChecker:
     """완전한 5가지 신호 조건 체크 (20% 상승 제한 포함)"""
     
     @staticmethod
-    def check_moving_average_breakout(df):
-        """9일선, 25일선이 99일선, 200일선을 최근 10시간 내 돌파했는지 확인"""
+    def _long_ma(frame, plan, back=1):
+        """200일선 (없을 경우 99일선으로 대체)"""
+        ma200 = frame.last(plan.ma_long, back)
+        return ma200 if not np.isnan(ma200) else frame.last(plan.ma_slow, back)
+    
+    @staticmethod
+    def check_moving_average_breakout(df, plan=None):
+        """9일선, 25일선이 99일선, 200일선을 최근 10시간 내 돌파했는지 확인 (기간은 plan 설정)"""
         try:
             # 최근 10개 봉 데이터 (10시간)
-            recent_data = df.iloc[-10:]
-            
-            if len(recent_data) < 10:
+            plan = plan or DEFAULT_PLAN
+            frame = IndicatorFrame.wrap(df)
+            if len(frame) < 10:
                 return False
             
             # 현재 시점에서는 돌파 상태여야 함
-            latest = recent_data.iloc[-1]
+            ma9, ma25, ma99 = frame.last(plan.ma_fast), frame.last(plan.ma_mid), frame.last(plan.ma_slow)
+            target_ma_long = SignalChecker._long_ma(frame, plan)
             
-            # 200일선이 없을 경우 99일선으로 대체
-            target_ma_long = latest['ma200'] if not pd.isna(latest['ma200']) else latest['ma99']
-            
-            ma9_above = latest['ma9'] > latest['ma99'] and latest['ma9'] > target_ma_long
-            ma25_above = latest['ma25'] > latest['ma99'] and latest['ma25'] > target_ma_long
+            ma9_above = ma9 > ma99 and ma9 > target_ma_long
+            ma25_above = ma25 > ma99 and ma25 > target_ma_long
             
             if not (ma9_above and ma25_above):
                 return False
             
             # 10시간 전에는 돌파하지 않은 상태였는지 확인
-            oldest = recent_data.iloc[0]
-            oldest_target_ma = oldest['ma200'] if not pd.isna(oldest['ma200']) else oldest['ma99']
+            ma9, ma25, ma99 = frame.last(plan.ma_fast, 10), frame.last(plan.ma_mid, 10), frame.last(plan.ma_slow, 10)
+            oldest_target_ma = SignalChecker._long_ma(frame, plan, 10)
             
-            ma9_was_below = oldest['ma9'] <= oldest['ma99'] or oldest['ma9'] <= oldest_target_ma
-            ma25_was_below = oldest['ma25'] <= oldest['ma99'] or oldest['ma25'] <= oldest_target_ma
+            ma9_was_below = ma9 <= ma99 or ma9 <= oldest_target_ma
+            ma25_was_below = ma25 <= ma99 or ma25 <= oldest_target_ma
             
             return ma9_was_below or ma25_was_below
             
@@ -45,8 +52,8 @@ class SignalChecker:
     def check_rsi_condition(df, threshold=45):
         """RSI가 45 이상인지 확인"""
         try:
-            latest_rsi = df.iloc[-1]['rsi']
-            return not pd.isna(latest_rsi) and latest_rsi >= threshold
+            latest_rsi = IndicatorFrame.wrap(df).last('rsi')
+            return not np.isnan(latest_rsi) and latest_rsi >= threshold
             
         except Exception as e:
             print(f"RSI 체크 오류: {e}")
@@ -56,26 +63,24 @@ class SignalChecker:
     def check_macd_golden_cross(df):
         """MACD 골든크로스 확인"""
         try:
-            latest = df.iloc[-1]
-            previous = df.iloc[-2]
+            frame = IndicatorFrame.wrap(df)
             
             # 현재 MACD가 시그널선 위에 있고, 이전에는 아래에 있었는지
-            current_above = latest['macd'] > latest['macd_signal']
-            previous_below = previous['macd'] <= previous['macd_signal']
+            current_above = frame.last('macd') > frame.last('macd_signal')
+            previous_below = frame.last('macd', 2) <= frame.last('macd_signal', 2)
             
-            # 또는 현재 MACD가 시그널선 위에 있는 상태 유지
-            return current_above and (previous_below or True)
+            return current_above and previous_below
             
         except Exception as e:
             print(f"MACD 골든크로스 체크 오류: {e}")
             return False
     
     @staticmethod
-    def check_price_above_ma25(df):
-        """가격이 25일선 위에 있는지 확인"""
+    def check_price_above_ma25(df, plan=None):
+        """가격이 25일선 위에 있는지 확인 (기간은 plan 설정)"""
         try:
-            latest = df.iloc[-1]
-            return latest['close'] > latest['ma25']
+            frame = IndicatorFrame.wrap(df)
+            return frame.last('close') > frame.last((plan or DEFAULT_PLAN).ma_mid)
             
         except Exception as e:
             print(f"가격 vs 25일선 체크 오류: {e}")
@@ -85,11 +90,12 @@ class SignalChecker:
     def check_price_increase_limit(df, max_increase=0.20):
         """24시간 상승률이 20% 이하인지 확인 (이미 상승한 것 제외)"""
         try:
-            if len(df) < 24:
+            frame = IndicatorFrame.wrap(df)
+            if len(frame) < 24:
                 return True  # 데이터 부족시 통과
             
-            current_price = df.iloc[-1]['close']
-            price_24h_ago = df.iloc[-24]['close']
+            current_price = frame.last('close')
+            price_24h_ago = frame.last('close', 24)
             
             increase_rate = (current_price - price_24h_ago) / price_24h_ago
             return increase_rate <= max_increase  # 20% 이하만 통과
@@ -99,47 +105,114 @@ class SignalChecker:
             return True
     
     @staticmethod
-    def check_all_conditions(df):
-        """완전한 5가지 조건 체크"""
+    def check_timeframe_confirmation(frames, ma_period=9):
+        """상위/하위 타임프레임에서도 종가가 이동평균 위인지 확인 (frames: {분: (타임스탬프, OHLCV)})"""
         try:
-            # 데이터 유효성 확인
-            if len(df) < 200:
-                return False, "데이터 부족"
+            for timeframe, (timestamps, values) in frames.items():
+                close = values[3]
+                if len(close) < ma_period:
+                    continue  # 데이터 부족시 통과
+                
+                if close[-1] <= close[-ma_period:].mean():
+                    return False
             
-            # 5가지 조건 체크
-            conditions = {
-                'ma_breakout': SignalChecker.check_moving_average_breakout(df),  # 최근 10시간 내 돌파
-                'rsi_above_45': SignalChecker.check_rsi_condition(df),  # RSI 45 이상
-                'macd_golden_cross': SignalChecker.check_macd_golden_cross(df),  # MACD 골든크로스
-                'price_above_ma25': SignalChecker.check_price_above_ma25(df),  # 가격이 25일선 위
-                'not_overextended': SignalChecker.check_price_increase_limit(df)  # 24시간 상승률 20% 이하
-            }
+            return True
             
-            # 모든 조건 만족 여부
-            all_satisfied = all(conditions.values())
+        except Exception as e:
+            print(f"타임프레임 확인 오류: {e}")
+            return False
+    
+    @staticmethod
+    def check_all_conditions(df, plan=None):
+        """plan의 신호 규칙 체크 (기본: 완전한 5가지 조건, 저렴하고 잘 걸러내는 조건부터 평가)"""
+        try:
+            # 데이터 유효성 확인 (DataFrame은 한 번만 변환)
+            plan = plan or DEFAULT_PLAN
+            frame = IndicatorFrame.wrap(df)
+            if len(frame) < plan.lookback:
+                return False, "데이터 부족"
+            
+            # 규칙 평가 (중간에 탈락하면 나머지 조건은 결과에 없음)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                all_satisfied, conditions = plan.rules.evaluate(LastBarSource(frame))
+            conditions = {name: bool(value) for name, value in conditions.items()}
             
             # 분석 데이터 추출
-            latest = df.iloc[-1]
+            current_price = frame.last('close')
             
             # 24시간 상승률 계산
-            price_24h_ago = df.iloc[-24]['close'] if len(df) >= 24 else latest['close']
-            increase_24h = ((latest['close'] - price_24h_ago) / price_24h_ago * 100) if price_24h_ago > 0 else 0
+            price_24h_ago = frame.last('close', 24) if len(frame) >= 24 else current_price
+            increase_24h = ((current_price - price_24h_ago) / price_24h_ago * 100) if price_24h_ago > 0 else 0
             
             analysis_data = {
-                'rsi': latest['rsi'],
-                'ma25': latest['ma25'],
-                'macd': latest['macd'],
-                'current_price': latest['close'],
+                'rsi': frame.last('rsi'),
+                'ma25': frame.last(plan.ma_mid),
+                'macd': frame.last('macd') if 'macd' in frame else np.nan,
+                'current_price': current_price,
                 'increase_24h': increase_24h,
                 'conditions': conditions
             }
             
-            return all_satisfied, analysis_data
+            return bool(all_satisfied), analysis_data
             
         except Exception as e:
             print(f"신호 조건 체크 오류: {e}")
             return False, str(e)
-    
+
+    @staticmethod
+    def check_all_conditions_batch(frame, plan=None):
+        """배치 IndicatorFrame (마켓 × 시간) 의 규칙을 마켓별 불리언 배열로 체크 → (신호 배열, 조건별 배열)"""
+        plan = plan or DEFAULT_PLAN
+        with np.errstate(invalid='ignore', divide='ignore'):
+            signals, conditions = plan.rules.evaluate(LastBarSource(frame))
+
+        if len(frame) < plan.lookback:
+            signals = np.zeros(signals.shape, dtype=bool)
+        return signals, conditions
+
+    @staticmethod
+    def check_history(df, plan=None):
+        """모든 봉의 규칙을 한 번에 체크 → (봉별 신호 배열, 조건별 배열, 첫 신호 인덱스)
+
+        각 봉의 결과는 스캔처럼 그 봉까지 최근 plan.lookback개 캔들로 check_all_conditions를 실행한
+        것과 같다 (lookback봉이 안 되는 앞 구간은 데이터 부족으로 신호 없음). 창 밖 봉이 필요한 값은
+        없는 값으로 보고, MACD 계열은 모든 경로가 봉마다 최근 plan.macd_window개 종가로 계산한다.
+        신호가 없으면 인덱스는 -1, 배치 (마켓 × 시간) 면 마켓별 배열.
+        """
+        plan = plan or DEFAULT_PLAN
+        frame = plan.compute(IndicatorFrame(IndicatorFrame.wrap(df).candles))
+        return SignalChecker.evaluate_history(frame, plan)
+
+    @staticmethod
+    def evaluate_history(frame, plan=None):
+        """지표 컬럼이 전체 구간으로 계산된 IndicatorFrame의 모든 봉 체크 (check_history와 같은 결과)
+
+        여러 계획이 같은 지표 배열을 공유할 때 (파라미터 탐색) 지표를 다시 계산하지 않는다.
+        """
+        plan = plan or DEFAULT_PLAN
+        with np.errstate(invalid='ignore', divide='ignore'):
+            signals, conditions = plan.rules.evaluate(HistorySource(frame, window=plan.lookback, need=plan.bars_needed))
+
+        signals = signals & (np.arange(signals.shape[-1]) >= plan.lookback - 1)
+        first_index = np.where(signals.any(axis=-1), signals.argmax(axis=-1), -1)
+        return signals, conditions, (int(first_index) if signals.ndim == 1 else first_index)
+
+    @staticmethod
+    def batch_analysis(frame, conditions, index, plan=None):
+        """배치 결과에서 index번째 마켓의 분석 데이터 (check_all_conditions와 같은 형식)"""
+        current_price = frame.last('close')[index]
+        price_24h_ago = frame.last('close', 24)[index] if len(frame) >= 24 else current_price
+        increase_24h = ((current_price - price_24h_ago) / price_24h_ago * 100) if price_24h_ago > 0 else 0
+
+        return {
+            'rsi': frame.last('rsi')[index],
+            'ma25': frame.last((plan or DEFAULT_PLAN).ma_mid)[index],
+            'macd': frame.last('macd')[index] if 'macd' in frame else np.nan,
+            'current_price': current_price,
+            'increase_24h': increase_24h,
+            'conditions': {name: bool(values[index]) for name, values in conditions.items()}
+        }
+
     @staticmethod
     def get_condition_summary(conditions):
         """조건별 만족 여부 요약"""
@@ -149,11 +222,15 @@ class SignalChecker:
             'rsi_above_45': 'RSI 45 이상',
             'macd_golden_cross': 'MACD 골든크로스',
             'price_above_ma25': '가격이 25일선 위',
-            'not_overextended': '24시간 상승률 20% 이하'
+            'not_overextended': '24시간 상승률 20% 이하',
+            'mtf_confirmed': '멀티 타임프레임 추세 확인'
         }
         
-        for key, name in condition_names.items():
-            status = "✓" if conditions.get(key, False) else "✗"
-            summary.append(f"{name}: {status}")
+        # 기본 조건은 정해진 순서로, 사용자 규칙 조건은 이름 그대로 표시
+        keys = [key for key in condition_names if key in conditions]
+        keys += [key for key in conditions if key not in condition_names]
+        for key in keys:
+            status = "✓" if conditions[key] else "✗"
+            summary.append(f"{condition_names.get(key, key)}: {status}")
         
         return summary
@@ -0,0 +1,72 @@
+# analysis/ticker_prefilter.py - ALL_KRW 티커만으로 불가능한 마켓을 캔들 조회 전에 제외하는 사전 필터
+
+from analysis.rule_engine import COMPARE_OPS, All, Change, Column, Compare, Constant
+
+# 24시간 등락률로 대신 판정할 수 있는 변화율 구간 (1시간봉 기준 봉 수)
+DAILY_BARS = range(20, 29)
+
+class TickerPrefilter:
+    """활성 규칙의 필수 조건 중 티커로 판정 가능한 조건 (24시간 상승률, 현재가 범위) 으로 마켓 제외
+
+    티커의 24시간 등락률은 캔들 기준 변화율과 기준 시점/가격이 다르고, 그 차이의 상한은
+    티커만으로 알 수 없다 (기준 시점 사이 가격 변동만큼 벌어질 수 있음). margin은 보장이 아니라
+    경험적 여유값이므로 변동이 큰 마켓에서는 규칙을 만족할 마켓이 드물게 제외될 수 있다.
+    값이 없으면 통과하는 조건 (missing) 은 스캔이 plan.lookback봉 미만 마켓을 이미 제외하므로
+    참조하는 봉이 lookback 안에 있으면 값이 항상 있어 일반 조건처럼 판정한다.
+    """
+
+    def __init__(self, plan, margin=0.05, min_trade_value=0):
+        self.margin = margin
+        self.min_trade_value = min_trade_value
+        self.lookback = plan.lookback
+        self.checks = list(self._compile(plan.rules.root))
+
+    @staticmethod
+    def _mandatory(node):
+        """반드시 만족해야 하는 조건 (최상위 all 묶음을 따라 내려감)"""
+        yield node
+        if isinstance(node, All):
+            for child in node.children:
+                yield from TickerPrefilter._mandatory(child)
+
+    def _loosen(self, op, value, slack):
+        """만족 가능한 쪽으로 기준값 완화"""
+        return value + slack if op in ('<', '<=') else value - slack
+
+    def _compile(self, root):
+        """규칙 트리 → [(조건 이름, 티커 필드, 연산자, 완화된 기준값)]"""
+        for node in self._mandatory(root):
+            if (not isinstance(node, Compare) or not isinstance(node.right, Constant) or node.op in ('==', '!=')
+                    or (node.missing and node.left.max_back() >= self.lookback)):
+                continue
+            left, value = node.left, node.right.number
+
+            if (isinstance(left, Change) and isinstance(left.column, Column) and left.column.name == 'close'
+                    and left.column.back == 0 and left.bars in DAILY_BARS):
+                yield node.name or 'change_24h', 'signed_change_rate', node.op, self._loosen(node.op, value, self.margin)
+            elif isinstance(left, Column) and left.name == 'close' and left.back == 0:
+                yield node.name or 'price', 'trade_price', node.op, self._loosen(node.op, value, abs(value) * self.margin)
+
+    def describe(self):
+        """적용되는 조건 요약"""
+        parts = [f"{name} ({field} {op} {value:g})" for name, field, op, value in self.checks]
+        if self.min_trade_value:
+            parts.append(f"24시간 거래대금 >= {self.min_trade_value:,.0f}")
+        return ", ".join(parts) if parts else "없음"
+
+    def apply(self, tickers):
+        """티커 목록 → (남은 티커, {제외 사유: 마켓 목록})"""
+        kept = []
+        skipped = {}
+        for ticker in tickers:
+            reason = None
+            if self.min_trade_value and ticker.get('acc_trade_price_24h', 0) < self.min_trade_value:
+                reason = 'min_trade_value'
+            for name, field, op, value in self.checks:
+                if reason is None and field in ticker and not COMPARE_OPS[op](ticker[field], value):
+                    reason = name
+            if reason is None:
+                kept.append(ticker)
+            else:
+                skipped.setdefault(reason, []).append(ticker['market'])
+        return kept, skipped
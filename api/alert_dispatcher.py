@@ -0,0 +1,293 @@
+# api/alert_dispatcher.py - 디스코드 알림 백그라운드 발송 (임베드 묶음 발송, 429/버킷 헤더 준수, 영속 대기열)
+
+import json
+import os
+import queue
+import threading
+import time
+
+from api.http_transport import THROTTLE_STATUS, HttpTransport
+
+# 디스코드 웹훅 제한: 메시지당 임베드 10개, 임베드 전체 글자 수 6000자
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+def embed_chars(embed):
+    """디스코드가 제한에 포함하는 임베드 글자 수"""
+    total = len(embed.get('title', '')) + len(embed.get('description', ''))
+    total += len(embed.get('footer', {}).get('text', '')) + len(embed.get('author', {}).get('name', ''))
+    for field in embed.get('fields', []):
+        total += len(field.get('name', '')) + len(field.get('value', ''))
+    return total
+
+class AlertOutbox:
+    """발송 전 알림을 보관하는 추가 전용 JSONL 파일 (비정상 종료 후 다음 실행에서 재발송)
+
+    한 줄에 {"id", "label", "embed"} (대기) 또는 {"ack": [id, ...]} (발송 완료/폐기) 를 기록하고
+    시작할 때와 대기 중인 알림이 없을 때 남은 알림만 다시 써서 파일을 줄인다.
+    """
+
+    def __init__(self, path="data/alert_outbox.jsonl"):
+        self.path = path
+        self.pending = {}  # id → (label, embed), 삽입 순서 = 발송 순서
+        self.next_id = 1
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """파일에서 미발송 알림 복원 → [(id, label, embed)]"""
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # 기록 중 끊긴 마지막 줄
+                        if 'ack' in record:
+                            for alert_id in record['ack']:
+                                self.pending.pop(alert_id, None)
+                        else:
+                            self.pending[record['id']] = (record.get('label', ''), record['embed'])
+            except Exception as e:
+                print(f"⚠️ 알림 대기열 파일 로드 실패: {e}")
+        self.next_id = max(self.pending, default=0) + 1
+        self.compact()
+        return [(alert_id, label, embed) for alert_id, (label, embed) in self.pending.items()]
+
+    def _write(self, record):
+        if not self.path:
+            return
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+        self._file.flush()
+
+    def add(self, label, embed):
+        """알림 기록 → id"""
+        with self._lock:
+            alert_id = self.next_id
+            self.next_id += 1
+            self.pending[alert_id] = (label, embed)
+            try:
+                self._write({'id': alert_id, 'label': label, 'embed': embed})
+            except Exception as e:
+                print(f"⚠️ 알림 대기열 기록 실패: {e}")
+            return alert_id
+
+    def ack(self, alert_ids):
+        """발송 완료 (또는 폐기) 기록, 대기 중인 알림이 없으면 파일 정리"""
+        with self._lock:
+            for alert_id in alert_ids:
+                self.pending.pop(alert_id, None)
+            try:
+                if self.pending:
+                    self._write({'ack': list(alert_ids)})
+                else:
+                    self._compact_locked()
+            except Exception as e:
+                print(f"⚠️ 알림 대기열 기록 실패: {e}")
+
+    def _compact_locked(self):
+        if not self.path:
+            return
+        self.close()
+        if not self.pending:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for alert_id, (label, embed) in self.pending.items():
+                f.write(json.dumps({'id': alert_id, 'label': label, 'embed': embed},
+                                   ensure_ascii=False, separators=(',', ':')) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def compact(self):
+        """남은 알림만 다시 기록"""
+        with self._lock:
+            try:
+                self._compact_locked()
+            except Exception as e:
+                print(f"⚠️ 알림 대기열 정리 실패: {e}")
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+class AlertDispatcher:
+    """스캔 루프 대신 백그라운드 스레드가 웹훅으로 알림 발송
+
+    - enqueue는 대기열 파일 기록 후 바로 반환 (스캔 루프는 디스코드 응답을 기다리지 않음)
+    - 쌓인 알림은 메시지당 최대 10개 임베드로 묶어 발송
+    - 429는 응답의 retry_after 만큼, 버킷이 소진되면 (X-RateLimit-Remaining: 0) Reset-After 만큼 대기
+    - 종료 시 close(timeout) 동안만 남은 알림을 보내고 나머지는 다음 실행에서 재발송
+    """
+
+    def __init__(self, webhook_url, outbox_path="data/alert_outbox.jsonl", timeout=None, transport=None):
+        self.webhook_url = webhook_url
+        self.transport = transport or HttpTransport(
+            headers={"Content-Type": "application/json"}, timeout=timeout, max_retries=0, pool_size=1
+        )
+        self.outbox = AlertOutbox(outbox_path)
+        self.queue = queue.Queue()
+        self.backoff_base = 1.0
+        self.backoff_cap = 30.0
+        self.blocked_until = 0.0   # 버킷 소진 / 429 이후 다음 요청 가능 시각 (monotonic)
+        self.deadline = None       # 종료 요청 후 발송 마감 시각
+        self.stats = {'queued': 0, 'sent': 0, 'messages': 0, 'throttled': 0, 'errors': 0, 'dropped': 0}
+        self.on_delivered = None   # 발송 완료 콜백 (묶음의 [(id, label, embed)]), 부하 측정용
+        self._carry = None
+        self._thread = None
+
+    def start(self):
+        """미발송 알림 복원 후 발송 스레드 시작"""
+        restored = self.outbox.load()
+        for item in restored:
+            self.queue.put(item)
+        if restored:
+            print(f"📨 이전 실행의 미발송 알림 {len(restored)}건 재발송 대기")
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def enqueue(self, embed, label=""):
+        """알림 임베드를 대기열에 추가 (블로킹 없음)"""
+        alert_id = self.outbox.add(label, embed)
+        self.stats['queued'] += 1
+        self.queue.put((alert_id, label, embed))
+        return alert_id
+
+    def pending_count(self):
+        """아직 발송되지 않은 알림 수"""
+        return len(self.outbox.pending)
+
+    def _next_batch(self):
+        """대기열에서 한 메시지 분량 (임베드 10개, 6000자 이내) 을 꺼냄, 종료 신호면 None"""
+        item = self._carry or self.queue.get()
+        self._carry = None
+        if item is None:
+            return None
+
+        batch, chars = [item], embed_chars(item[2])
+        while len(batch) < MAX_EMBEDS:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)  # 종료 신호는 이번 묶음 발송 후 처리
+                break
+            if chars + embed_chars(item[2]) > MAX_EMBED_CHARS:
+                self._carry = item
+                break
+            batch.append(item)
+            chars += embed_chars(item[2])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None or not self._deliver(batch):
+                break
+
+    def _wait(self, delay):
+        """delay초 대기 (종료 마감을 넘기면 False)"""
+        if self.deadline is not None and time.monotonic() + delay > self.deadline:
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    @staticmethod
+    def _header_float(response, name):
+        try:
+            return float(response.headers.get(name))
+        except (TypeError, ValueError):
+            return None
+
+    def _retry_after(self, response):
+        """429 응답의 대기 시간 (본문 retry_after 우선, 없으면 헤더)"""
+        try:
+            return float(response.json().get('retry_after'))
+        except (TypeError, ValueError, AttributeError):
+            pass
+        for name in ('Retry-After', 'X-RateLimit-Reset-After'):
+            value = self._header_float(response, name)
+            if value is not None:
+                return value
+        return self.backoff_base
+
+    def _update_bucket(self, response):
+        """버킷 헤더로 다음 요청 가능 시각 갱신"""
+        remaining = self._header_float(response, 'X-RateLimit-Remaining')
+        reset_after = self._header_float(response, 'X-RateLimit-Reset-After')
+        if remaining is not None and remaining <= 0 and reset_after is not None:
+            self.blocked_until = time.monotonic() + reset_after
+
+    def _deliver(self, batch):
+        """한 메시지 발송 (성공/폐기할 때까지 재시도, 종료 마감을 넘기면 False)"""
+        ids = [alert_id for alert_id, _, _ in batch]
+        payload = json.dumps({'embeds': [embed for _, _, embed in batch]}, ensure_ascii=False)
+        attempt = 0
+
+        while True:
+            if not self._wait(self.blocked_until - time.monotonic()):
+                return False
+            try:
+                response = self.transport.post(self.webhook_url, endpoint="discord/webhook", data=payload.encode('utf-8'))
+            except Exception as e:
+                response = None
+                print(f"⚠️ 알림 발송 실패 ({e.__class__.__name__}), 재시도 대기")
+
+            if response is not None and response.status_code < 300:
+                self._update_bucket(response)
+                self.outbox.ack(ids)
+                if self.on_delivered:
+                    self.on_delivered(batch)
+                self.stats['sent'] += len(batch)
+                self.stats['messages'] += 1
+                labels = ", ".join(label for _, label, _ in batch if label)
+                print(f"✅ 알림 {len(batch)}건 발송 완료" + (f": {labels}" if labels else ""))
+                return True
+
+            if response is not None and response.status_code == THROTTLE_STATUS:
+                self.stats['throttled'] += 1
+                delay = self._retry_after(response)
+                self.blocked_until = time.monotonic() + delay
+                print(f"⏳ 디스코드 속도 제한, {delay:.1f}초 후 재발송 ({len(batch)}건)")
+                continue
+
+            if response is not None and response.status_code < 500:
+                # 잘못된 요청은 재시도해도 같은 결과이므로 폐기
+                self.outbox.ack(ids)
+                self.stats['dropped'] += len(batch)
+                print(f"❌ 알림 발송 실패: {response.status_code}, {len(batch)}건 폐기")
+                return True
+
+            self.stats['errors'] += 1
+            attempt += 1
+            if not self._wait(min(self.backoff_cap, self.backoff_base * (2 ** attempt))):
+                return False
+
+    def close(self, timeout=10.0):
+        """남은 알림을 timeout초 안에 발송하고 스레드 종료 (못 보낸 알림은 대기열 파일에 남음)"""
+        if self._thread:
+            self.deadline = time.monotonic() + timeout
+            self.queue.put(None)
+            self._thread.join(timeout + 1.0)
+            if not self._thread.is_alive():
+                self._thread = None
+
+        pending = self.pending_count()
+        if self.stats['queued'] or pending:
+            print(f"📨 알림 발송: {self.stats['sent']}건 / 메시지 {self.stats['messages']}개, "
+                  f"429 {self.stats['throttled']}회, 폐기 {self.stats['dropped']}건"
+                  + (f", 미발송 {pending}건은 다음 실행에서 재발송" if pending else ""))
+        self.outbox.compact()
+        if self._thread is None:
+            self.transport.close()
@@ -0,0 +1,104 @@
+# api/async_fetcher.py - 비동기 캔들 동시 조회 엔진 (토큰 버킷 속도 제한)
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import settings
+
+class TokenBucket:
+    """토큰 버킷 속도 제한기 (초당 요청 수 제한, 이벤트 루프와 작업 스레드에서 함께 사용 가능)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """경과 시간만큼 토큰 보충"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _try_take(self):
+        """토큰이 있으면 1개 사용 후 0, 없으면 다음 토큰까지 남은 초"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            wait = self._try_take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def take(self):
+        """토큰 1개를 얻을 때까지 대기 (작업 스레드의 페이지 요청용)"""
+        while True:
+            wait = self._try_take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+class AsyncCandleFetcher:
+    """캔들 요청을 동시에 발송하고 도착 순서대로 결과를 넘겨주는 엔진"""
+
+    def __init__(self, client, concurrency=None, rate_limit=None, fetch=None, paged=False):
+        self.client = client
+        # 조회 함수 (기본: 캔들 딕셔너리 목록, get_candle_arrays 지정 시 배열)
+        self.fetch = fetch or client.get_candle_data
+        # True면 fetch(market, count, before_page)가 200개 페이지 요청마다 before_page를 호출 (요청마다 토큰)
+        self.paged = paged
+        self.concurrency = concurrency or settings.FETCH_CONCURRENCY
+        self.rate_limit = rate_limit or settings.FETCH_RATE_LIMIT
+
+    async def _fetch_one(self, market, count, semaphore, bucket, executor):
+        """단일 마켓 캔들 조회 (동시성 + 속도 제한 적용)"""
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                if self.paged:
+                    candles = await loop.run_in_executor(executor, self.fetch, market, count, bucket.take)
+                else:
+                    await bucket.acquire()
+                    candles = await loop.run_in_executor(executor, self.fetch, market, count)
+            except Exception as e:
+                print(f"{market} 비동기 캔들 조회 오류: {e}")
+                candles = None
+            return market, candles
+
+    async def iter_candles(self, markets, count=200):
+        """모든 마켓 캔들 요청을 한번에 발송하고 완료되는 대로 (market, candles) 반환
+
+        count는 공통 개수(int) 또는 마켓별 개수 딕셔너리
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = TokenBucket(self.rate_limit)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        tasks = [
+            asyncio.ensure_future(self._fetch_one(
+                market,
+                count.get(market, 200) if isinstance(count, dict) else count,
+                semaphore, bucket, executor
+            ))
+            for market in markets
+        ]
+
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            # 중단 시 남은 요청 취소
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            executor.shutdown(wait=False)
@@ -1,174 +1,169 @@
 # api/bithumb_client.py - 거래량 순위 완전 수정 (빗썸 ALL_KRW API 사용)
 
-import requests
 import time
 import json
 import os
+import numpy as np
 from config.settings import settings
+from api.response_cache import ResponseCache
+from api.http_transport import HttpTransport
+from utils.ranking_store import RankingHistory, RankingIndex
+from utils.fast_decode import decode_candles, decode_ticker_table, KST_OFFSET_SECONDS
 
 class BithumbClient:
     """빗썸 ALL_KRW API를 사용한 클라이언트"""
     
+    # 엔드포인트별 응답 캐시 유효시간 (초, 0이면 동시 요청 병합만)
+    ENDPOINT_TTL = {
+        "public/ticker/ALL_KRW": 30,
+        "v1/candles": 0
+    }
+    
     def __init__(self):
         self.base_url = settings.BITHUMB_BASE_URL
-        self.session = None
+        self.transport = HttpTransport(
+            headers={"accept": "application/json"},
+            max_concurrency=settings.FETCH_CONCURRENCY
+        )
+        self.cache = ResponseCache()
         self.ranking_file = "data/previous_ranking.json"
         self._ensure_data_dir()
+        self.ranking_history = None
+        self.ranking_index = None
     
     def _ensure_data_dir(self):
         """data 디렉토리 생성"""
         os.makedirs("data", exist_ok=True)
     
-    def _get_session(self):
-        """지연 초기화: 필요할 때만 세션 생성"""
-        if self.session is None:
-            self.session = requests.Session()
-            self.session.headers.update({"accept": "application/json"})
-        return self.session
+    def _cached_get(self, endpoint, url, loader):
+        """엔드포인트 TTL 캐시를 거쳐 요청 (동시 동일 요청은 1회로 병합)"""
+        ttl = self.ENDPOINT_TTL.get(endpoint, 0)
+        return self.cache.get_or_fetch(url, ttl, loader)
+    
+    def _fetch_all_krw(self):
+        """빗썸 ALL_KRW 티커 컬럼 테이블 조회 (마켓 목록/티커가 한 번의 요청을 공유)"""
+        url = "https://api.bithumb.com/public/ticker/ALL_KRW"
+        
+        def load():
+            print(f"📡 빗썸 ALL_KRW API 호출: {url}")
+            response = self.transport.get(url, endpoint="public/ticker/ALL_KRW")
+            
+            if response.status_code != 200:
+                print(f"❌ API 호출 실패: {response.status_code}")
+                return None
+            
+            # 응답 바이트에서 바로 컬럼 배열로 변환 (코인별 딕셔너리 없음)
+            return decode_ticker_table(response.content)
+        
+        return self._cached_get("public/ticker/ALL_KRW", url, load)
+    
+    def clear_cache(self):
+        """응답 캐시 초기화 (다음 스캔에서 새로 조회)"""
+        self.cache.invalidate()
     
     def get_market_list(self):
         """빗썸 ALL_KRW API에서 마켓 목록 추출"""
         try:
-            # 빗썸 ALL_KRW API로 전체 코인 목록 조회
-            url = "https://api.bithumb.com/public/ticker/ALL_KRW"
-            response = self._get_session().get(url)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("status") == "0000":
-                    ticker_data = data.get("data", {})
-                    
-                    # KRW 마켓 목록 생성
-                    krw_markets = []
-                    for symbol in ticker_data.keys():
-                        if symbol != "date":  # 날짜 정보 제외
-                            krw_markets.append({"market": f"KRW-{symbol}"})
-                    
-                    print(f"KRW 마켓 {len(krw_markets)}개 조회 완료 (빗썸 ALL_KRW API)")
-                    return krw_markets
-                else:
-                    print(f"빗썸 API 상태 오류: {data.get('status')}")
-                    return []
-            else:
-                print(f"마켓 조회 실패: {response.status_code}")
+            table = self._fetch_all_krw()
+            if table is None or not len(table):
+                print("마켓 조회 실패")
                 return []
+            
+            # KRW 마켓 목록 생성
+            krw_markets = [{"market": market} for market in table.markets.tolist()]
+            
+            print(f"KRW 마켓 {len(krw_markets)}개 조회 완료 (빗썸 ALL_KRW API)")
+            return krw_markets
                 
         except Exception as e:
             print(f"마켓 조회 오류: {e}")
             return []
     
+    def _ticker_dict(self, markets, table, idx):
+        """컬럼 테이블의 한 행을 업비트 호환 티커 딕셔너리로 변환"""
+        return {
+            "market": markets[idx],
+            "trade_price": float(table.columns["closing_price"][idx]),
+            "signed_change_rate": float(table.columns["fluctate_rate_24H"][idx]) / 100,
+            "acc_trade_price_24h": float(table.columns["acc_trade_value_24H"][idx]),
+            "acc_trade_volume_24h": float(table.columns["units_traded_24H"][idx])
+        }
+    
     def get_ticker_data(self, markets=None):
-        """빗썸 ALL_KRW API로 전체 현재가 정보 조회"""
+        """빗썸 ALL_KRW API로 전체 현재가 정보 조회 (markets 지정 시 해당 마켓만 반환)"""
         try:
-            # 빗썸의 전체 KRW 마켓 티커 조회 API
-            url = "https://api.bithumb.com/public/ticker/ALL_KRW"
-            print(f"📡 빗썸 ALL_KRW API 호출: {url}")
-            
-            response = self._get_session().get(url)
-            
-            if response.status_code != 200:
-                print(f"❌ API 호출 실패: {response.status_code}")
-                return [], None
-            
-            data = response.json()
-            
-            if data.get("status") != "0000":
-                print(f"❌ API 응답 오류: {data.get('status')}")
-                return [], None
-            
-            ticker_data = data.get("data", {})
-            if not ticker_data:
+            # 빗썸의 전체 KRW 마켓 티커 조회 (마켓 목록과 같은 응답 재사용)
+            table = self._fetch_all_krw()
+            if table is None or not len(table):
                 print("❌ 티커 데이터가 비어있음")
                 return [], None
             
-            print(f"✅ 빗썸 API 응답 성공: {len(ticker_data)}개 코인 데이터")
-            
-            # 빗썸 형식을 업비트 호환 형식으로 변환
-            all_tickers = []
-            btc_ticker = None
-            
-            for symbol, info in ticker_data.items():
-                if symbol == "date":  # 날짜 정보 제외
-                    continue
-                
-                if not isinstance(info, dict):
-                    continue
-                
-                try:
-                    # 빗썸 형식을 업비트 호환 형식으로 변환
-                    converted_ticker = {
-                        "market": f"KRW-{symbol}",
-                        "trade_price": float(info.get("closing_price", 0)),
-                        "signed_change_rate": float(info.get("fluctate_rate_24H", 0)) / 100,
-                        "acc_trade_price_24h": float(info.get("acc_trade_value_24H", 0)),
-                        "acc_trade_volume_24h": float(info.get("acc_trade_volume_24H", 0))
-                    }
-                    
-                    all_tickers.append(converted_ticker)
-                    
-                    # BTC 데이터 별도 저장
-                    if symbol == "BTC":
-                        btc_ticker = converted_ticker
-                        
-                except (ValueError, KeyError) as e:
-                    print(f"⚠️ {symbol} 데이터 변환 오류: {e}")
-                    continue
-            
-            print(f"📊 변환 완료: {len(all_tickers)}개 코인")
+            print(f"✅ 빗썸 API 응답 성공: {len(table)}개 코인 데이터")
             
-            # 거래량 기준 내림차순 정렬
-            sorted_tickers = sorted(all_tickers, 
-                                  key=lambda x: float(x.get('acc_trade_price_24h', 0)), 
-                                  reverse=True)
+            # 거래량 기준 내림차순 정렬 (동일 거래량은 원래 순서 유지)
+            market_codes = table.markets.tolist()
+            order = np.argsort(-table.columns["acc_trade_value_24H"], kind='stable')
+            sorted_markets = [market_codes[idx] for idx in order]
             
-            print(f"📊 거래량 정렬 완료: 1위 {sorted_tickers[0]['market']}")
+            print(f"📊 거래량 정렬 완료: 1위 {sorted_markets[0]}")
             
             # 거래량 순위 계산 및 저장
-            current_ranking = self._calculate_volume_ranking(sorted_tickers)
+            current_ranking = self._calculate_volume_ranking(sorted_markets)
             self._save_current_ranking(current_ranking)
             
-            # 상위 200개만 반환
+            # 요청한 마켓만 남김 (순위는 전체 기준 유지)
+            if markets:
+                allowed = {m['market'] if isinstance(m, dict) else m for m in markets}
+                order = [idx for idx in order if market_codes[idx] in allowed]
+            
+            # 상위 200개만 딕셔너리로 변환해서 반환
             top_count = getattr(settings, 'TOP_COINS_COUNT', 200)
-            top_tickers = sorted_tickers[:top_count]
+            top_tickers = [self._ticker_dict(market_codes, table, idx) for idx in order[:top_count]]
             print(f"🎯 거래량 상위 {len(top_tickers)}개 코인 선택 완료")
             
+            # BTC 데이터 별도 저장
+            btc_ticker = None
+            if "KRW-BTC" in current_ranking:
+                btc_ticker = self._ticker_dict(market_codes, table, market_codes.index("KRW-BTC"))
+            
             return top_tickers, btc_ticker
             
         except Exception as e:
             print(f"❌ 빗썸 API 호출 오류: {e}")
             return [], None
     
-    def _calculate_volume_ranking(self, sorted_tickers):
+    def _calculate_volume_ranking(self, sorted_markets):
         """거래량 순위 계산"""
-        ranking = {}
-        for idx, ticker in enumerate(sorted_tickers, 1):
-            market = ticker.get('market')
-            ranking[market] = idx
-        return ranking
+        return {market: idx for idx, market in enumerate(sorted_markets, 1)}
+    
+    def _get_ranking_history(self):
+        """순위 이력 지연 로드 (첫 실행 시 기존 JSON 순위 파일로 시드)"""
+        if self.ranking_history is None:
+            self.ranking_history = RankingHistory()
+            if not self.ranking_history.timestamps and os.path.exists(self.ranking_file):
+                try:
+                    with open(self.ranking_file, 'r') as f:
+                        legacy_ranking = json.load(f)
+                    self.ranking_history.append(legacy_ranking, os.path.getmtime(self.ranking_file))
+                    print(f"📥 기존 순위 파일을 이력으로 이전: {len(legacy_ranking)}개")
+                except Exception as e:
+                    print(f"⚠️ 기존 순위 파일 이전 실패: {e}")
+        return self.ranking_history
     
     def _save_current_ranking(self, current_ranking):
-        """현재 순위를 이전 순위로 저장 (디버깅 강화)"""
+        """현재 순위를 이력에 추가하고 이번 스캔용 순위 인덱스 생성"""
         try:
             print(f"💾 순위 저장 시작 - 총 {len(current_ranking)}개 코인")
             
-            # 기존 순위 백업
-            if os.path.exists(self.ranking_file):
-                with open(self.ranking_file, 'r') as f:
-                    previous_ranking = json.load(f)
-                
-                # 백업 파일 생성
-                backup_file = self.ranking_file.replace('.json', '_backup.json')
-                with open(backup_file, 'w') as f:
-                    json.dump(previous_ranking, f)
-                print(f"✅ 이전 순위 백업 완료: {len(previous_ranking)}개")
-            else:
-                print("📝 첫 실행 - 이전 순위 파일 없음")
+            history = self._get_ranking_history()
+            now = int(time.time())
+            windows = sorted({settings.RANK_CHANGE_WINDOW, 3600, 21600, 86400})
             
-            # 현재 순위 저장
-            with open(self.ranking_file, 'w') as f:
-                json.dump(current_ranking, f)
+            # 이전 스냅샷 기준으로 인덱스를 만든 뒤 현재 순위 기록
+            self.ranking_index = RankingIndex(history, current_ranking, now, windows)
+            history.append(current_ranking, now)
             
-            print(f"✅ 현재 순위 저장 완료: {self.ranking_file}")
+            print(f"✅ 순위 이력 저장 완료: 스냅샷 {len(history.timestamps)}개")
             
             # 상위 5개 순위 확인
             top_5 = dict(list(current_ranking.items())[:5])
@@ -176,85 +171,116 @@ class BithumbClient:
                 
         except Exception as e:
             print(f"❌ 순위 저장 오류: {e}")
-            print(f"🗂️ 데이터 폴더 존재: {os.path.exists('data')}")
-            print(f"🗂️ 순위 파일 경로: {self.ranking_file}")
-            
-            # 디렉토리 다시 생성 시도
-            try:
-                os.makedirs("data", exist_ok=True)
-                print("📁 데이터 폴더 재생성 완료")
-            except Exception as dir_error:
-                print(f"❌ 데이터 폴더 생성 실패: {dir_error}")
     
-    def get_rank_change(self, market):
-        """거래량 순위 변동 계산 (디버깅 강화)"""
+    def get_rank_change(self, market, window=None):
+        """거래량 순위 변동 계산 (window초 전 대비, 기본값은 설정의 rank_change_window)"""
         try:
-            print(f"🔍 순위 조회 시작: {market}")
-            
-            # 현재 순위 로드
-            if not os.path.exists(self.ranking_file):
-                print(f"❌ 순위 파일이 없음: {self.ranking_file}")
+            if self.ranking_index is None:
+                print(f"❌ 이번 스캔의 순위 인덱스가 없음: {market}")
                 return None, None
             
-            with open(self.ranking_file, 'r') as f:
-                current_ranking = json.load(f)
-            
-            current_rank = current_ranking.get(market)
-            print(f"📊 현재 순위: {market} = {current_rank}")
-            
+            window = settings.RANK_CHANGE_WINDOW if window is None else window
+            current_rank = self.ranking_index.rank(market)
             if not current_rank:
                 print(f"❌ {market}의 현재 순위 정보 없음")
-                available_markets = list(current_ranking.keys())[:5]
-                print(f"📝 사용 가능한 마켓 예시: {available_markets}")
                 return None, None
             
-            # 이전 순위 로드
-            backup_file = self.ranking_file.replace('.json', '_backup.json')
-            if not os.path.exists(backup_file):
-                print(f"⚠️ 백업 파일이 없음: {backup_file} (첫 실행)")
-                return current_rank, None
-            
-            with open(backup_file, 'r') as f:
-                previous_ranking = json.load(f)
-            
-            previous_rank = previous_ranking.get(market)
-            print(f"📊 이전 순위: {market} = {previous_rank}")
-            
-            if not previous_rank:
-                print(f"⚠️ {market}의 이전 순위 정보 없음 (신규 상장?)")
-                return current_rank, None
-            
-            # 순위 변동 계산 (이전 순위 - 현재 순위 = 상승한 계단 수)
-            rank_change = previous_rank - current_rank
-            print(f"📈 순위 변동: {market} = {rank_change} (이전 {previous_rank} → 현재 {current_rank})")
+            rank_change = self.ranking_index.rank_change(market, window)
+            print(f"📈 순위 변동: {market} = {rank_change} (현재 {current_rank}위, 기준 {window // 60}분)")
             
             return current_rank, rank_change
             
         except Exception as e:
             print(f"❌ 순위 변동 계산 오류: {e}")
-            print(f"🗂️ 파일 상태 - 현재: {os.path.exists(self.ranking_file)}, 백업: {os.path.exists(self.ranking_file.replace('.json', '_backup.json'))}")
             return None, None
     
+    def get_rank_changes(self, market, windows=(3600, 21600, 86400)):
+        """여러 기간의 순위 변동 {window: 변동} 반환"""
+        if self.ranking_index is None:
+            return {}
+        return {window: self.ranking_index.rank_change(market, window) for window in windows}
+    
+    def _candle_url(self, market, count, unit=60, to=None):
+        """캔들 요청 URL (unit: 분 단위, 1440이면 일봉 / to: 이 시각 이전 봉만, KST)"""
+        path = "v1/candles/days" if unit == 1440 else f"v1/candles/minutes/{unit}"
+        url = f"{self.base_url}/{path}?market={market}&count={count}"
+        if to is not None:
+            url += "&to=" + time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(to + KST_OFFSET_SECONDS)).replace(' ', '%20')
+        return url
+    
     def get_candle_data(self, market, count=200):
         """1시간 캔들 데이터 조회 (공식 문서 기준)"""
         try:
-            url = f"{self.base_url}/v1/candles/minutes/60?market={market}&count={count}"
-            response = self._get_session().get(url)
+            url = self._candle_url(market, count)
             
-            if response.status_code == 200:
-                candles = response.json()
-                print(f"{market} 1시간봉 {len(candles)}개 조회 완료")
-                return candles
-            else:
+            def load():
+                response = self.transport.get(url, endpoint="v1/candles")
+                if response.status_code == 200:
+                    return response.json()
                 print(f"{market} 캔들 데이터 조회 실패: {response.status_code}")
+                return None
+            
+            candles = self._cached_get("v1/candles", url, load)
+            if candles is None:
                 return []
+            
+            print(f"{market} 1시간봉 {len(candles)}개 조회 완료")
+            return candles
                 
         except Exception as e:
             print(f"{market} 캔들 데이터 오류: {e}")
             return []
     
+    def _get_candle_page(self, market, count, unit, to=None):
+        """캔들 1페이지(최대 200개)를 배열로 조회"""
+        url = self._candle_url(market, count, unit, to)
+        
+        def load():
+            response = self.transport.get(url, endpoint="v1/candles")
+            if response.status_code == 200:
+                return decode_candles(response.content)
+            print(f"{market} 캔들 데이터 조회 실패: {response.status_code}")
+            return None
+        
+        arrays = self._cached_get("v1/candles", f"{url}#arrays", load)
+        if arrays is None or arrays[0] is None:
+            return None, None
+        return arrays
+    
+    def get_candle_arrays(self, market, count=200, unit=60, before_page=None):
+        """unit분 캔들을 (타임스탬프, OHLCV 배열)로 조회 (200개 초과 시 to로 이어받기, before_page: 페이지 요청마다 호출)"""
+        try:
+            pages = []
+            remaining = count
+            to = None
+            while remaining > 0:
+                page_count = min(200, remaining)
+                if before_page is not None:
+                    before_page()
+                timestamps, values = self._get_candle_page(market, page_count, unit, to)
+                if timestamps is None or not len(timestamps):
+                    break
+                pages.append((timestamps, values))
+                remaining -= len(timestamps)
+                if len(timestamps) < page_count:
+                    break  # 상장 초기 등 더 이상 과거 데이터 없음
+                to = int(timestamps[0])
+            
+            if not pages:
+                return None, None
+            
+            # 오래된 페이지부터 이어붙이기
+            pages.reverse()
+            timestamps = np.concatenate([page[0] for page in pages])
+            values = np.concatenate([page[1] for page in pages], axis=1)
+            print(f"{market} {unit}분봉 {len(timestamps)}개 조회 완료")
+            return timestamps, values
+                
+        except Exception as e:
+            print(f"{market} 캔들 데이터 오류: {e}")
+            return None, None
+    
     def close(self):
         """세션 정리 (메모리 최적화)"""
-        if self.session:
-            self.session.close()
-            self.session = None
\ No newline at end of file
+        self.cache.invalidate()
+        self.transport.close()
\ No newline at end of file
@@ -0,0 +1,84 @@
+# api/bithumb_websocket.py - 빗썸 공개 WebSocket 클라이언트 (ticker / transaction 구독)
+
+import asyncio
+import json
+import random
+import time
+import websockets
+
+from config.settings import settings
+
+class BithumbWebSocket:
+    """빗썸 공개 WebSocket 구독 클라이언트 (끊기면 자동 재연결)"""
+
+    def __init__(self, url=None, record_path=None):
+        self.url = url or settings.BITHUMB_WS_URL
+        self.record_path = record_path
+        self.message_count = 0
+        self.reconnect_count = 0
+        self._record_file = None
+        self._record_start = None
+
+    @staticmethod
+    def to_symbol(market):
+        """KRW-BTC → BTC_KRW"""
+        base = market.replace('KRW-', '')
+        return f"{base}_KRW"
+
+    @staticmethod
+    def to_market(symbol):
+        """BTC_KRW → KRW-BTC"""
+        return f"KRW-{symbol.replace('_KRW', '')}"
+
+    def _subscriptions(self, markets):
+        """구독 메시지 목록 (체결 + 24시간 티커)"""
+        symbols = [self.to_symbol(market) for market in markets]
+        return [
+            {"type": "transaction", "symbols": symbols},
+            {"type": "ticker", "symbols": symbols, "tickTypes": ["24H"]}
+        ]
+
+    def _record(self, raw):
+        """수신 원본 메시지 기록 (재생 서버용 JSONL)"""
+        if self._record_file is None:
+            self._record_file = open(self.record_path, 'a', encoding='utf-8')
+            self._record_start = time.monotonic()
+        line = {"t": round(time.monotonic() - self._record_start, 4), "msg": raw}
+        self._record_file.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    async def stream(self, markets):
+        """구독 후 수신 메시지(dict)를 순서대로 반환하는 비동기 제너레이터"""
+        attempt = 0
+        try:
+            while True:
+                try:
+                    async with websockets.connect(self.url, ping_interval=20, max_size=2 ** 22) as ws:
+                        for subscription in self._subscriptions(markets):
+                            await ws.send(json.dumps(subscription))
+                        print(f"🔌 WebSocket 연결 완료: {self.url} ({len(markets)}개 마켓 구독)")
+                        attempt = 0
+
+                        async for raw in ws:
+                            if self.record_path:
+                                self._record(raw)
+                            try:
+                                message = json.loads(raw)
+                            except ValueError:
+                                continue
+                            self.message_count += 1
+                            yield message
+
+                    print("⚠️ WebSocket 연결 종료됨")
+                except (OSError, websockets.WebSocketException) as e:
+                    print(f"⚠️ WebSocket 오류: {e}")
+
+                # 지터가 들어간 지수 백오프 후 재연결
+                attempt += 1
+                self.reconnect_count += 1
+                delay = random.uniform(0, min(30, 0.5 * (2 ** attempt)))
+                print(f"🔄 {delay:.1f}초 후 WebSocket 재연결 ({attempt}회차)")
+                await asyncio.sleep(delay)
+        finally:
+            if self._record_file:
+                self._record_file.close()
+                self._record_file = None
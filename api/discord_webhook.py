@@ -1,16 +1,22 @@
 # api/discord_webhook.py - 거래량 순위 표시로 수정 (한국 시간 적용)
 
-import requests
 import json
 from datetime import datetime, timezone, timedelta
 from config.settings import settings
+from api.http_transport import HttpTransport
+from api.alert_dispatcher import AlertDispatcher
 
 class DiscordWebhook:
     """거래량 순위 표시의 디스코드 웹훅"""
     
-    def __init__(self):
-        self.webhook_url = settings.DISCORD_WEBHOOK_URL
-        self.session = None
+    def __init__(self, webhook_url=None, outbox_path="data/alert_outbox.jsonl", dispatch=None):
+        self.webhook_url = settings.DISCORD_WEBHOOK_URL if webhook_url is None else webhook_url
+        self.transport = HttpTransport(headers={"Content-Type": "application/json"}, pool_size=2)
+        
+        # 신호 알림은 백그라운드 발송 대기열로 (스캔 루프는 디스코드 응답을 기다리지 않음)
+        self.dispatcher = None
+        if self.webhook_url and (settings.ALERT_DISPATCHER if dispatch is None else dispatch):
+            self.dispatcher = AlertDispatcher(self.webhook_url, outbox_path=outbox_path).start()
     
     def get_korean_time(self):
         """한국 시간(KST) 반환 - GitHub Actions UTC 환경 고려"""
@@ -19,13 +25,6 @@ class DiscordWebhook:
         korean_time = utc_now.replace(tzinfo=timezone.utc).astimezone(kst)
         return korean_time.strftime('%Y-%m-%d %H:%M:%S')
     
-    def _get_session(self):
-        """지연 초기화: 필요할 때만 세션 생성"""
-        if self.session is None:
-            self.session = requests.Session()
-            self.session.headers.update({"Content-Type": "application/json"})
-        return self.session
-    
     def calculate_additional_metrics(self, coin_data, btc_data=None):
         """추가 지표 계산"""
         try:
@@ -72,96 +71,120 @@ class DiscordWebhook:
         else:
             return f"거래량 순위 {current_rank}위 (→)"
     
+    def format_window_changes_text(self, window_changes):
+        """기간별 순위 변동 텍스트 (예: 1h ↑3 · 6h ↓2 · 24h →)"""
+        parts = []
+        for window, change in sorted(window_changes.items()):
+            if change is None:
+                continue
+            label = f"{window // 3600}h" if window >= 3600 else f"{window // 60}m"
+            arrow = f"↑{change}" if change > 0 else f"↓{abs(change)}" if change < 0 else "→"
+            parts.append(f"{label} {arrow}")
+        return " · ".join(parts)
+    
+    def build_signal_embed(self, coin_data, analysis_data, btc_data=None, bithumb_client=None):
+        """상승신호 알림 임베드 구성"""
+        # 현재 시간 (한국 시간으로 수정)
+        current_time = self.get_korean_time()
+        
+        # 기본 정보 추출
+        market = coin_data['market']
+        coin_name = market.replace('KRW-', '')
+        current_price = float(coin_data.get('trade_price', 0))
+        change_rate = float(coin_data.get('signed_change_rate', 0)) * 100
+        
+        # 거래량 포맷팅
+        volume_24h = float(coin_data.get('acc_trade_price_24h', 0))
+        volume_text = f"{volume_24h / 100000000:.0f}억"
+        
+        # 거래량 순위 정보 계산
+        current_rank, rank_change = None, None
+        window_changes = {}
+        if bithumb_client:
+            current_rank, rank_change = bithumb_client.get_rank_change(market)
+            window_changes = bithumb_client.get_rank_changes(market)
+        
+        rank_text = self.format_rank_change_text(current_rank, rank_change)
+        window_text = self.format_window_changes_text(window_changes)
+        if window_text:
+            rank_text = f"{rank_text}\n📊 기간별 변동: {window_text}"
+        
+        # 추가 지표 계산
+        metrics = self.calculate_additional_metrics(coin_data, btc_data)
+        
+        # 신호 강도 계산
+        conditions = analysis_data.get('conditions', {})
+        signal_count = sum(1 for v in conditions.values() if v)
+        signal_strength = "강함" if conditions and signal_count == len(conditions) else "보통"
+        
+        # 기술적 지표 상세 정보 추출
+        rsi_value = analysis_data.get('rsi', 0)
+        current_price_analysis = analysis_data.get('current_price', current_price)
+        ma25_value = analysis_data.get('ma25', 0)
+        
+        # 이동평균선 위치 분석
+        ma_position = "25일선 상회" if current_price_analysis > ma25_value else "25일선 하회"
+        ma_breakout_status = "돌파 완료" if conditions.get('ma_breakout', False) else "돌파 대기"
+        
+        # MACD 골든크로스 상태
+        macd_status = "골든크로스" if conditions.get('macd_golden_cross', False) else "골든크로스 대기"
+        
+        # 임베드 구성
+        return {
+            "title": "🚀 매수세 유입 탐지!",
+            "color": 0x00ff41,  # 초록색
+            "fields": [
+                {
+                    "name": "📊 코인 정보",
+                    "value": f"**{coin_name}** ({market})\n💰 **현재가:** {current_price:,.0f}원\n📈 **거래량:** {volume_text}",
+                    "inline": True
+                },
+                {
+                    "name": "🔥 신호 강도",
+                    "value": f"🟢 **{signal_strength}**\n조건 만족: {signal_count}/5개",
+                    "inline": True
+                },
+                {
+                    "name": "📈 기술적 분석",
+                    "value": f"📊 **이동평균선:** {ma_position}\n📈 **9,25일선 돌파:** {ma_breakout_status}\n⚡ **MACD:** {macd_status}\n📊 **RSI:** {rsi_value:.1f}",
+                    "inline": False
+                },
+                {
+                    "name": "📈 상세 분석",
+                    "value": f"📊 {rank_text}",
+                    "inline": False
+                },
+                {
+                    "name": "추가 정보",
+                    "value": f"- 체결강도: {metrics['strength']}\n- BTC대비 상대적 강도: {metrics['relative_strength']:+.1f}%\n- 24시간 대비 현재(10분간) 거래량: {metrics['volume_ratio']:.0f}%",
+                    "inline": False
+                }
+            ],
+            "footer": {
+                "text": f"탐지 시간: {current_time} KST"
+            },
+            "thumbnail": {
+                "url": "https://cdn-icons-png.flaticon.com/512/1055/1055673.png"
+            }
+        }
+    
     def send_signal_alert(self, coin_data, analysis_data, btc_data=None, bithumb_client=None):
-        """개선된 가독성의 상승신호 알림 발송"""
+        """개선된 가독성의 상승신호 알림 발송 (발송 대기열이 있으면 추가만 하고 바로 반환)"""
         try:
             if not self.webhook_url:
                 print("웹훅 URL이 설정되지 않음")
                 return False
             
-            # 현재 시간 (한국 시간으로 수정)
-            current_time = self.get_korean_time()
-            
-            # 기본 정보 추출
             market = coin_data['market']
-            coin_name = market.replace('KRW-', '')
-            current_price = float(coin_data.get('trade_price', 0))
-            change_rate = float(coin_data.get('signed_change_rate', 0)) * 100
+            embed = self.build_signal_embed(coin_data, analysis_data, btc_data, bithumb_client)
             
-            # 거래량 포맷팅
-            volume_24h = float(coin_data.get('acc_trade_price_24h', 0))
-            volume_text = f"{volume_24h / 100000000:.0f}억"
-            
-            # 거래량 순위 정보 계산
-            current_rank, rank_change = None, None
-            if bithumb_client:
-                current_rank, rank_change = bithumb_client.get_rank_change(market)
-            
-            rank_text = self.format_rank_change_text(current_rank, rank_change)
-            
-            # 추가 지표 계산
-            metrics = self.calculate_additional_metrics(coin_data, btc_data)
-            
-            # 신호 강도 계산
-            conditions = analysis_data.get('conditions', {})
-            signal_count = sum(1 for v in conditions.values() if v)
-            signal_strength = "강함" if signal_count == 5 else "보통"
-            
-            # 기술적 지표 상세 정보 추출
-            rsi_value = analysis_data.get('rsi', 0)
-            current_price_analysis = analysis_data.get('current_price', current_price)
-            ma25_value = analysis_data.get('ma25', 0)
-            
-            # 이동평균선 위치 분석
-            ma_position = "25일선 상회" if current_price_analysis > ma25_value else "25일선 하회"
-            ma_breakout_status = "돌파 완료" if conditions.get('ma_breakout', False) else "돌파 대기"
-            
-            # MACD 골든크로스 상태
-            macd_status = "골든크로스" if conditions.get('macd_golden_cross', False) else "골든크로스 대기"
-            
-            # 임베드 스타일 메시지 구성
-            embed = {
-                "embeds": [{
-                    "title": "🚀 매수세 유입 탐지!",
-                    "color": 0x00ff41,  # 초록색
-                    "fields": [
-                        {
-                            "name": "📊 코인 정보",
-                            "value": f"**{coin_name}** ({market})\n💰 **현재가:** {current_price:,.0f}원\n📈 **거래량:** {volume_text}",
-                            "inline": True
-                        },
-                        {
-                            "name": "🔥 신호 강도",
-                            "value": f"🟢 **{signal_strength}**\n조건 만족: {signal_count}/5개",
-                            "inline": True
-                        },
-                        {
-                            "name": "📈 기술적 분석",
-                            "value": f"📊 **이동평균선:** {ma_position}\n📈 **9,25일선 돌파:** {ma_breakout_status}\n⚡ **MACD:** {macd_status}\n📊 **RSI:** {rsi_value:.1f}",
-                            "inline": False
-                        },
-                        {
-                            "name": "📈 상세 분석",
-                            "value": f"📊 {rank_text}",
-                            "inline": False
-                        },
-                        {
-                            "name": "추가 정보",
-                            "value": f"- 체결강도: {metrics['strength']}\n- BTC대비 상대적 강도: {metrics['relative_strength']:+.1f}%\n- 24시간 대비 현재(10분간) 거래량: {metrics['volume_ratio']:.0f}%",
-                            "inline": False
-                        }
-                    ],
-                    "footer": {
-                        "text": f"탐지 시간: {current_time} KST"
-                    },
-                    "thumbnail": {
-                        "url": "https://cdn-icons-png.flaticon.com/512/1055/1055673.png"
-                    }
-                }]
-            }
+            if self.dispatcher:
+                self.dispatcher.enqueue(embed, label=market)
+                print(f"📨 {market} 알림 발송 대기열 추가")
+                return True
             
             # 웹훅 발송
-            response = self._get_session().post(self.webhook_url, data=json.dumps(embed))
+            response = self.transport.post(self.webhook_url, endpoint="discord/webhook", data=json.dumps({"embeds": [embed]}))
             
             if response.status_code == 204:
                 print(f"✅ {market} 알림 발송 완료")
@@ -192,7 +215,7 @@ class DiscordWebhook:
                 }]
             }
             
-            response = self._get_session().post(self.webhook_url, data=json.dumps(embed))
+            response = self.transport.post(self.webhook_url, endpoint="discord/webhook", data=json.dumps(embed))
             
             if response.status_code == 204:
                 print("✅ 테스트 메시지 발송 완료")
@@ -205,8 +228,9 @@ class DiscordWebhook:
             print(f"❌ 테스트 메시지 발송 오류: {e}")
             return False
     
-    def close(self):
-        """세션 정리 (메모리 최적화)"""
-        if self.session:
-            self.session.close()
-            self.session = None
\ No newline at end of file
+    def close(self, flush_timeout=None):
+        """남은 알림 발송 후 세션 정리 (메모리 최적화)"""
+        if self.dispatcher:
+            self.dispatcher.close(settings.ALERT_FLUSH_TIMEOUT if flush_timeout is None else flush_timeout)
+            self.dispatcher = None
+        self.transport.close()
\ No newline at end of file
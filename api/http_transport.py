@@ -0,0 +1,211 @@
+# api/http_transport.py - 공용 HTTP 전송 계층 (타임아웃, 재시도, 적응형 동시성, 지연 통계)
+
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from config.settings import settings
+
+# 속도 제한 응답 코드 (5xx와 함께 재시도 + 동시성 축소 대상)
+THROTTLE_STATUS = 429
+
+# 서버가 이미 처리했을 수 있어도 다시 보내도 되는 메서드
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+def _not_sent(error):
+    """요청이 서버에 전달되기 전에 실패했는지 (연결 타임아웃 / 연결 수립 실패)"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.Timeout):
+        return False  # 읽기 타임아웃: 서버는 받았을 수 있음
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+class EndpointStats:
+    """엔드포인트별 요청 수, 오류 수, 지연 시간 누적"""
+
+    __slots__ = ('requests', 'errors', 'throttled', 'retries', 'total_latency', 'max_latency')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.retries = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latency, error=False, throttled=False):
+        """요청 1건 결과 기록"""
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        if error:
+            self.errors += 1
+        if throttled:
+            self.throttled += 1
+
+    def as_dict(self):
+        """통계를 딕셔너리로 반환"""
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'throttled': self.throttled,
+            'retries': self.retries,
+            'avg_latency_ms': self.total_latency / self.requests * 1000 if self.requests else 0.0,
+            'max_latency_ms': self.max_latency * 1000
+        }
+
+class AdaptiveConcurrencyLimiter:
+    """429/5xx 발생 시 절반으로 줄이고 정상 응답마다 조금씩 늘리는 동시성 제한 (AIMD)"""
+
+    def __init__(self, max_limit, min_limit=1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(self.max_limit)
+        self.active = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """슬롯이 날 때까지 대기"""
+        with self._condition:
+            while self.active >= int(self.limit):
+                self._condition.wait()
+            self.active += 1
+
+    def release(self):
+        """슬롯 반환"""
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        """정상 응답: 한도를 천천히 회복"""
+        with self._condition:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttle(self):
+        """속도 제한/서버 오류: 한도를 절반으로 축소"""
+        with self._condition:
+            self.limit = max(self.min_limit, self.limit / 2)
+
+class HttpTransport:
+    """BithumbClient / DiscordWebhook이 공유하는 요청 전송 계층"""
+
+    def __init__(self, headers=None, timeout=None, max_retries=None,
+                 pool_size=None, max_concurrency=None):
+        self.headers = headers or {}
+        self.timeout = timeout or settings.HTTP_TIMEOUT
+        self.max_retries = settings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.pool_size = pool_size or settings.HTTP_POOL_SIZE
+        self.limiter = AdaptiveConcurrencyLimiter(max_concurrency or self.pool_size)
+        self.backoff_base = 0.5
+        self.backoff_cap = 8.0
+        self.session = None
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _get_session(self):
+        """지연 초기화: 커넥션 풀 크기를 맞춘 세션 생성"""
+        if self.session is None:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+            self.session.headers.update(self.headers)
+        return self.session
+
+    def _record(self, endpoint, latency, error=False, throttled=False, retry=False):
+        """엔드포인트 통계 갱신"""
+        with self._stats_lock:
+            stats = self.stats.get(endpoint)
+            if stats is None:
+                stats = self.stats[endpoint] = EndpointStats()
+            if retry:
+                stats.retries += 1
+            else:
+                stats.record(latency, error, throttled)
+
+    def _backoff_delay(self, attempt, response=None):
+        """지터가 들어간 지수 백오프 (Retry-After 헤더가 있으면 우선)"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            try:
+                if retry_after is not None:
+                    return min(self.backoff_cap * 4, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, url, endpoint=None, **kwargs):
+        """타임아웃/재시도/동시성 제한을 적용한 요청 (재시도 소진 시 마지막 응답 또는 예외)
+
+        POST 등 멱등이 아닌 요청은 중복 발송 (예: 디스코드 알림 2회) 을 막기 위해
+        서버에 전달되지 않은 실패 (연결 실패/연결 타임아웃) 와 429만 재시도한다.
+        """
+        endpoint = endpoint or url
+        kwargs.setdefault("timeout", (3.05, self.timeout))
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            is_last = attempt == self.max_retries
+            response = None
+
+            self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                response = self._get_session().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(endpoint, time.monotonic() - start, error=True)
+                if is_last or not (idempotent or _not_sent(e)):
+                    raise
+                print(f"⚠️ {endpoint} 요청 실패 ({e.__class__.__name__}), 재시도 {attempt + 1}/{self.max_retries}")
+            finally:
+                self.limiter.release()
+
+            if response is not None:
+                latency = time.monotonic() - start
+                throttled = response.status_code == THROTTLE_STATUS or response.status_code >= 500
+                self._record(endpoint, latency, error=throttled, throttled=throttled)
+
+                if not throttled:
+                    self.limiter.on_success()
+                    return response
+
+                self.limiter.on_throttle()
+                if is_last or not (idempotent or response.status_code == THROTTLE_STATUS):
+                    return response
+                print(f"⚠️ {endpoint} 응답 {response.status_code}, 동시성 {int(self.limiter.limit)}로 축소 후 재시도")
+
+            self._record(endpoint, 0, retry=True)
+            time.sleep(self._backoff_delay(attempt, response))
+
+    def get(self, url, endpoint=None, **kwargs):
+        """GET 요청"""
+        return self.request("GET", url, endpoint, **kwargs)
+
+    def post(self, url, endpoint=None, **kwargs):
+        """POST 요청"""
+        return self.request("POST", url, endpoint, **kwargs)
+
+    def get_stats(self):
+        """엔드포인트별 지연/오류 통계"""
+        with self._stats_lock:
+            return {endpoint: stats.as_dict() for endpoint, stats in self.stats.items()}
+
+    def print_stats(self):
+        """엔드포인트별 통계 출력 (운영 중 스로틀링 확인용)"""
+        for endpoint, stats in self.get_stats().items():
+            print(f"📶 {endpoint}: 요청 {stats['requests']}회, 오류 {stats['errors']}회, "
+                  f"429/5xx {stats['throttled']}회, 재시도 {stats['retries']}회, "
+                  f"평균 {stats['avg_latency_ms']:.0f}ms / 최대 {stats['max_latency_ms']:.0f}ms")
+        print(f"📶 현재 동시성 한도: {int(self.limiter.limit)}/{self.limiter.max_limit}")
+
+    def close(self):
+        """세션 정리"""
+        if self.session:
+            self.session.close()
+            self.session = None
@@ -0,0 +1,69 @@
+# api/response_cache.py - 엔드포인트별 TTL 응답 캐시 (동시 중복 요청 병합)
+
+import threading
+import time
+
+class _InflightRequest:
+    """진행 중인 요청 (같은 키로 들어온 요청들이 결과를 공유)"""
+
+    __slots__ = ('event', 'result')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+class ResponseCache:
+    """TTL 응답 캐시 - 만료 전에는 저장된 결과, 동시 요청은 한 번만 호출"""
+
+    def __init__(self):
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.merged = 0
+
+    def get_or_fetch(self, key, ttl, loader):
+        """캐시 조회 후 없으면 loader() 호출 (None 결과는 캐시하지 않음)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                self.hits += 1
+                return entry[1]
+
+            inflight = self._inflight.get(key)
+            is_owner = inflight is None
+            if is_owner:
+                inflight = _InflightRequest()
+                self._inflight[key] = inflight
+                self.misses += 1
+            else:
+                self.merged += 1
+
+        # 다른 스레드가 같은 요청 중이면 결과만 기다림
+        if not is_owner:
+            inflight.event.wait()
+            return inflight.result
+
+        try:
+            inflight.result = loader()
+            if inflight.result is not None and ttl > 0:
+                with self._lock:
+                    self._entries[key] = (time.monotonic(), inflight.result)
+            return inflight.result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.event.set()
+
+    def invalidate(self, key=None):
+        """특정 키 또는 전체 캐시 삭제"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self):
+        """캐시 적중/미스/병합 횟수"""
+        return {'hits': self.hits, 'misses': self.misses, 'merged': self.merged}
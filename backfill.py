@@ -0,0 +1,55 @@
+# backfill.py - 전체 KRW 마켓의 과거 캔들을 to 파라미터로 이어받아 캔들 저장소 채우기 (백테스트/최적화 준비)
+#
+# 실행: python3 backfill.py                          (저장 한도 candle_store_max_bars 까지, 이미 있는 봉은 건너뜀)
+#       python3 backfill.py --markets KRW-BTC,KRW-ETH --bars 2000
+#
+# 스캔 (main.py) 도 마지막 저장 봉 이후의 공백을 보관 한도까지 to로 이어받으므로, 이 명령은
+# 처음 이력을 채우거나 목표 봉 수를 늘릴 때 쓴다.
+
+import argparse
+import time
+
+from api.bithumb_client import BithumbClient
+from config.settings import settings
+from utils.candle_store import CandleStore
+from utils.resampler import SUPPORTED_MINUTE_UNITS, base_unit_for
+
+def main():
+    parser = argparse.ArgumentParser(description="과거 캔들을 캔들 저장소에 채우기")
+    parser.add_argument('--data-dir', default="data/candles", help="캔들 저장소 경로")
+    parser.add_argument('--unit', type=int, choices=SUPPORTED_MINUTE_UNITS,
+                        default=base_unit_for([60] + list(settings.TIMEFRAME_CONFIRMATIONS)), help="캔들 단위 (분)")
+    parser.add_argument('--bars', type=int, default=settings.CANDLE_STORE_MAX_BARS, help="마켓별 목표 봉 수")
+    parser.add_argument('--markets', default="", help="쉼표로 구분한 마켓 (기본: 전체 KRW 마켓)")
+    args = parser.parse_args()
+
+    store = CandleStore(base_dir=args.data_dir, unit=args.unit, max_bars=args.bars)
+    client = BithumbClient()
+    try:
+        markets = [market.strip() for market in args.markets.split(',') if market.strip()]
+        if not markets:
+            markets = [item['market'] for item in client.get_market_list()]
+        if not markets:
+            print("❌ 마켓 목록 조회 실패")
+            return
+
+        print(f"📥 {len(markets)}개 마켓 {args.unit}분봉 최대 {args.bars}개 채우기 → {args.data_dir}")
+        start = time.time()
+        fetched = failed = 0
+        for index, market in enumerate(markets, 1):
+            # 저장된 봉이 목표보다 적으면 전체, 아니면 마지막 저장 봉 이후 (공백 포함) 만 받음
+            count = store.missing_count(market, args.bars)
+            timestamps, values = client.get_candle_arrays(market, count, args.unit)
+            if timestamps is None or not len(timestamps):
+                failed += 1
+                continue
+            timestamps, _ = store.merge(market, timestamps, values)
+            fetched += count
+            print(f"  [{index}/{len(markets)}] {market}: 저장 {len(timestamps)}봉")
+
+        print(f"✅ 완료: {len(markets) - failed}개 마켓, 요청 봉 {fetched}개, 실패 {failed}개 ({time.time() - start:.0f}초)")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# backtest.py - 저장된 캔들 이력으로 신호 전략 백테스트 (네트워크 없이 실행)
+#
+# 캔들 수집: python3 backfill.py (전체 KRW 마켓 이력을 candle_store_max_bars 까지 채움, 이후 스캔이 최근 봉을 이어붙임)
+#           스캔을 오래 쉬어도 다음 스캔이 공백 구간을 to로 이어받아 기존 이력과 잇는다
+# 실행:     python3 backtest.py --workers 8 --output data/backtest/signals.npz
+#           python3 backtest.py --markets KRW-BTC,KRW-ETH --horizons 1,4,24
+
+import argparse
+import json
+import os
+
+from analysis.backtester import HORIZONS, Backtester
+from analysis.indicator_plan import IndicatorPlan
+from config.settings import settings
+from utils.resampler import base_unit_for
+
+def load_config(path):
+    """신호 설정 파일 로드 (없으면 전역 설정 기본값)"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 캔들로 신호 규칙 백테스트")
+    parser.add_argument('--data-dir', default="data/candles", help="캔들 저장소 경로")
+    parser.add_argument('--unit', type=int, default=base_unit_for([60] + list(settings.TIMEFRAME_CONFIRMATIONS)),
+                        help="저장된 캔들 단위 (분)")
+    parser.add_argument('--config', default="signal_config.json", help="신호 설정 파일")
+    parser.add_argument('--markets', default="", help="쉼표로 구분한 마켓 (기본: 저장된 전체)")
+    parser.add_argument('--horizons', default=",".join(str(hours) for hours in HORIZONS), help="수익률 확인 구간 (시간)")
+    parser.add_argument('--workers', type=int, default=None, help="작업 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--output', default="data/backtest/signals.npz", help="신호별 결과 파일")
+    args = parser.parse_args()
+
+    plan_args = IndicatorPlan.config_args(load_config(args.config))
+    print(f"📐 {IndicatorPlan(**plan_args).describe()}")
+
+    backtester = Backtester(
+        plan_args=plan_args, base_dir=args.data_dir, unit=args.unit,
+        horizons=[int(hours) for hours in args.horizons.split(',') if hours], workers=args.workers
+    )
+    markets = [market.strip() for market in args.markets.split(',') if market.strip()] or None
+    if not (markets or backtester.markets()):
+        print(f"❌ {args.data_dir} 에 {args.unit}분봉 캔들이 없습니다")
+        return
+
+    columns = backtester.run(markets)
+    backtester.save(columns, args.output)
+    backtester.print_summary(backtester.summarize(columns))
+
+if __name__ == "__main__":
+    main()
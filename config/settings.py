@@ -16,6 +16,7 @@ class Settings:
         
         # 빗썸 공식 API 설정
         self.BITHUMB_BASE_URL = "https://api.bithumb.com"
+        self.BITHUMB_WS_URL = os.getenv('BITHUMB_WS_URL', 'wss://pubwss.bithumb.com/pub/ws')
         
         # 동적 설정 로드
         self._load_dynamic_config()
@@ -32,7 +33,39 @@ class Settings:
             "require_price_above_ma25": True,
             "require_macd_golden_cross": True,
             "scan_interval": 600,  # 10분
-            "top_coins_count": 200
+            "top_coins_count": 200,
+            "fetch_concurrency": 8,     # 동시 캔들 요청 수
+            "fetch_rate_limit": 20,     # 초당 최대 요청 수 (빗썸 공개 API 제한 이내)
+            "candle_store_float32": False,  # 캔들 저장소 float32 모드 (용량 절반)
+            "candle_store_max_bars": 9000,  # 마켓별 보관 봉 수 (약 1년치)
+            "rank_change_window": 3600,     # 순위 변동 기준 기간 (초, 0이면 직전 스캔)
+            "http_timeout": 10,             # 요청 읽기 타임아웃 (초)
+            "http_max_retries": 3,          # 타임아웃/429/5xx 재시도 횟수
+            "http_pool_size": 16,           # 커넥션 풀 크기
+            "stream_eval_interval": 0.5,    # 실시간 모드 재평가 주기 (초)
+            "timeframe_confirmations": [],  # 추가 확인 타임프레임 (분, 예: [15, 240, 1440])
+            "mtf_ma_period": 9,             # 타임프레임 확인용 이동평균 기간
+            "incremental_indicators": True, # 마켓별 지표 상태를 유지해 새 봉만 반영
+            "batch_indicators": False,      # 캔들을 모두 받은 뒤 전 마켓을 한 번에 벡터 연산 (증분 지표 엔진 대신)
+            "memo_max_size": 2000,          # 지표/신호 메모 캐시 최대 항목 수
+            "memo_max_age": 3600,           # 메모 캐시 항목 유효 시간 (초)
+            "max_increase": 0.20,           # 24시간 상승률 제한 (규칙의 $max_increase)
+            "signal_rules": None,           # 신호 규칙 정의 (None이면 기본 5가지 조건)
+            "ticker_prefilter": True,       # 티커 (24시간 등락률 등) 로 불가능한 마켓은 캔들 조회 생략
+            "prefilter_margin": 0.05,       # 티커 등락률과 캔들 변화율 차이 여유 (경험값, 보장 아님 - 키우면 덜 제외)
+            "prefilter_min_trade_value": 0, # 24시간 최소 거래대금 (원, 0이면 사용 안 함)
+            "alert_dispatcher": True,       # 디스코드 알림을 백그라운드에서 묶어 발송 (스캔 루프 비차단)
+            "alert_flush_timeout": 20,      # 종료 시 남은 알림 발송 대기 시간 (초, 못 보낸 알림은 다음 실행에서 재발송)
+            "alert_cooldown": 3600,         # 같은 마켓/신호 재알림 최소 간격 (초, 0이면 사용 안 함)
+            "alert_rearm": True,            # 알림 후 조건이 한 번 거짓이 되어야 다시 알림
+            "scan_candle_unit": 60,         # 연속 모드 전체 스캔을 이 분봉 마감 직후에 실행 (0이면 scan_interval 고정 간격)
+            "scan_settle_delay": 5,         # 봉 마감 후 스캔 시작까지 여유 (초, 거래소 봉 확정 대기)
+            "ticker_refresh_interval": 300, # 스캔 사이 티커만 갱신해 거래량 순위 이력 유지 (초, 0이면 사용 안 함)
+            "scan_tiers": [                 # 연속 모드 거래량 순위 구간별 스캔 (top: 누적 순위 상한, interval 0 = 캔들 마감마다, rpm: 분당 요청 예산)
+                {"name": "상위", "top": 20, "interval": 180, "rpm": 60},
+                {"name": "중위", "top": 80, "interval": 900, "rpm": 60},
+                {"name": "하위", "top": None, "interval": 0, "rpm": 120}
+            ]
         }
         
         # 설정 파일에서 로드
@@ -56,6 +89,34 @@ class Settings:
         self.REQUIRE_MA_BREAKOUT = default_config["require_ma_breakout"]
         self.REQUIRE_PRICE_ABOVE_MA25 = default_config["require_price_above_ma25"]
         self.REQUIRE_MACD_GOLDEN_CROSS = default_config["require_macd_golden_cross"]
+        self.FETCH_CONCURRENCY = default_config["fetch_concurrency"]
+        self.FETCH_RATE_LIMIT = default_config["fetch_rate_limit"]
+        self.CANDLE_STORE_FLOAT32 = default_config["candle_store_float32"]
+        self.CANDLE_STORE_MAX_BARS = default_config["candle_store_max_bars"]
+        self.RANK_CHANGE_WINDOW = default_config["rank_change_window"]
+        self.HTTP_TIMEOUT = default_config["http_timeout"]
+        self.HTTP_MAX_RETRIES = default_config["http_max_retries"]
+        self.HTTP_POOL_SIZE = default_config["http_pool_size"]
+        self.STREAM_EVAL_INTERVAL = default_config["stream_eval_interval"]
+        self.TIMEFRAME_CONFIRMATIONS = default_config["timeframe_confirmations"]
+        self.MTF_MA_PERIOD = default_config["mtf_ma_period"]
+        self.INCREMENTAL_INDICATORS = default_config["incremental_indicators"]
+        self.BATCH_INDICATORS = default_config["batch_indicators"]
+        self.MEMO_MAX_SIZE = default_config["memo_max_size"]
+        self.MEMO_MAX_AGE = default_config["memo_max_age"]
+        self.MAX_INCREASE = default_config["max_increase"]
+        self.SIGNAL_RULES = default_config["signal_rules"]
+        self.TICKER_PREFILTER = default_config["ticker_prefilter"]
+        self.PREFILTER_MARGIN = default_config["prefilter_margin"]
+        self.PREFILTER_MIN_TRADE_VALUE = default_config["prefilter_min_trade_value"]
+        self.ALERT_DISPATCHER = default_config["alert_dispatcher"]
+        self.ALERT_FLUSH_TIMEOUT = default_config["alert_flush_timeout"]
+        self.ALERT_COOLDOWN = default_config["alert_cooldown"]
+        self.ALERT_REARM = default_config["alert_rearm"]
+        self.SCAN_CANDLE_UNIT = default_config["scan_candle_unit"]
+        self.SCAN_SETTLE_DELAY = default_config["scan_settle_delay"]
+        self.TICKER_REFRESH_INTERVAL = default_config["ticker_refresh_interval"]
+        self.SCAN_TIERS = default_config["scan_tiers"]
         
         # 🔥 발열 방지 최적화 설정
         self.CANDLE_COUNT = 200   # 200개 1시간봉 데이터
@@ -0,0 +1,177 @@
+# discord_stub_server.py - 디스코드 웹훅 API를 흉내 내는 로컬 대체 서버 (실제 채널 없이 알림 부하 테스트)
+#
+# 실행: python3 discord_stub_server.py --port 8080 --latency-ms 80 --bucket-limit 5 --bucket-window 2
+#       DISCORD_WEBHOOK_URL=http://127.0.0.1:8080/api/webhooks/1/stub python3 main.py --scan-once
+# 부하 측정은 alert_benchmark.py (이 서버를 프로세스 안에서 띄워 사용)
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from api.alert_dispatcher import MAX_EMBED_CHARS, MAX_EMBEDS, embed_chars
+
+class StubWebhookServer:
+    """디스코드 웹훅 응답 재현: 204 (wait=true면 200), 버킷 헤더, 429 + retry_after, 400, 5xx, 연결 끊김
+
+    버킷은 웹훅 경로별 고정 창 (bucket_window초에 bucket_limit회) 이며 실제 디스코드처럼
+    X-RateLimit-Limit / Remaining / Reset / Reset-After / Bucket 헤더를 붙인다.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, fail_rate=0.0, drop_rate=0.0,
+                 bucket_limit=5, bucket_window=2.0, on_message=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.on_message = on_message  # 정상 수신 콜백 (embeds 목록)
+        self.buckets = {}             # 웹훅 경로 → [창 시작 시각, 사용 횟수]
+        self.stats = {'requests': 0, 'messages': 0, 'embeds': 0, 'throttled': 0, 'invalid': 0, 'failed': 0, 'dropped': 0}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/webhooks/1/stub"
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _take_bucket(self, path):
+        """버킷에서 1회 사용 → (허용 여부, 남은 횟수, 초기화까지 남은 초)"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self.buckets.get(path)
+            if bucket is None or now - bucket[0] >= self.bucket_window:
+                bucket = self.buckets[path] = [now, 0]
+            reset_after = max(0.0, bucket[0] + self.bucket_window - now)
+            if self.bucket_limit and bucket[1] >= self.bucket_limit:
+                return False, 0, reset_after
+            bucket[1] += 1
+            return True, max(0, self.bucket_limit - bucket[1]), reset_after
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body=None, headers=None):
+                data = json.dumps(body).encode('utf-8') if body is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if data:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if data:
+                    self.wfile.write(data)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                server._count('requests')
+                if server.latency or server.jitter:
+                    time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+
+                # 네트워크 장애 흉내: 응답 없이 연결 종료 / 서버 오류
+                if server.drop_rate and random.random() < server.drop_rate:
+                    server._count('dropped')
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                if server.fail_rate and random.random() < server.fail_rate:
+                    server._count('failed')
+                    self._reply(random.choice((500, 502, 503)), {"message": "Internal Server Error", "code": 0})
+                    return
+
+                url = urlparse(self.path)
+                allowed, remaining, reset_after = server._take_bucket(url.path)
+                headers = {
+                    "X-RateLimit-Limit": str(server.bucket_limit),
+                    "X-RateLimit-Remaining": str(remaining),
+                    "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+                    "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                    "X-RateLimit-Bucket": "stub-" + url.path.rsplit('/', 2)[-2],
+                }
+                if not allowed:
+                    server._count('throttled')
+                    headers["Retry-After"] = str(max(1, round(reset_after)))
+                    headers["X-RateLimit-Scope"] = "user"
+                    self._reply(429, {"message": "You are being rate limited.", "retry_after": round(reset_after, 3),
+                                      "global": False}, headers)
+                    return
+
+                try:
+                    embeds = json.loads(raw).get('embeds') or []
+                except ValueError:
+                    embeds = None
+                if embeds is None or len(embeds) > MAX_EMBEDS or sum(embed_chars(embed) for embed in embeds) > MAX_EMBED_CHARS:
+                    server._count('invalid')
+                    self._reply(400, {"message": "Invalid Form Body", "code": 50035}, headers)
+                    return
+
+                server._count('messages')
+                server._count('embeds', len(embeds))
+                if server.on_message:
+                    server.on_message(embeds)
+                if parse_qs(url.query).get('wait') == ['true']:
+                    self._reply(200, {"id": str(server.stats['messages']), "embeds": embeds}, headers)
+                else:
+                    self._reply(204, headers=headers)
+
+        return Handler
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작 → 웹훅 URL"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="discord-stub", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def print_stats(self):
+        stats = self.stats
+        print(f"🧪 대체 서버: 요청 {stats['requests']}회, 메시지 {stats['messages']}개 (임베드 {stats['embeds']}개), "
+              f"429 {stats['throttled']}회, 400 {stats['invalid']}회, 5xx {stats['failed']}회, 연결 끊김 {stats['dropped']}회")
+
+def main():
+    parser = argparse.ArgumentParser(description="디스코드 웹훅 로컬 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0, help="응답 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="응답 지연 편차 (±ms)")
+    parser.add_argument("--fail-rate", type=float, default=0, help="5xx 응답 비율")
+    parser.add_argument("--drop-rate", type=float, default=0, help="응답 없이 연결을 끊는 비율")
+    parser.add_argument("--bucket-limit", type=int, default=5, help="버킷 창당 허용 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--bucket-window", type=float, default=2.0, help="버킷 창 길이 (초)")
+    args = parser.parse_args()
+
+    server = StubWebhookServer(
+        args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000, args.fail_rate, args.drop_rate,
+        args.bucket_limit, args.bucket_window
+    )
+    print(f"🛰️ 디스코드 대체 서버 시작: {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 대체 서버 종료")
+    finally:
+        server.print_stats()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# indicator_check.py - 지표 계산 경로 (증분 엔진 / 지연 프레임 / 배치 / 백테스트 이력) 가 같은 값과 신호를 내는지 확인 (오프라인)
+#
+# 실행: python3 indicator_check.py                      (합성 가격 2000봉으로 매 봉 스캔 재현)
+#       python3 indicator_check.py --market KRW-BTC     (캔들 저장소의 1시간봉 사용)
+# 일치하지 않는 값/신호가 있으면 종료 코드 1
+
+import argparse
+import math
+import sys
+import tempfile
+
+import numpy as np
+
+from analysis.candle_series import CandleSeries
+from analysis.incremental_indicators import IncrementalIndicatorEngine
+from analysis.indicator_plan import IndicatorPlan
+from analysis.lazy_indicators import LazyIndicatorFrame
+from analysis.signal_checker import SignalChecker
+from backtest import load_config
+from config.settings import settings
+from utils.candle_store import CandleStore
+from utils.resampler import base_unit_for, resample_candles
+
+def synthetic_candles(bars, seed):
+    """로그 정규 랜덤워크 1시간봉 (고가/저가는 종가 ±1%)"""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    timestamps = (np.arange(bars, dtype=np.int64) - bars) * 3600 + 1_700_000_000 // 3600 * 3600
+    values = np.stack([np.r_[close[0], close[:-1]], close * 1.01, close * 0.99, close, rng.uniform(1, 100, bars)])
+    return timestamps, values
+
+def stored_candles(data_dir, market):
+    """캔들 저장소의 마켓 이력 → 1시간봉"""
+    unit = base_unit_for([60] + list(settings.TIMEFRAME_CONFIRMATIONS))
+    timestamps, values = CandleStore(base_dir=data_dir, unit=unit).load(market)
+    if timestamps is None:
+        return None, None
+    return resample_candles(np.asarray(timestamps), np.asarray(values), 60)
+
+def differs(a, b, tolerance):
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) != math.isnan(b)
+    return abs(a - b) > tolerance * max(1.0, abs(a), abs(b))
+
+def main():
+    parser = argparse.ArgumentParser(description="지표 계산 경로 일치 확인")
+    parser.add_argument('--config', default="signal_config.json", help="신호 설정 파일")
+    parser.add_argument('--bars', type=int, default=2000, help="합성 가격 봉 수")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--market', default="", help="합성 대신 사용할 저장소 마켓")
+    parser.add_argument('--data-dir', default="data/candles", help="캔들 저장소 경로")
+    parser.add_argument('--tolerance', type=float, default=1e-9, help="허용 상대 오차")
+    args = parser.parse_args()
+
+    plan = IndicatorPlan(**IndicatorPlan.config_args(load_config(args.config)))
+    if args.market:
+        timestamps, values = stored_candles(args.data_dir, args.market)
+        if timestamps is None or len(timestamps) <= plan.lookback:
+            print(f"❌ {args.market} 1시간봉이 {plan.lookback}개보다 적습니다")
+            sys.exit(1)
+    else:
+        timestamps, values = synthetic_candles(args.bars, args.seed)
+    series = CandleSeries.from_arrays(timestamps, values)
+    window = max(plan.window, 24)
+    engine = IncrementalIndicatorEngine(
+        ma_periods=plan.ma_periods, rsi_period=plan.rsi_period, macd=plan.macd, window=window,
+        macd_window=plan.macd_window, checkpoint_path=tempfile.mktemp(suffix=".json")
+    )
+    print(f"📐 {plan.describe()} / MACD 창 {plan.macd_window}봉")
+
+    # 백테스트/파라미터 탐색이 쓰는 전체 이력 한 번 평가
+    history, _, _ = SignalChecker.check_history(series, plan)
+
+    # 매 봉 스캔 재현: 그 봉까지 최근 lookback개 (진행 중인 봉 포함) 를 각 경로로 평가
+    scans = mismatched_values = mismatched_signals = mismatched_history = 0
+    worst = 0.0
+    windows, scan_signals = [], []
+    for end in range(plan.lookback, len(series) + 1):
+        candles = CandleSeries(*(getattr(series, name)[end - plan.lookback:end]
+                                 for name in ('timestamp',) + CandleSeries.COLUMNS))
+        incremental = engine.update("CHECK", candles)
+        lazy = LazyIndicatorFrame(candles, plan)
+        scans += 1
+
+        for name in plan.columns:
+            for back in range(1, window + 1):
+                a, b = float(incremental.last(name, back)), float(lazy.last(name, back))
+                if not (math.isnan(a) or math.isnan(b)):
+                    worst = max(worst, abs(a - b) / max(1.0, abs(a), abs(b)))
+                if differs(a, b, args.tolerance):
+                    mismatched_values += 1
+
+        signal = SignalChecker.check_all_conditions(lazy, plan)[0]
+        if SignalChecker.check_all_conditions(incremental, plan)[0] != signal:
+            mismatched_signals += 1
+        if bool(history[end - 1]) != signal:
+            mismatched_history += 1
+        windows.append(candles)
+        scan_signals.append(signal)
+
+    # 배치 모드 (batch_indicators): 모든 스캔 창을 (마켓 × 시간) 으로 묶어 한 번에 평가
+    batch = LazyIndicatorFrame(CandleSeries.stack(windows, plan.lookback), plan)
+    batch_signals, _ = SignalChecker.check_all_conditions_batch(batch, plan)
+    mismatched_batch = int((batch_signals != np.array(scan_signals)).sum())
+
+    print(f"🔎 증분 엔진 ↔ 지연 프레임: 스캔 {scans}회, 값 불일치 {mismatched_values}개, "
+          f"신호 불일치 {mismatched_signals}회 (최대 상대 오차 {worst:.1e})")
+    print(f"🔎 스캔 ↔ 백테스트 이력 (check_history): 신호 {int(history.sum())}개, 불일치 {mismatched_history}회")
+    print(f"🔎 스캔 ↔ 배치 (check_all_conditions_batch): 불일치 {mismatched_batch}회")
+    if mismatched_values or mismatched_signals or mismatched_history or mismatched_batch:
+        sys.exit(1)
+    print("✅ 모든 경로 일치")
+
+if __name__ == "__main__":
+    main()
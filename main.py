@@ -2,17 +2,31 @@
 
 import time
 import gc
+import asyncio
 import json
 import os
 import sys
 from datetime import datetime
 
+import numpy as np
+
 from api.bithumb_client import BithumbClient
 from api.discord_webhook import DiscordWebhook
-from utils.data_processor import DataProcessor
-from analysis.indicators import TechnicalIndicators
+from api.async_fetcher import AsyncCandleFetcher
+from api.bithumb_websocket import BithumbWebSocket
+from analysis.live_candle import LiveCandleBuilder
+from utils.candle_store import CandleStore
+from utils.alert_state import AlertStateStore
+from utils.resampler import base_unit_for
+from analysis.candle_series import CandleSeries
+from analysis.lazy_indicators import LazyIndicatorFrame
+from analysis.indicator_plan import IndicatorPlan
+from analysis.memo_cache import MemoCache
+from analysis.incremental_indicators import IncrementalIndicatorEngine
+from analysis.ticker_prefilter import TickerPrefilter
 from analysis.signal_checker import SignalChecker
 from config.settings import settings
+from scheduler import CandleCloseScheduler, ScanTier
 
 class TradingSignalBot:
     """발열 방지 최적화된 트레이딩 신호 봇"""
@@ -21,9 +35,31 @@ class TradingSignalBot:
         # 지연 초기화 (메모리 최적화)
         self.bithumb_client = None
         self.discord_webhook = None
+        self.candle_store = None
+        self.indicator_engine = None
         self.is_running = False
         self.last_scan_time = 0
         self.config = self.load_signal_config()
+        
+        # 활성 조건/이동평균 기간에 필요한 지표와 최소 봉 수
+        self.plan = IndicatorPlan.from_config(self.config)
+        
+        # 바뀌지 않은 마켓은 지표/신호 계산 생략
+        self.memo = MemoCache(settings.MEMO_MAX_SIZE, settings.MEMO_MAX_AGE)
+        
+        # 같은 마켓/신호의 반복 알림 억제 (쿨다운 + 조건 해제 후 재무장)
+        # 신호는 규칙 묶음 전체가 참일 때 1건이므로 규칙 묶음 식별자 하나를 키로 사용 (설정이 바뀌면 새 상태)
+        self.alert_rule = f"rules-{self.plan.signature}"
+        self.alert_state = AlertStateStore(cooldown=settings.ALERT_COOLDOWN, rearm=settings.ALERT_REARM)
+        self.alert_state.retain_rule(self.alert_rule)
+        self.prefilter = None
+        if settings.TICKER_PREFILTER:
+            self.prefilter = TickerPrefilter(self.plan, settings.PREFILTER_MARGIN, settings.PREFILTER_MIN_TRADE_VALUE)
+        
+        # 멀티 타임프레임: 가장 촘촘한 해상도 1종만 받고 나머지는 로컬 리샘플링
+        self.confirm_timeframes = [int(tf) for tf in settings.TIMEFRAME_CONFIRMATIONS]
+        self.base_unit = base_unit_for([60] + self.confirm_timeframes)
+        self.base_count = self._required_base_bars(self.plan.lookback)
     
     def load_signal_config(self):
         """signal_config.json에서 설정 로드"""
@@ -51,45 +87,171 @@ class TradingSignalBot:
             self.bithumb_client = BithumbClient()
         if self.discord_webhook is None:
             self.discord_webhook = DiscordWebhook()
+        if self.candle_store is None:
+            self.candle_store = CandleStore(unit=self.base_unit)
+        if self.indicator_engine is None and settings.INCREMENTAL_INDICATORS:
+            self.indicator_engine = IncrementalIndicatorEngine(
+                ma_periods=self.plan.ma_periods, rsi_period=self.plan.rsi_period, macd=self.plan.macd,
+                window=max(self.plan.window, 24), macd_window=self.plan.macd_window
+            )
+            restored = self.indicator_engine.load()
+            if restored:
+                print(f"📚 증분 지표 상태 복원: {restored}개 마켓")
+    
+    def _required_base_bars(self, hourly_count):
+        """1시간봉 hourly_count개와 확인 타임프레임 이동평균을 만들 기본 봉 수"""
+        per_hour = 60 // self.base_unit
+        required = hourly_count * per_hour + per_hour - 1  # 첫 시간 봉 정렬 여유
+        for timeframe in self.confirm_timeframes:
+            required = max(required, (settings.MTF_MA_PERIOD + 1) * timeframe // self.base_unit)
+        return required
+    
+    def _fetch_base_candles(self, market_code, count, before_page=None):
+        """기본 해상도 캔들 조회 (비동기 엔진용, before_page: 페이지 요청마다 속도 제한 토큰)"""
+        return self.bithumb_client.get_candle_arrays(market_code, count, self.base_unit, before_page)
+    
+    def _hourly_series(self, market_code, timestamps, values):
+        """기본 해상도 시계열 → 지표 계획에 필요한 최근 1시간봉"""
+        timestamps, values = self.candle_store.resampled(market_code, 60, timestamps, values)
+        count = self.plan.lookback
+        return timestamps[-count:], values[:, -count:]
     
-    def scan_single_coin(self, market_code):
-        """단일 코인 스캔 (1차 필터링용)"""
+    def _prepare_candles(self, market_code, arrays=None):
+        """캔들을 저장소에 병합 후 (최근 1시간봉, 확인 타임프레임 봉) 반환, 없으면 (None, None)"""
+        # 캔들 데이터 가져오기 (저장소에 없는 봉만)
+        if arrays is None:
+            count = self.candle_store.missing_count(market_code, self.base_count)
+            arrays = self._fetch_base_candles(market_code, count)
+        timestamps, values = arrays
+        if timestamps is None or not len(timestamps):
+            return None, None
+        
+        timestamps, values = self.candle_store.merge(market_code, timestamps, values)
+        candles = CandleSeries.from_arrays(*self._hourly_series(market_code, timestamps, values))
+        frames = {
+            timeframe: self.candle_store.resampled(market_code, timeframe, timestamps, values)
+            for timeframe in self.confirm_timeframes
+        }
+        return candles, frames
+    
+    def scan_single_coin(self, market_code, arrays=None):
+        """단일 코인 스캔 (1차 필터링용, 미리 받은 (타임스탬프, OHLCV) 배열이 있으면 재사용)"""
         try:
-            # 캔들 데이터 가져오기
-            candles = self.bithumb_client.get_candle_data(market_code, 200)
-            if not candles:
-                return False, None
-            
-            # 데이터 변환 및 검증
-            df = DataProcessor.candles_to_dataframe(candles)
-            if not DataProcessor.validate_data(df):
-                return False, None
-            
-            # 기술적 지표 계산
-            df = TechnicalIndicators.calculate_all_indicators(df)
-            
-            # 1차 필터: 가격이 25일선 위인지 체크 (가장 빠른 조건)
-            latest = df.iloc[-1]
-            if latest['close'] <= latest['ma25']:
+            candles, frames = self._prepare_candles(market_code, arrays)
+            if candles is None:
                 return False, None
-            
-            # 4가지 조건 모두 체크
-            signal_found, analysis = SignalChecker.check_all_conditions(df)
-            
-            return signal_found, analysis
+            return self.analyze_candles(candles, frames, market_code)
             
         except Exception as e:
             print(f"{market_code} 스캔 오류: {e}")
             return False, None
     
-    def scan_all_coins(self):
-        """모든 코인 스캔"""
+    def analyze_dataframe(self, df, frames=None):
+        """캔들 DataFrame 분석 (대화형 사용용 어댑터)"""
+        return self.analyze_candles(CandleSeries.from_dataframe(df), frames)
+    
+    def _memo_key(self, market_code, candles):
+        """메모 캐시 키: 마켓 + 마지막 확정 봉 + 진행 중인 봉 (시각, 종가) + 지표 설정"""
+        timestamps = candles.timestamp
+        last_closed = int(timestamps[-2]) if len(timestamps) > 1 else None
+        return (market_code, last_closed, int(timestamps[-1]), float(candles.close[-1]), len(candles), self.plan.key)
+    
+    def analyze_candles(self, candles, frames=None, market_code=None):
+        """캔들 시계열 분석 (검증 → 지표 계산 → 신호 조건 체크 → 타임프레임 확인)"""
+        if not candles.validate(self.plan.lookback):
+            return False, None
+        
+        # 같은 봉/가격/설정으로 이미 계산한 마켓은 결과 재사용
+        if market_code:
+            signal_found, analysis = self.memo.get_or_compute(
+                self._memo_key(market_code, candles), lambda: self._check_candles(candles, market_code)
+            )
+        else:
+            signal_found, analysis = self._check_candles(candles)
+        if isinstance(analysis, dict):
+            analysis = dict(analysis, conditions=dict(analysis['conditions']))
+        
+        # 다른 타임프레임에서도 추세 확인 (설정된 경우만)
+        if frames and isinstance(analysis, dict):
+            confirmed = SignalChecker.check_timeframe_confirmation(frames, settings.MTF_MA_PERIOD)
+            analysis['conditions']['mtf_confirmed'] = confirmed
+            signal_found = signal_found and confirmed
+        
+        return signal_found, analysis
+    
+    def _check_candles(self, candles, market_code=None):
+        """지표 계산 + 신호 조건 체크 → (신호 여부, 분석 데이터)"""
+        # 기술적 지표 계산 (마켓 상태가 있으면 새 봉만 증분 반영, 없으면 조건이 보는 봉만 지연 계산)
+        if market_code and self.indicator_engine is not None:
+            frame = self.indicator_engine.update(market_code, candles)
+        else:
+            frame = LazyIndicatorFrame(candles, self.plan)
+        
+        # 신호 규칙 체크 (저렴하고 잘 걸러내는 조건부터 평가하고 탈락하면 중단)
+        return SignalChecker.check_all_conditions(frame, self.plan)
+    
+    def analyze_batch(self, prepared):
+        """여러 마켓을 (마켓 × 시간) 배열로 묶어 한 번에 분석 → [(마켓, 분석 데이터)] 신호 목록
+
+        마켓별 경로와 같은 최근 plan.lookback봉 / MACD 창 규약이라 신호가 같다 (indicator_check.py로 확인).
+        증분 지표 엔진은 거치지 않으므로 배치 모드 동안 그 체크포인트는 갱신되지 않는다
+        (마켓별 경로로 돌아가면 이어지지 않는 마켓만 다시 쌓으며, 값은 규약상 같다).
+        """
+        prepared = [
+            (market, candles, frames) for market, candles, frames in prepared
+            if candles.validate(self.plan.lookback)
+        ]
+        
+        # 메모 캐시에 없는 마켓만 묶어서 계산
+        results = {}
+        pending = []
+        for market_code, candles, frames in prepared:
+            key = self._memo_key(market_code, candles)
+            cached = self.memo.get(key)
+            if cached is None:
+                pending.append((market_code, candles, key))
+            else:
+                results[market_code] = cached
+        
+        if pending:
+            # 모든 마켓의 지표를 몇 번의 벡터 연산으로 (조건이 보는 봉만) 계산 후 조건을 불리언 배열로 체크
+            frame = LazyIndicatorFrame(
+                CandleSeries.stack([candles for _, candles, _ in pending], self.plan.lookback), self.plan
+            )
+            signals, conditions = SignalChecker.check_all_conditions_batch(frame, self.plan)
+            for index, (market_code, _, key) in enumerate(pending):
+                result = (False, None)
+                if signals[index]:
+                    result = (True, SignalChecker.batch_analysis(frame, conditions, index, self.plan))
+                self.memo.put(key, result)
+                results[market_code] = result
+        
+        signal_list = []
+        for market_code, _, frames in prepared:
+            signal_found, analysis = results[market_code]
+            if not signal_found:
+                continue
+            analysis = dict(analysis, conditions=dict(analysis['conditions']))
+            
+            # 다른 타임프레임 확인은 신호 후보만
+            if frames:
+                confirmed = SignalChecker.check_timeframe_confirmation(frames, settings.MTF_MA_PERIOD)
+                analysis['conditions']['mtf_confirmed'] = confirmed
+                if not confirmed:
+                    continue
+            signal_list.append((market_code, analysis))
+        
+        return signal_list
+    
+    def scan_all_coins(self, tier=None):
+        """모든 코인 스캔 (tier 지정 시 해당 거래량 순위 구간만 요청 예산 안에서)"""
         start_time = time.time()
         signal_count = 0
         scanned_count = 0
         
         try:
-            print(f"\n=== 스캔 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
+            scope = f" ({tier.name})" if tier else ""
+            print(f"\n=== 스캔 시작{scope}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
             
             # 지연 초기화
             self._lazy_init_components()
@@ -110,41 +272,54 @@ class TradingSignalBot:
             target_count = min(self.config['top_coins_count'], len(top_tickers))
             target_tickers = top_tickers[:target_count]
             
-            print(f"거래량 상위 {target_count}개 코인 스캔 시작...")
+            # 순위 구간 스캔: 현재 거래량 순위로 구성원 결정
+            if tier is not None:
+                target_tickers, entered = tier.members(target_tickers)
+                moved = f", 신규 진입 {entered}개" if entered else ""
+                print(f"거래량 순위 {tier.rank_start + 1}~{tier.rank_start + len(target_tickers)}위 "
+                      f"{len(target_tickers)}개 코인 스캔 시작{moved}...")
+            else:
+                print(f"거래량 상위 {target_count}개 코인 스캔 시작...")
+            print(f"📐 {self.plan.describe()}")
             
-            # 각 코인별 신호 체크
-            for ticker in target_tickers:
-                market_code = ticker['market']
-                scanned_count += 1
-                
-                # 신호 체크
-                signal_found, analysis = self.scan_single_coin(market_code)
-                
-                if signal_found and isinstance(analysis, dict):
-                    signal_count += 1
-                    print(f"🚀 신호 발견: {market_code}")
-                    
-                    # 핵심: bithumb_client 인스턴스 전달하여 거래량 순위 표시
-                    self.discord_webhook.send_signal_alert(
-                        coin_data=ticker, 
-                        analysis_data=analysis, 
-                        btc_data=btc_ticker,
-                        bithumb_client=self.bithumb_client  # 거래량 순위를 위해 필수!
-                    )
-                
-                # 진행률 표시 (매 50개마다)
-                if scanned_count % 50 == 0:
-                    print(f"진행: {scanned_count}/{target_count} ({scanned_count/target_count*100:.1f}%)")
-                
-                # API 호출 제한 (발열 방지)
-                time.sleep(0.1)
+            # 티커만으로 규칙을 만족할 수 없는 마켓은 캔들 조회 생략
+            if self.prefilter is not None:
+                target_tickers = self._prefilter_targets(target_tickers)
+            
+            # 구간의 분당 요청 예산을 넘는 마켓은 다음 회차로
+            if tier is not None and target_tickers:
+                selected = tier.within_budget(target_tickers, self._request_pages)
+                if len(selected) < len(target_tickers):
+                    print(f"⏳ {tier.name} 요청 예산 {tier.budget}건: {len(target_tickers)}개 중 {len(selected)}개 조회, "
+                          f"나머지는 다음 회차")
+                target_tickers = selected
+            self.memo.reset_stats()
+            self.alert_state.reset_stats()
+            
+            # 캔들 동시 조회 + 도착 순서대로 신호 체크
+            scanned_count, signal_count = asyncio.run(
+                self._scan_targets(target_tickers, btc_ticker, tier.rate_limit if tier else None)
+            )
             
             # 스캔 완료
             scan_time = time.time() - start_time
-            print(f"\n=== 스캔 완료 ===")
+            print(f"\n=== 스캔 완료{scope} ===")
             print(f"스캔 코인: {scanned_count}개")
             print(f"신호 발견: {signal_count}개")
+            alert_stats = self.alert_state.get_stats()
+            print(f"알림 발송: {alert_stats['alerts']}개")
+            if alert_stats['suppressed']:
+                print(f"🔕 중복 알림 억제: {alert_stats['suppressed']}개 (쿨다운 {alert_stats['suppressed_cooldown']}개, "
+                      f"조건 해제 대기 {alert_stats['suppressed_rearm']}개)")
             print(f"소요 시간: {scan_time:.1f}초")
+            self.bithumb_client.transport.print_stats()
+            memo_stats = self.memo.get_stats()
+            print(f"🧠 지표 메모 캐시: 적중 {memo_stats['hits']}개 / 계산 {memo_stats['misses']}개")
+            
+            # 증분 지표 상태 저장 (다음 스캔/재시작 시 이어서 계산)
+            if self.indicator_engine is not None:
+                self.indicator_engine.save()
+            self.alert_state.save()
             
             # 메모리 정리 (발열 방지)
             gc.collect()
@@ -152,76 +327,343 @@ class TradingSignalBot:
         except Exception as e:
             print(f"스캔 오류: {e}")
     
+    def _prefilter_targets(self, tickers):
+        """티커 사전 필터 적용 (제외한 마켓 수와 절약한 캔들 요청 수를 0건이어도 매 스캔 출력)"""
+        kept, skipped = self.prefilter.apply(tickers)
+        markets = [market for group in skipped.values() for market in group]
+        for market in markets:
+            self.alert_state.clear(market, self.alert_rule)
+        saved = sum(self._request_pages(market) for market in markets)
+        reasons = ", ".join(f"{reason} {len(group)}개" for reason, group in skipped.items()) or "해당 없음"
+        print(f"⏭️ 티커 사전 필터: {len(tickers)}개 중 {len(markets)}개 제외 ({reasons}) → 캔들 요청 {saved}건 절약")
+        return kept
+    
+    def _request_pages(self, market):
+        """마켓 캔들 조회에 필요한 요청 수 (200개 단위 페이지)"""
+        return -(-self.candle_store.missing_count(market, self.base_count) // 200)
+    
+    def _send_alert(self, market_code, analysis, coin_data, btc_ticker):
+        """쿨다운/재무장 상태를 확인한 뒤 알림 발송 (억제되면 False)"""
+        if not self.alert_state.should_alert(market_code, self.alert_rule):
+            print(f"🔕 {market_code} 중복 알림 생략")
+            return False
+        
+        # 핵심: bithumb_client 인스턴스 전달하여 거래량 순위 표시
+        self.discord_webhook.send_signal_alert(
+            coin_data=coin_data,
+            analysis_data=analysis,
+            btc_data=btc_ticker,
+            bithumb_client=self.bithumb_client  # 거래량 순위를 위해 필수!
+        )
+        return True
+    
+    async def _scan_targets(self, target_tickers, btc_ticker, rate_limit=None):
+        """비동기 엔진으로 캔들을 동시에 받아 도착하는 대로 분석 (rate_limit: 초당 요청 수, 기본 전역 설정)"""
+        scanned_count = 0
+        signal_count = 0
+        target_count = len(target_tickers)
+        tickers_by_market = {ticker['market']: ticker for ticker in target_tickers}
+        
+        # 저장소에 없는 봉 개수만큼만 요청 (웜 스캔은 마켓당 1~2개)
+        counts = {
+            market: self.candle_store.missing_count(market, self.base_count)
+            for market in tickers_by_market
+        }
+        
+        if rate_limit:
+            rate_limit = min(rate_limit, settings.FETCH_RATE_LIMIT)
+        fetcher = AsyncCandleFetcher(self.bithumb_client, rate_limit=rate_limit, fetch=self._fetch_base_candles,
+                                     paged=True)
+        prepared = []
+        async for market_code, arrays in fetcher.iter_candles(list(tickers_by_market), counts):
+            scanned_count += 1
+            
+            # 배치 모드: 캔들만 모아두고 전부 도착한 뒤 한 번에 분석
+            if settings.BATCH_INDICATORS:
+                try:
+                    candles, frames = self._prepare_candles(market_code, arrays or (None, None))
+                    if candles is not None:
+                        prepared.append((market_code, candles, frames))
+                except Exception as e:
+                    print(f"{market_code} 스캔 오류: {e}")
+                continue
+            
+            # 신호 체크
+            signal_found, analysis = self.scan_single_coin(market_code, arrays or (None, None))
+            
+            if signal_found and isinstance(analysis, dict):
+                signal_count += 1
+                print(f"🚀 신호 발견: {market_code}")
+                self._send_alert(market_code, analysis, tickers_by_market[market_code], btc_ticker)
+            elif isinstance(analysis, dict):
+                self.alert_state.clear(market_code, self.alert_rule)
+            
+            # 진행률 표시 (매 50개마다)
+            if scanned_count % 50 == 0:
+                print(f"진행: {scanned_count}/{target_count} ({scanned_count/target_count*100:.1f}%)")
+        
+        signals = self.analyze_batch(prepared)
+        for market_code, analysis in signals:
+            signal_count += 1
+            print(f"🚀 신호 발견: {market_code}")
+            self._send_alert(market_code, analysis, tickers_by_market[market_code], btc_ticker)
+        
+        signalled = {market_code for market_code, _ in signals}
+        for market_code, candles, _ in prepared:
+            if market_code not in signalled and candles.validate(self.plan.lookback):
+                self.alert_state.clear(market_code, self.alert_rule)
+        
+        return scanned_count, signal_count
+    
     def run_once(self):
         """1회 스캔 실행"""
         self.scan_all_coins()
         self.cleanup()
     
-    def show_countdown_with_animation(self, total_seconds):
-        """카운트다운과 애니메이션 표시 (GitHub Actions에서는 건너뛰기)"""
-        # GitHub Actions 환경에서는 애니메이션 없이 대기만
-        if os.getenv('GITHUB_ACTIONS'):
-            print(f"💤 {total_seconds//60}분 대기 중...")
-            time.sleep(total_seconds)
-            return
+    def run_streaming(self, duration=None, record_path=None, offline=False):
+        """WebSocket 실시간 모드 실행 (duration초 후 종료, None이면 계속 / offline: REST 없이 저장소 캔들로 시작)"""
+        self.is_running = True
+        print("⚡ 실시간 스트리밍 모드 시작 (빗썸 WebSocket" + (", 오프라인 저장소 시드)" if offline else ")"))
+        print("Ctrl+C로 중단")
+        
+        try:
+            asyncio.run(self._stream_signals(duration, record_path, offline))
+        except KeyboardInterrupt:
+            print("\n\n🛑 사용자가 중단했습니다.")
+        except Exception as e:
+            print(f"\n\n❌ 스트리밍 오류: {e}")
+        finally:
+            self.is_running = False
+            self.cleanup()
+    
+    async def _seed_live_candles(self, target_tickers, builder):
+        """REST로 과거 봉을 받아 실시간 봉 생성기 초기화"""
+        markets = [ticker['market'] for ticker in target_tickers]
+        counts = {market: self.candle_store.missing_count(market, self.base_count) for market in markets}
+        
+        fetcher = AsyncCandleFetcher(self.bithumb_client, fetch=self._fetch_base_candles, paged=True)
+        async for market_code, arrays in fetcher.iter_candles(markets, counts):
+            timestamps, values = arrays or (None, None)
+            if timestamps is None or not len(timestamps):
+                continue
+            timestamps, values = self.candle_store.merge(market_code, timestamps, values)
+            builder.seed(market_code, *self._hourly_series(market_code, timestamps, values))
+    
+    def _seed_stored_candles(self, builder):
+        """REST 없이 캔들 저장소만으로 실시간 봉 생성기 초기화 → {마켓: 저장 봉으로 만든 티커}
+
+        저장된 마켓 중 최근 24시간 거래대금 상위 top_coins_count개를 대상으로 한다 (오프라인 재생 테스트용).
+        """
+        tickers = []
+        for market in self.candle_store.markets():
+            timestamps, values = self.candle_store.load(market)
+            if timestamps is None or not len(timestamps):
+                continue
+            timestamps, values = self._hourly_series(market, np.asarray(timestamps), np.asarray(values))
+            close, volume = values[3], values[4]
+            day = slice(-24, None)
+            tickers.append(({
+                'market': market,
+                'trade_price': float(close[-1]),
+                'signed_change_rate': float(close[-1] / close[-25] - 1) if len(close) > 24 else 0.0,
+                'acc_trade_price_24h': float((close[day] * volume[day]).sum()),
+                'acc_trade_volume_24h': float(volume[day].sum())
+            }, timestamps, values))
+        
+        tickers.sort(key=lambda item: -item[0]['acc_trade_price_24h'])
+        tickers_by_market = {}
+        for ticker, timestamps, values in tickers[:self.config['top_coins_count']]:
+            builder.seed(ticker['market'], timestamps, values)
+            tickers_by_market[ticker['market']] = ticker
+        return tickers_by_market
+    
+    def _apply_stream_message(self, message, builder, tickers_by_market, dirty):
+        """WebSocket 메시지 반영 (체결 → 실시간 봉, 티커 → 알림용 현재가 정보)"""
+        message_type = message.get('type')
+        content = message.get('content') or {}
         
-        animation_chars = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
+        if message_type == 'transaction':
+            for trade in content.get('list', []):
+                market_code = BithumbWebSocket.to_market(trade.get('symbol', ''))
+                if market_code not in tickers_by_market:
+                    continue
+                try:
+                    previous_bucket = builder.live.get(market_code, [None])[0]
+                    updated = builder.apply_trade(
+                        market_code,
+                        float(trade['contPrice']),
+                        float(trade['contQty']),
+                        LiveCandleBuilder.parse_trade_time(trade['contDtm'])
+                    )
+                except (KeyError, ValueError):
+                    continue
+                if not updated:
+                    continue
+                dirty.add(market_code)
+                
+                # 봉이 바뀌면 확정된 봉을 디스크 저장소에도 반영 (저장소가 1시간봉일 때)
+                if (self.base_unit == 60 and previous_bucket is not None
+                        and builder.live[market_code][0] != previous_bucket):
+                    timestamps, values = builder.closed_candle(market_code)
+                    if timestamps is not None:
+                        self.candle_store.merge(market_code, timestamps, values)
         
-        for remaining in range(total_seconds, 0, -1):
-            # 시간 포맷팅 (분:초)
-            minutes = remaining // 60
-            seconds = remaining % 60
-            time_str = f"{minutes:02d}:{seconds:02d}"
+        elif message_type == 'ticker':
+            market_code = BithumbWebSocket.to_market(content.get('symbol', ''))
+            ticker = tickers_by_market.get(market_code)
+            if ticker is None:
+                return
+            try:
+                ticker['trade_price'] = float(content['closePrice'])
+                ticker['signed_change_rate'] = float(content['chgRate']) / 100
+                ticker['acc_trade_price_24h'] = float(content['value'])
+                ticker['acc_trade_volume_24h'] = float(content['volume'])
+            except (KeyError, ValueError):
+                pass
+    
+    def _evaluate_dirty_markets(self, dirty, builder, tickers_by_market, alerted):
+        """체결이 있었던 마켓만 재평가, 발견한 신호 수 반환"""
+        signal_count = 0
+        btc_ticker = tickers_by_market.get('KRW-BTC')
+        
+        for market_code in dirty:
+            timestamps, values = builder.series(market_code, self.plan.lookback)
+            try:
+                signal_found, analysis = self.analyze_candles(
+                    CandleSeries.from_arrays(timestamps, values), market_code=market_code
+                )
+            except Exception as e:
+                print(f"{market_code} 실시간 분석 오류: {e}")
+                continue
             
-            # 애니메이션 문자 선택
-            anim_char = animation_chars[remaining % len(animation_chars)]
+            if not (signal_found and isinstance(analysis, dict)):
+                if isinstance(analysis, dict):
+                    self.alert_state.clear(market_code, self.alert_rule)
+                continue
             
-            # 진행률 바 생성 (30자)
-            total_duration = self.config['scan_interval']
-            progress = (total_duration - remaining) / total_duration
-            filled_length = int(30 * progress)
-            bar = '█' * filled_length + '░' * (30 - filled_length)
+            # 같은 봉에서는 한 번만 신호 처리
+            current_bucket = builder.live[market_code][0]
+            if alerted.get(market_code) == current_bucket:
+                continue
             
-            # 터미널 출력 (같은 줄에 덮어쓰기)
-            print(f"\r{anim_char} 다음 스캔까지: {time_str} [{bar}] {progress*100:.1f}%", end='', flush=True)
+            alerted[market_code] = current_bucket
+            signal_count += 1
+            print(f"⚡ 실시간 신호 발견: {market_code}")
+            self._send_alert(market_code, analysis, tickers_by_market[market_code], btc_ticker)
+        
+        dirty.clear()
+        return signal_count
+    
+    async def _stream_signals(self, duration, record_path, offline=False):
+        """과거 봉 준비 → WebSocket 구독 → 체결된 마켓만 주기적으로 재평가"""
+        self._lazy_init_components()
+        builder = LiveCandleBuilder(max_bars=self.plan.lookback)
+        
+        if offline:
+            # 재생 서버 테스트용: 마켓/티커/과거 봉 모두 저장소에서 (네트워크 요청 없음)
+            tickers_by_market = self._seed_stored_candles(builder)
+            if not tickers_by_market:
+                print(f"❌ 캔들 저장소 ({self.candle_store.base_dir}) 에 {self.base_unit}분봉이 없습니다")
+                return
+        else:
+            markets = self.bithumb_client.get_market_list()
+            top_tickers, _ = self.bithumb_client.get_ticker_data(markets)
+            if not top_tickers:
+                print("거래량 데이터 조회 실패")
+                return
             
-            time.sleep(1)
+            target_tickers = top_tickers[:min(self.config['top_coins_count'], len(top_tickers))]
+            tickers_by_market = {ticker['market']: dict(ticker) for ticker in target_tickers}
+            await self._seed_live_candles(target_tickers, builder)
+        print(f"📚 과거 봉 준비 완료: {len(builder.live)}개 마켓")
         
-        # 카운트다운 완료 후 줄바꿈
-        print()
+        # 수신 메시지는 큐로 넘겨 대기 시간 제한과 분리
+        queue = asyncio.Queue()
+        websocket = BithumbWebSocket(record_path=record_path)
+        
+        async def receive():
+            async for message in websocket.stream(list(tickers_by_market)):
+                await queue.put(message)
+        
+        receiver = asyncio.ensure_future(receive())
+        eval_interval = settings.STREAM_EVAL_INTERVAL
+        deadline = time.monotonic() + duration if duration else None
+        dirty = set()
+        alerted = {}
+        signal_count = 0
+        last_eval = time.monotonic()
+        
+        try:
+            while self.is_running and (deadline is None or time.monotonic() < deadline):
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=eval_interval)
+                    self._apply_stream_message(message, builder, tickers_by_market, dirty)
+                except asyncio.TimeoutError:
+                    pass
+                
+                if dirty and time.monotonic() - last_eval >= eval_interval:
+                    started = time.monotonic()
+                    evaluated = len(dirty)
+                    signal_count += self._evaluate_dirty_markets(dirty, builder, tickers_by_market, alerted)
+                    last_eval = time.monotonic()
+                    print(f"⚡ {evaluated}개 마켓 재평가 ({(last_eval - started) * 1000:.0f}ms)")
+        finally:
+            receiver.cancel()
+            self.alert_state.save()
+            print(f"\n=== 스트리밍 종료: 메시지 {websocket.message_count}개, 신호 {signal_count}개 ===")
+    
+    def refresh_tickers(self):
+        """스캔 사이 가벼운 작업: 티커 1회 조회로 거래량 순위 이력만 갱신"""
+        self._lazy_init_components()
+        markets = self.bithumb_client.get_market_list()
+        if markets:
+            self.bithumb_client.get_ticker_data(markets)
     
     def run_continuous(self):
-        """연속 스캔 실행 (애니메이션 추가)"""
+        """연속 스캔 실행 (캔들 마감 직후에 맞춰 스캔, 순위 구간이 있으면 구간별 주기로, 그 사이에는 티커만 갱신)"""
         self.is_running = True
-        print(f"🚀 연속 스캔 모드 시작 (간격: {self.config['scan_interval']//60}분)")
+        scheduler = CandleCloseScheduler()
+        candle_seconds = settings.SCAN_CANDLE_UNIT * 60 or self.config['scan_interval']
+        tiers = ScanTier.from_config(settings.SCAN_TIERS, self.config['top_coins_count'], candle_seconds)
+        
+        def schedule(name, callback, interval=0):
+            """interval초마다, 0이면 캔들 마감마다 (scan_candle_unit 0이면 scan_interval 고정 간격)"""
+            if interval or not settings.SCAN_CANDLE_UNIT:
+                scheduler.every(name, callback, interval or self.config['scan_interval'], announce=True, run_now=True)
+            else:
+                scheduler.at_candle_close(name, callback, settings.SCAN_CANDLE_UNIT, settings.SCAN_SETTLE_DELAY, run_now=True)
+        
+        if tiers:
+            for tier in tiers:
+                schedule(f"{tier.name} 스캔", lambda tier=tier: self.scan_all_coins(tier), tier.interval)
+            print("🚀 연속 스캔 모드 시작 (거래량 순위 구간별)")
+            for tier in tiers:
+                print(f"   - {tier.describe()}")
+        else:
+            schedule("전체 스캔", self.scan_all_coins)
+            if settings.SCAN_CANDLE_UNIT:
+                print(f"🚀 연속 스캔 모드 시작 ({settings.SCAN_CANDLE_UNIT}분봉 마감 {settings.SCAN_SETTLE_DELAY}초 후 스캔)")
+            else:
+                print(f"🚀 연속 스캔 모드 시작 (간격: {self.config['scan_interval']//60}분)")
+        if settings.TICKER_REFRESH_INTERVAL:
+            scheduler.every("티커 갱신", self.refresh_tickers, settings.TICKER_REFRESH_INTERVAL)
         print("Ctrl+C로 중단")
         
         try:
-            while self.is_running:
-                # 스캔 실행
-                self.scan_all_coins()
-                self.last_scan_time = time.time()
-                
-                print(f"\n💤 다음 스캔까지 {self.config['scan_interval']//60}분 대기...")
-                
-                # 애니메이션과 함께 대기
-                try:
-                    self.show_countdown_with_animation(self.config['scan_interval'])
-                except KeyboardInterrupt:
-                    # Ctrl+C 시 즉시 종료
-                    raise KeyboardInterrupt
-                
+            scheduler.run()
         except KeyboardInterrupt:
             print("\n\n🛑 사용자가 중단했습니다.")
-            self.is_running = False
         except Exception as e:
             print(f"\n\n❌ 실행 오류: {e}")
-            self.is_running = False
         finally:
+            self.is_running = False
             self.cleanup()
     
     def cleanup(self):
         """리소스 정리 (메모리 최적화)"""
+        if self.indicator_engine:
+            self.indicator_engine.save()
+            self.indicator_engine = None
         if self.bithumb_client:
             self.bithumb_client.close()
             self.bithumb_client = None
@@ -233,6 +675,14 @@ class TradingSignalBot:
         gc.collect()
         print("✅ 리소스 정리 완료")
 
+def get_arg_value(flag):
+    """명령행에서 flag 다음 값 조회 (없으면 None)"""
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return None
+
 def main():
     """메인 실행 함수 (GitHub Actions 지원)"""
     try:
@@ -255,6 +705,16 @@ def main():
                 bot = TradingSignalBot()
                 bot.run_continuous()
                 return
+            elif '--stream' in sys.argv:
+                # 선택 옵션: --duration 초, --record 기록파일.jsonl, --offline (REST 없이 저장소 캔들로 시작)
+                duration = get_arg_value('--duration')
+                bot = TradingSignalBot()
+                bot.run_streaming(
+                    duration=float(duration) if duration else None,
+                    record_path=get_arg_value('--record'),
+                    offline='--offline' in sys.argv
+                )
+                return
         
         # 대화형 모드 (로컬 실행)
         print("🎯 빗썸 상승신호 알림 시스템")
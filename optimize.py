@@ -0,0 +1,78 @@
+# optimize.py - 저장된 캔들로 신호 파라미터 조합 탐색 후 순위 표 출력 (네트워크 없이 실행)
+#
+# 실행: python3 optimize.py --rsi 40,45,50,55 --max-increase 0.1,0.2,0.3
+#       python3 optimize.py --ma-periods "9,25,99,200;7,20,60,120" --toggle require_macd_golden_cross
+#       python3 optimize.py --apply 1   (저장된 탐색 결과 --output 의 1위 조합을 signal_config.json에 저장, 재탐색 없음)
+
+import argparse
+
+from analysis.optimizer import ParameterSweep
+from backtest import load_config
+from config.settings import settings
+from config_manager import ConfigManager
+from utils.resampler import base_unit_for
+
+def parse_numbers(text, cast=float):
+    return [cast(value) for value in text.split(',') if value.strip()]
+
+def build_grid(args):
+    """명령행 인자 → 탐색 그리드 (지정하지 않은 키는 현재 설정 고정)"""
+    grid = {
+        'rsi_threshold': parse_numbers(args.rsi),
+        'max_increase': parse_numbers(args.max_increase),
+    }
+    if args.ma_periods:
+        grid['ma_periods'] = [sorted(parse_numbers(group, int)) for group in args.ma_periods.split(';') if group.strip()]
+    for flag in args.toggle:
+        grid[flag] = [True, False]
+    return grid
+
+def main():
+    parser = argparse.ArgumentParser(description="신호 파라미터 조합 탐색")
+    parser.add_argument('--data-dir', default="data/candles", help="캔들 저장소 경로")
+    parser.add_argument('--unit', type=int, default=base_unit_for([60] + list(settings.TIMEFRAME_CONFIRMATIONS)),
+                        help="저장된 캔들 단위 (분)")
+    parser.add_argument('--config', default=ConfigManager.CONFIG_FILE, help="기준 신호 설정 파일")
+    parser.add_argument('--rsi', default="40,45,50,55,60", help="RSI 임계값 후보")
+    parser.add_argument('--max-increase', default="0.1,0.2,0.3", help="24시간 상승률 제한 후보")
+    parser.add_argument('--ma-periods', default="", help="이동평균 기간 후보 (세미콜론으로 구분, 예: 9,25,99,200;7,20,60,120)")
+    parser.add_argument('--toggle', action='append', default=[],
+                        choices=['require_ma_breakout', 'require_macd_golden_cross', 'require_price_above_ma25'],
+                        help="켜고 끈 두 경우를 모두 평가할 조건 (반복 가능)")
+    parser.add_argument('--horizon', type=int, default=24, help="평가 수익률 구간 (시간)")
+    parser.add_argument('--min-signals', type=int, default=20, help="순위에 필요한 최소 신호 수")
+    parser.add_argument('--keep', type=float, default=0.5, help="표본 단계에서 유지할 상위 조합 비율")
+    parser.add_argument('--sample', type=float, default=0.25, help="표본 단계 마켓 비율 (0이면 생략)")
+    parser.add_argument('--workers', type=int, default=None, help="작업 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--output', default="data/backtest/sweep.json", help="순위 결과 파일")
+    parser.add_argument('--apply', type=int, default=0, help="탐색 없이 --output 결과에서 이 순위의 파라미터를 signal_config.json에 저장")
+    args = parser.parse_args()
+
+    if args.apply:
+        rows = ParameterSweep.load(args.output)
+        if rows is None:
+            print(f"❌ 탐색 결과 파일이 없습니다: {args.output} (먼저 --apply 없이 탐색 실행)")
+            return
+        if not 1 <= args.apply <= len(rows):
+            print(f"❌ {args.apply}위 조합이 없습니다")
+            return
+        if rows[args.apply - 1]['signals'] < args.min_signals:
+            print(f"❌ {args.apply}위 조합은 신호가 {args.min_signals}개 미만이라 적용하지 않습니다")
+            return
+        manager = ConfigManager()
+        manager.config.update(rows[args.apply - 1]['params'])
+        manager.save_config()
+        print(f"📝 {args.apply}위 파라미터 적용: {rows[args.apply - 1]['params']}")
+        return
+
+    config = load_config(args.config)
+    sweep = ParameterSweep(
+        build_grid(args), base_config=config, base_dir=args.data_dir, unit=args.unit,
+        horizon=args.horizon, workers=args.workers, min_signals=args.min_signals, keep=args.keep, sample=args.sample
+    )
+    rows = sweep.run()
+    sweep.save(rows, args.output)
+    sweep.print_ranking(rows)
+
+if __name__ == "__main__":
+    main()
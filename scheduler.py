@@ -0,0 +1,187 @@
+# scheduler.py - 캔들 마감 시각에 맞춘 스캔 스케줄러 (마감 사이에는 가벼운 작업만, 다음 작업 시각에 정확히 깨어남)
+
+import threading
+import time
+from datetime import datetime
+
+from utils.resampler import boundary_offset
+
+class ScheduledJob:
+    """주기 작업 1개 (aligned면 interval 경계 + offset 시각, 아니면 이전 예정 시각 + interval)"""
+
+    __slots__ = ('name', 'callback', 'interval', 'offset', 'aligned', 'announce', 'next_run', 'runs', 'skipped')
+
+    def __init__(self, name, callback, interval, offset=0.0, aligned=False, announce=False, run_now=False):
+        self.name = name
+        self.callback = callback
+        self.interval = float(interval)
+        self.offset = float(offset)
+        self.aligned = aligned
+        self.announce = announce
+        self.runs = 0
+        self.skipped = 0
+        now = time.time()
+        self.next_run = now if run_now else self._following(now)
+
+    def _following(self, now):
+        """now 이후 첫 예정 시각"""
+        if self.aligned:
+            return ((now - self.offset) // self.interval + 1) * self.interval + self.offset
+        return now + self.interval
+
+    def reschedule(self, now):
+        """실행 후 다음 예정 시각 (실행이 길어져 지나간 회차는 건너뜀, 고정 간격도 시작 시각 기준이라 밀리지 않음)"""
+        previous = self.next_run
+        if self.aligned:
+            self.next_run = self._following(now)
+            missed = round((self.next_run - self._following(previous)) / self.interval)
+        else:
+            missed = max(0, int((now - previous) // self.interval))
+            self.next_run = previous + (missed + 1) * self.interval
+        self.skipped += missed
+        return missed
+
+class CandleCloseScheduler:
+    """캔들 마감 직후 (settle_delay초 뒤) 전체 스캔, 그 사이에는 등록된 가벼운 작업만 실행
+
+    1초마다 깨어나는 대기 루프 대신 가장 빠른 예정 작업 시각까지 한 번에 대기한다.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self._stop = threading.Event()
+
+    def at_candle_close(self, name, callback, unit_minutes=60, settle_delay=5.0, run_now=False):
+        """unit_minutes분봉 마감 + settle_delay초마다 실행 (거래소 봉 확정 여유)"""
+        interval = unit_minutes * 60
+        job = ScheduledJob(name, callback, interval, -boundary_offset(interval) % interval + settle_delay,
+                           aligned=True, announce=True, run_now=run_now)
+        self.jobs.append(job)
+        return job
+
+    def every(self, name, callback, interval, announce=False, run_now=False):
+        """interval초마다 실행"""
+        job = ScheduledJob(name, callback, interval, announce=announce, run_now=run_now)
+        self.jobs.append(job)
+        return job
+
+    def stop(self):
+        """대기 중이면 바로 깨워서 종료"""
+        self._stop.set()
+
+    @staticmethod
+    def _format_wait(seconds):
+        minutes, seconds = divmod(int(round(seconds)), 60)
+        return f"{minutes}분 {seconds:02d}초" if minutes else f"{seconds}초"
+
+    def _wait_until(self, target):
+        """target 시각까지 대기 (일찍 깨어나면 남은 시간만 다시 대기), 종료 요청 시 False"""
+        while not self._stop.is_set():
+            remaining = target - time.time()
+            if remaining <= 0:
+                return True
+            self._stop.wait(remaining)
+        return False
+
+    def run(self):
+        """stop() 또는 KeyboardInterrupt까지 예정된 작업 실행"""
+        self._stop.clear()
+        announced = None
+        while self.jobs and not self._stop.is_set():
+            job = min(self.jobs, key=lambda item: item.next_run)
+
+            # 다음 주요 작업 시각은 바뀔 때만 한 줄 출력
+            upcoming = min((item for item in self.jobs if item.announce), key=lambda item: item.next_run, default=None)
+            wait = job.next_run - time.time()
+            if upcoming is not None and upcoming.next_run != announced and upcoming.next_run > time.time() + 1:
+                announced = upcoming.next_run
+                print(f"\n💤 다음 {upcoming.name}: {datetime.fromtimestamp(upcoming.next_run).strftime('%H:%M:%S')} "
+                      f"({self._format_wait(upcoming.next_run - time.time())} 후)")
+
+            if wait > 0 and not self._wait_until(job.next_run):
+                break
+
+            try:
+                job.callback()
+            except Exception as e:
+                print(f"❌ {job.name} 실행 오류: {e}")
+            job.runs += 1
+
+            missed = job.reschedule(time.time())
+            if missed:
+                print(f"⏭️ {job.name} 실행이 길어져 {missed}회 건너뜀")
+
+class ScanTier:
+    """거래량 순위 구간별 스캔 주기와 분당 요청 예산
+
+    순위 (rank_start, rank_end] 마켓을 interval초마다 (0이면 캔들 마감마다) 스캔하고,
+    한 번에 rpm × 주기(분) 요청 안에 들어가는 마켓만 조회한다 (넘치는 마켓은 다음 회차로 순환).
+    구성원은 매 회차 실시간 거래량 순위에서 다시 뽑는다.
+    """
+
+    def __init__(self, name, rank_start, rank_end, interval, rpm, window):
+        self.name = name
+        self.rank_start = rank_start
+        self.rank_end = rank_end
+        self.interval = interval
+        self.rpm = rpm
+        self.window = window  # 예산 기준 주기 (초)
+        self.cursor = 0
+        self.previous = set()
+
+    @classmethod
+    def from_config(cls, tiers, top_count, candle_seconds):
+        """scan_tiers 설정 ([{"name", "top", "interval", "rpm"}], top은 누적 순위 상한, null이면 끝까지) → 구간 목록"""
+        result = []
+        start = 0
+        for index, tier in enumerate(tiers or []):
+            end = min(top_count, tier.get('top') or top_count)
+            if end <= start:
+                continue
+            interval = tier.get('interval') or 0
+            result.append(cls(tier.get('name', f"{index + 1}구간"), start, end, interval,
+                              tier.get('rpm', 60), interval or candle_seconds))
+            start = end
+        return result
+
+    @property
+    def budget(self):
+        """한 회차에 쓸 수 있는 요청 수"""
+        return max(1, int(self.rpm * self.window / 60))
+
+    @property
+    def rate_limit(self):
+        """조회 속도 (초당 요청 수)"""
+        return self.rpm / 60
+
+    def members(self, ranked_tickers):
+        """거래량 순 티커 → 이 구간 티커 (새로 들어온 마켓 수 함께 반환)"""
+        members = ranked_tickers[self.rank_start:self.rank_end]
+        markets = {ticker['market'] for ticker in members}
+        entered = len(markets - self.previous) if self.previous else 0
+        self.previous = markets
+        return members, entered
+
+    def within_budget(self, tickers, cost):
+        """예산 안에서 조회할 티커 (cost(market) = 예상 요청 수, 순위 순, 넘치면 순환 시작점부터)"""
+        if sum(cost(ticker['market']) for ticker in tickers) <= self.budget:
+            self.cursor = 0
+            return tickers
+
+        start = self.cursor % len(tickers)
+        ordered = tickers[start:] + tickers[:start]
+        selected = []
+        spent = 0
+        for ticker in ordered:
+            pages = cost(ticker['market'])
+            if spent + pages > self.budget:
+                break
+            selected.append(ticker)
+            spent += pages
+        self.cursor = start + max(1, len(selected))
+        positions = {ticker['market']: index for index, ticker in enumerate(tickers)}
+        return sorted(selected, key=lambda ticker: positions[ticker['market']])
+
+    def describe(self):
+        cadence = f"{self.interval // 60}분" if self.interval else "캔들 마감"
+        return f"{self.name} (순위 {self.rank_start + 1}~{self.rank_end}, {cadence}마다, 분당 {self.rpm}회)"
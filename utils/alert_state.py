@@ -0,0 +1,107 @@
+# utils/alert_state.py - 마켓 × 규칙별 알림 상태 (쿨다운 + 조건 해제 후 재무장, 중복 알림 억제)
+
+import json
+import os
+import time
+
+# 상태 항목: [마지막 알림 시각, 재무장 여부 (0/1), 누적 억제 횟수]
+LAST_ALERT, ARMED, SUPPRESSED = 0, 1, 2
+
+class AlertStateStore:
+    """같은 마켓이 같은 신호로 스캔마다 알림을 반복 발송하지 않도록 막는 상태 저장소
+
+    - cooldown: 마지막 알림 후 다시 알림을 보낼 수 있을 때까지의 시간 (초)
+    - rearm: True면 알림 후 조건이 한 번 거짓이 되어야 (clear) 다시 알림
+    조회/갱신은 (마켓, 규칙) 딕셔너리 한 번이며, 기본 상태와 같아진 항목은 저장 시 제외한다.
+    """
+
+    def __init__(self, path="data/alert_state.json", cooldown=3600, rearm=True):
+        self.path = path
+        self.cooldown = cooldown
+        self.rearm = rearm
+        self.states = {}  # "마켓|규칙" → [마지막 알림 시각, 재무장 여부, 누적 억제 횟수]
+        self.reset_stats()
+        self._load()
+
+    @staticmethod
+    def _key(market, rule):
+        return f"{market}|{rule}"
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.states = json.load(f)
+        except Exception as e:
+            print(f"⚠️ 알림 상태 로드 실패, 새로 시작: {e}")
+            self.states = {}
+
+    def should_alert(self, market, rule="signal", now=None):
+        """신호가 참일 때 호출: 알림을 보내야 하면 True (발송으로 기록), 아니면 억제 횟수 증가 후 False"""
+        now = time.time() if now is None else now
+        key = self._key(market, rule)
+        state = self.states.get(key)
+
+        if state is not None:
+            cooling = now - state[LAST_ALERT] < self.cooldown
+            waiting = self.rearm and not state[ARMED]
+            if cooling or waiting:
+                state[SUPPRESSED] += 1
+                if cooling:
+                    self.suppressed_cooldown += 1
+                else:
+                    self.suppressed_rearm += 1
+                return False
+
+        self.states[key] = [now, 0, state[SUPPRESSED] if state else 0]
+        self.alerts += 1
+        return True
+
+    def clear(self, market, rule="signal"):
+        """신호가 거짓일 때 호출: 조건 해제로 재무장"""
+        state = self.states.get(self._key(market, rule))
+        if state is not None and not state[ARMED]:
+            state[ARMED] = 1
+            self.rearmed += 1
+
+    def retain_rule(self, rule):
+        """다른 규칙의 항목 삭제 (규칙 묶음이 바뀌면 이전 규칙의 재무장 대기 항목이 영원히 남지 않도록)"""
+        suffix = "|" + rule
+        dropped = [key for key in self.states if not key.endswith(suffix)]
+        for key in dropped:
+            del self.states[key]
+        return len(dropped)
+
+    def reset_stats(self):
+        """스캔별 집계를 위해 횟수 초기화"""
+        self.alerts = self.rearmed = self.suppressed_cooldown = self.suppressed_rearm = 0
+
+    def get_stats(self):
+        """이번 스캔의 알림/억제/재무장 횟수와 상태 항목 수"""
+        return {
+            'alerts': self.alerts,
+            'suppressed': self.suppressed_cooldown + self.suppressed_rearm,
+            'suppressed_cooldown': self.suppressed_cooldown,
+            'suppressed_rearm': self.suppressed_rearm,
+            'rearmed': self.rearmed,
+            'size': len(self.states)
+        }
+
+    def save(self, now=None):
+        """상태 저장 (쿨다운이 끝났고 재무장된 항목은 새 마켓과 같으므로 제외, 임시 파일 후 교체)"""
+        now = time.time() if now is None else now
+        self.states = {
+            key: state for key, state in self.states.items()
+            if now - state[LAST_ALERT] < self.cooldown or (self.rearm and not state[ARMED])
+        }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.states, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"❌ 알림 상태 저장 오류: {e}")
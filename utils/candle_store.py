@@ -0,0 +1,200 @@
+# utils/candle_store.py - 디스크 캔들 저장소 (증분 업데이트, memory-map 로드)
+#
+# OHLCV 파일은 (컬럼, 봉) 모양의 Fortran 순서 .npy 라서 봉 하나가 파일 끝의 연속 바이트이다.
+# 새 봉은 파일 끝에 덧붙이고 헤더의 모양만 제자리에서 고치므로 스캔마다 전체를 다시 쓰지 않는다.
+
+import io
+import os
+import time
+import numpy as np
+
+from config.settings import settings
+from utils.resampler import resample_candles
+
+class CandleStore:
+    """마켓별 캔들을 컬럼 단위 .npy 파일로 보관하는 증분 캐시"""
+
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, base_dir="data/candles", unit=60, use_float32=None, max_bars=None):
+        self.base_dir = base_dir
+        self.unit = unit
+        self.interval = unit * 60  # 초 단위 봉 간격
+        if use_float32 is None:
+            use_float32 = settings.CANDLE_STORE_FLOAT32
+        self.dtype = np.float32 if use_float32 else np.float64
+        self.max_bars = max_bars or settings.CANDLE_STORE_MAX_BARS
+        # 보관 한도를 이만큼 넘기면 앞부분을 잘라 파일을 다시 씀 (그 전까지는 로드 시 최근 max_bars만 사용)
+        self.compact_slack = max(200, self.max_bars // 10)
+        self._resampled = {}  # (market, 상위 단위) → (기본 시계열 지문, 리샘플 결과)
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _paths(self, market):
+        """마켓별 타임스탬프/OHLCV 파일 경로"""
+        prefix = os.path.join(self.base_dir, f"{market}.m{self.unit}")
+        return f"{prefix}.ts.npy", f"{prefix}.ohlcv.npy"
+
+    def markets(self):
+        """저장소에 캔들이 있는 마켓 목록"""
+        suffix = f".m{self.unit}.ts.npy"
+        return sorted(name[:-len(suffix)] for name in os.listdir(self.base_dir) if name.endswith(suffix))
+
+    def load(self, market):
+        """저장된 캔들 중 최근 max_bars개 로드 (memory-map, 없으면 None)"""
+        timestamps, values = self._open(market)
+        if timestamps is None:
+            return None, None
+        return timestamps[-self.max_bars:], values[:, -self.max_bars:]
+
+    def _open(self, market):
+        """저장 파일 전체를 memory-map으로 열기 (형식이 맞지 않으면 None)"""
+        ts_path, values_path = self._paths(market)
+        if not (os.path.exists(ts_path) and os.path.exists(values_path)):
+            return None, None
+
+        try:
+            timestamps = np.load(ts_path, mmap_mode='r')
+            values = np.load(values_path, mmap_mode='r')
+            if values.shape != (len(self.COLUMNS), len(timestamps)):
+                print(f"⚠️ {market} 캔들 저장소 형식 불일치 - 초기화")
+                return None, None
+            return timestamps, values
+        except Exception as e:
+            print(f"⚠️ {market} 캔들 저장소 로드 오류: {e}")
+            return None, None
+
+    def missing_count(self, market, required=200, now=None):
+        """마지막 저장 봉 이후 받아야 할 캔들 수 (진행 중인 마지막 봉 포함)
+
+        공백이 required보다 길어도 보관 한도까지는 전부 받아 (to 이어받기) 기존 이력과 잇는다.
+        """
+        timestamps, _ = self.load(market)
+        if timestamps is None or len(timestamps) < required:
+            return required
+
+        now = time.time() if now is None else now
+        current_bar = int(now // self.interval) * self.interval
+        last_bar = int(timestamps[-1])
+
+        # 마지막 저장 봉은 미완성이었을 수 있으므로 다시 받음
+        missing = (current_bar - last_bar) // self.interval + 1
+        return int(min(max(required, self.max_bars), max(1, missing)))
+
+    def merge(self, market, timestamps, values):
+        """새 캔들을 저장소에 병합 후 최근 max_bars개 반환 (같은 시각은 새 값 우선)
+
+        새 캔들이 저장된 마지막 봉부터 이어지면 그 부분만 파일 끝에 덮어쓰고 덧붙이며,
+        그 앞의 봉이 바뀌거나 형식이 다르거나 보관 한도를 크게 넘길 때만 파일을 다시 쓴다.
+        """
+        values = np.asarray(values, dtype=self.dtype)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+
+        old_ts, old_values = self._open(market)
+        if old_ts is None or not len(old_ts) or not len(timestamps):
+            return self._rewrite(market, timestamps, values)
+
+        # 새 데이터 첫 봉 이전까지만 기존 데이터 유지
+        keep = int(np.searchsorted(old_ts, timestamps[0], side='left'))
+
+        # 받은 뒤에도 공백이 남으면 (보관 한도보다 긴 미실행 등) 연속성이 깨지므로 기존 데이터 폐기
+        if keep == len(old_ts) and timestamps[0] - old_ts[-1] > self.interval:
+            return self._rewrite(market, timestamps, values)
+
+        overlap = len(old_ts) - keep
+        appendable = (
+            keep > 0 and overlap <= len(timestamps)
+            and np.array_equal(old_ts[keep:], timestamps[:overlap])
+            and old_values.dtype == self.dtype and np.isfortran(old_values)
+            and keep + len(timestamps) <= self.max_bars + self.compact_slack
+        )
+        if not appendable:
+            timestamps = np.concatenate((old_ts[:keep], timestamps))
+            values = np.concatenate((old_values[:, :keep], values), axis=1)
+            return self._rewrite(market, timestamps, values)
+
+        del old_ts, old_values  # 파일을 고치기 전에 memory-map 해제
+        if not self._append(market, keep, timestamps, values):
+            return self._rewrite(market, *self._concat_stored(market, keep, timestamps, values))
+        return self.load(market)
+
+    def _concat_stored(self, market, keep, timestamps, values):
+        """저장된 앞 keep개 봉과 새 캔들을 이어 붙인 메모리 배열"""
+        old_ts, old_values = self._open(market)
+        return (np.concatenate((old_ts[:keep], timestamps)),
+                np.concatenate((old_values[:, :keep], values), axis=1))
+
+    def _append(self, market, start, timestamps, values):
+        """파일의 start번째 봉부터 새 캔들로 덮어쓰고 헤더의 봉 수만 제자리에서 갱신 (불가능하면 False)"""
+        length = start + len(timestamps)
+        files = []
+        for path, array, shape in ((self._paths(market)[0], timestamps, (length,)),
+                                   (self._paths(market)[1], values, (len(self.COLUMNS), length))):
+            header = io.BytesIO()
+            np.lib.format.write_array_header_1_0(header, {
+                'descr': np.lib.format.dtype_to_descr(array.dtype),
+                'fortran_order': len(shape) > 1,
+                'shape': shape,
+            })
+            files.append((path, array, header.getvalue()))
+
+        try:
+            # 봉 데이터를 먼저 쓰고 헤더는 마지막에 (중단돼도 헤더가 가리키는 범위는 온전함)
+            offsets = []
+            for path, array, header in files:
+                with open(path, 'rb') as f:
+                    if np.lib.format.read_magic(f) != (1, 0):
+                        return False
+                    np.lib.format.read_array_header_1_0(f)
+                    offset = f.tell()
+                if offset != len(header):
+                    return False
+                offsets.append(offset)
+
+            for (path, array, header), offset in zip(files, offsets):
+                bar_bytes = array.dtype.itemsize * (array.shape[0] if array.ndim > 1 else 1)
+                with open(path, 'r+b') as f:
+                    f.seek(offset + start * bar_bytes)
+                    f.write(np.ascontiguousarray(array.T).tobytes())
+                    f.truncate()
+            for path, _, header in files:
+                with open(path, 'r+b') as f:
+                    f.write(header)
+            return True
+        except Exception as e:
+            print(f"❌ {market} 캔들 덧붙이기 오류: {e}")
+            return False
+
+    def _rewrite(self, market, timestamps, values):
+        """보관 한도로 자른 뒤 파일 전체를 다시 쓰고 반환"""
+        if len(timestamps) > self.max_bars:
+            timestamps = timestamps[-self.max_bars:]
+            values = values[:, -self.max_bars:]
+        self._write(market, timestamps, values)
+        return timestamps, values
+
+    def _write(self, market, timestamps, values):
+        """임시 파일에 쓴 뒤 교체 (중단 시 파일 손상 방지, OHLCV는 덧붙일 수 있게 Fortran 순서)"""
+        ts_path, values_path = self._paths(market)
+        try:
+            for path, array in ((ts_path, np.ascontiguousarray(timestamps)), (values_path, np.asfortranarray(values))):
+                tmp_path = path + ".tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, array)
+                os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"❌ {market} 캔들 저장 오류: {e}")
+
+    def resampled(self, market, target_unit, timestamps, values):
+        """기본 시계열을 상위 타임프레임으로 변환 (기본 시계열이 그대로면 캐시 재사용)"""
+        if int(target_unit) == self.unit or not len(timestamps):
+            return timestamps, values
+
+        fingerprint = (len(timestamps), int(timestamps[-1]), np.asarray(values[:, -1]).tobytes())
+        key = (market, int(target_unit))
+        cached = self._resampled.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        result = resample_candles(timestamps, values, target_unit)
+        self._resampled[key] = (fingerprint, result)
+        return result
@@ -1,34 +1,26 @@
 # utils/data_processor.py - 데이터 전처리 (발열 방지)
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from operator import itemgetter
+
+from utils.fast_decode import CANDLE_FIELDS, KST_OFFSET_SECONDS, orient_candles
 
 class DataProcessor:
     """발열 방지 최적화된 데이터 전처리"""
     
     @staticmethod
     def candles_to_dataframe(candles):
-        """빗썸 캔들 데이터를 pandas DataFrame으로 변환"""
+        """빗썸 캔들 데이터를 pandas DataFrame으로 변환 (컬럼 단위 변환, int64 epoch 타임스탬프)"""
         try:
             if not candles:
                 return None
             
-            # 빗썸 캔들 데이터 구조에 맞게 변환
-            df_data = []
-            for candle in candles:
-                df_data.append({
-                    'timestamp': candle['candle_date_time_kst'],
-                    'open': float(candle['opening_price']),
-                    'high': float(candle['high_price']),
-                    'low': float(candle['low_price']),
-                    'close': float(candle['trade_price']),
-                    'volume': float(candle['candle_acc_trade_volume'])
-                })
-            
-            df = pd.DataFrame(df_data)
-            
-            # 시간순 정렬 (오래된 것부터)
-            df = df.sort_values('timestamp').reset_index(drop=True)
+            timestamps, values = DataProcessor.candles_to_arrays(candles)
+            df = DataProcessor.arrays_to_dataframe(timestamps, values)
+            if df is None:
+                return None
             
             print(f"데이터 변환 완료: {len(df)}개 캔들")
             return df
@@ -37,19 +29,57 @@ class DataProcessor:
             print(f"데이터 변환 오류: {e}")
             return None
     
+    @staticmethod
+    def candles_to_arrays(candles):
+        """빗썸 캔들 데이터를 (epoch 타임스탬프, OHLCV 2차원 배열)로 변환 (오래된 것부터)"""
+        try:
+            if not candles:
+                return None, None
+            
+            count = len(candles)
+            
+            # 타임스탬프 문자열 → int64 epoch 한 번에 변환
+            kst_times = np.array(list(map(itemgetter('candle_date_time_kst'), candles)), dtype='datetime64[s]')
+            timestamps = kst_times.astype(np.int64) - KST_OFFSET_SECONDS
+            
+            # 필드별로 한 컬럼씩 바로 float64 배열 생성 (행 딕셔너리 생성 없음)
+            values = np.empty((len(CANDLE_FIELDS), count), dtype=np.float64)
+            for idx, field in enumerate(CANDLE_FIELDS):
+                values[idx] = np.fromiter(map(itemgetter(field), candles), dtype=np.float64, count=count)
+            
+            # 최신순 응답이면 뒤집기만 (정렬은 순서가 섞인 경우에만)
+            return orient_candles(timestamps, values)
+            
+        except Exception as e:
+            print(f"캔들 배열 변환 오류: {e}")
+            return None, None
+    
+    @staticmethod
+    def arrays_to_dataframe(timestamps, values):
+        """(타임스탬프, OHLCV 배열)을 pandas DataFrame으로 변환"""
+        if timestamps is None or values is None:
+            return None
+        
+        return pd.DataFrame({
+            'timestamp': np.asarray(timestamps, dtype=np.int64),
+            'open': np.asarray(values[0], dtype=np.float64),
+            'high': np.asarray(values[1], dtype=np.float64),
+            'low': np.asarray(values[2], dtype=np.float64),
+            'close': np.asarray(values[3], dtype=np.float64),
+            'volume': np.asarray(values[4], dtype=np.float64)
+        })
+    
     @staticmethod
     def validate_data(df, min_length=200):
-        """데이터 유효성 검사"""
+        """데이터 유효성 검사 (필수 컬럼 존재 + 결측/무한대 없음을 한 번에 확인)"""
         if df is None or len(df) < min_length:
             return False
         
-        # 필수 컬럼 확인
+        # 필수 컬럼을 하나의 float 블록으로 꺼내 유한값 여부 한 번에 검사
         required_cols = ['open', 'high', 'low', 'close', 'volume']
-        if not all(col in df.columns for col in required_cols):
-            return False
-        
-        # 가격 데이터 유효성 확인
-        if df[required_cols].isnull().any().any():
+        try:
+            block = df[required_cols].to_numpy(dtype=np.float64)
+        except (KeyError, ValueError, TypeError):
             return False
         
-        return True
\ No newline at end of file
+        return bool(np.isfinite(block).all())
\ No newline at end of file
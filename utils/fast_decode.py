@@ -0,0 +1,166 @@
+# utils/fast_decode.py - 빗썸 JSON 응답을 행 딕셔너리 없이 NumPy 배열로 바로 변환
+
+import re
+import json
+import numpy as np
+
+# 선택적 고속 JSON 백엔드 (설치되어 있을 때만 사용)
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    json_loads = json.loads
+    JSON_BACKEND = "json"
+
+# 빗썸 candle_date_time_kst → UTC epoch 변환용 오프셋
+KST_OFFSET_SECONDS = 9 * 3600
+
+_NUMBER = rb'\s*:\s*"?(-?[0-9][0-9.eE+-]*)"?'
+
+# 캔들 필드 (OHLCV 순서)
+CANDLE_FIELDS = ('opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume')
+# 빗썸 v1 캔들 응답의 필드 순서 그대로 한 번에 추출 (가장 빠른 경로)
+_CANDLE_ROW_RE = re.compile(
+    rb'"candle_date_time_kst":"([^"]+)","opening_price":([^,]+),"high_price":([^,]+),'
+    rb'"low_price":([^,]+),"trade_price":([^,]+),"timestamp":[^,]+,'
+    rb'"candle_acc_trade_price":[^,]+,"candle_acc_trade_volume":([^,}]+)'
+)
+_CANDLE_TIME_RE = re.compile(rb'"candle_date_time_kst"\s*:\s*"([^"]+)"')
+_CANDLE_FIELD_RES = [re.compile(b'"' + field.encode() + b'"' + _NUMBER) for field in CANDLE_FIELDS]
+
+# ALL_KRW 티커 필드 (빗썸 응답 순서, 응답에 없는 필드는 0)
+TICKER_FIELDS = (
+    'opening_price', 'closing_price', 'prev_closing_price',
+    'units_traded_24H', 'acc_trade_value_24H', 'fluctate_rate_24H'
+)
+_TICKER_STATUS_RE = re.compile(rb'"status"\s*:\s*"([^"]*)"')
+_SKIP_FIELDS = rb'(?:"[^"]*":"[^"]*",)*?'
+_TICKER_ROW_RE = re.compile(
+    rb'"([^"]+)":\{"opening_price":"([^"]*)","closing_price":"([^"]*)",' + _SKIP_FIELDS +
+    rb'"prev_closing_price":"([^"]*)",' + _SKIP_FIELDS +
+    rb'"units_traded_24H":"([^"]*)",' + _SKIP_FIELDS +
+    rb'"acc_trade_value_24H":"([^"]*)",' + _SKIP_FIELDS +
+    rb'"fluctate_rate_24H":"([^"]*)"'
+)
+
+class TickerTable:
+    """ALL_KRW 스냅샷 컬럼 테이블 (심볼 배열 + 필드별 float64 배열)"""
+
+    __slots__ = ('symbols', 'columns')
+
+    def __init__(self, symbols, columns):
+        self.symbols = symbols
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def column(self, name):
+        """필드 배열 조회"""
+        return self.columns[name]
+
+    @property
+    def markets(self):
+        """KRW-심볼 마켓 코드 배열"""
+        return np.char.add('KRW-', self.symbols)
+
+def orient_candles(timestamps, values):
+    """오래된 것부터 정렬 (역순이면 뒤집기만, 섞여 있으면 정렬)"""
+    if len(timestamps) > 1 and timestamps[0] > timestamps[-1]:
+        timestamps = timestamps[::-1]
+        values = values[:, ::-1]
+    if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        values = values[:, order]
+    return np.ascontiguousarray(timestamps), np.ascontiguousarray(values)
+
+def _parse_numbers(captures):
+    """숫자 바이트 조각들을 한 번의 JSON 배열 파싱으로 float64 배열 변환"""
+    return np.array(json_loads(b'[' + b','.join(captures) + b']'), dtype=np.float64)
+
+def _kst_to_epoch(times):
+    """KST 시각 바이트 배열 → UTC epoch 초 (한 번에 변환)"""
+    return np.array(times).astype('datetime64[s]').astype(np.int64) - KST_OFFSET_SECONDS
+
+def decode_candles(body):
+    """캔들 응답 바이트 → (epoch 타임스탬프 int64, OHLCV (5, n) float64), 실패 시 (None, None)"""
+    try:
+        # 1) 표준 필드 순서: 행 단위 정규식 1회
+        rows = _CANDLE_ROW_RE.findall(body)
+        if rows and len(rows) == body.count(b'"candle_date_time_kst"'):
+            timestamps = _kst_to_epoch([row[0] for row in rows])
+            values = _parse_numbers([b','.join(row[1:]) for row in rows]).reshape(-1, 5).T
+            return orient_candles(timestamps, values)
+
+        # 2) 필드 순서가 다르면 필드별 정규식 (개수가 모두 같을 때만)
+        times = _CANDLE_TIME_RE.findall(body)
+        fields = [pattern.findall(body) for pattern in _CANDLE_FIELD_RES]
+        if times and all(len(column) == len(times) for column in fields):
+            timestamps = _kst_to_epoch(times)
+            values = np.stack([_parse_numbers(column) for column in fields])
+            return orient_candles(timestamps, values)
+
+        # 3) 그 외 형식은 JSON 파싱
+        return _decode_candles_json(body)
+
+    except Exception as e:
+        print(f"캔들 고속 변환 오류: {e}")
+        return None, None
+
+def _decode_candles_json(body):
+    """예외적인 응답 형식용 JSON 파싱 경로"""
+    candles = json_loads(body)
+    if not isinstance(candles, list) or not candles:
+        return None, None
+
+    timestamps = np.array([candle['candle_date_time_kst'] for candle in candles], dtype='datetime64[s]')
+    timestamps = timestamps.astype(np.int64) - KST_OFFSET_SECONDS
+    values = np.array([[candle[field] for candle in candles] for field in CANDLE_FIELDS], dtype=np.float64)
+    return orient_candles(timestamps, values)
+
+def decode_ticker_table(body):
+    """ALL_KRW 응답 바이트 → TickerTable, 실패 시 None"""
+    try:
+        status = _TICKER_STATUS_RE.search(body)
+        if status is None or status.group(1) != b"0000":
+            print(f"❌ API 응답 오류: {status.group(1).decode() if status else '알 수 없음'}")
+            return None
+
+        # 표준 필드 순서: 코인 단위 정규식 1회 + 숫자 일괄 파싱
+        rows = _TICKER_ROW_RE.findall(body)
+        if rows and len(rows) == body.count(b'":{"opening_price"'):
+            try:
+                numbers = _parse_numbers([b','.join(row[1:]) for row in rows]).reshape(-1, len(TICKER_FIELDS)).T
+                columns = {field: numbers[idx] for idx, field in enumerate(TICKER_FIELDS)}
+                return TickerTable(np.array([row[0] for row in rows]).astype(str), columns)
+            except ValueError:
+                pass  # 빈 값 등 숫자가 아닌 필드 → JSON 경로
+
+        return _decode_ticker_json(body)
+
+    except Exception as e:
+        print(f"티커 고속 변환 오류: {e}")
+        return None
+
+def _decode_ticker_json(body):
+    """필드 순서/형식이 다를 때의 JSON 파싱 경로 (변환 불가 코인은 제외)"""
+    data = json_loads(body).get("data") or {}
+    symbols = []
+    rows = []
+    for symbol, info in data.items():
+        if symbol == "date" or not isinstance(info, dict):
+            continue
+        try:
+            rows.append([float(info.get(field) or 0) for field in TICKER_FIELDS])
+            symbols.append(symbol)
+        except (TypeError, ValueError):
+            print(f"⚠️ {symbol} 데이터 변환 오류")
+
+    if not symbols:
+        return None
+
+    table = np.array(rows, dtype=np.float64).T
+    columns = {field: table[idx] for idx, field in enumerate(TICKER_FIELDS)}
+    return TickerTable(np.array(symbols), columns)
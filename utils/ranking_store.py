@@ -0,0 +1,165 @@
+# utils/ranking_store.py - 거래량 순위 이력 (append-only 바이너리) + 메모리 순위 인덱스
+
+import bisect
+import json
+import os
+import struct
+import time
+import numpy as np
+
+# 레코드 헤더: 스캔 시각(int64) + 항목 수(uint32), 항목: 마켓 ID(uint16) + 순위(uint16)
+RECORD_HEADER = struct.Struct('<qI')
+ENTRY_DTYPE = np.dtype([('id', '<u2'), ('rank', '<u2')])
+
+class RankingHistory:
+    """스캔 시각별 거래량 순위 스냅샷을 추가 기록하는 시계열 저장소"""
+
+    def __init__(self, history_file="data/ranking_history.bin",
+                 markets_file="data/ranking_markets.json", retention_seconds=7 * 86400):
+        self.history_file = history_file
+        self.markets_file = markets_file
+        self.retention_seconds = retention_seconds
+        self.markets = []        # 마켓 ID → 마켓 코드
+        self.market_ids = {}     # 마켓 코드 → 마켓 ID
+        self.timestamps = []     # 스냅샷 시각 (오름차순)
+        self.snapshots = []      # 마켓 ID 인덱스 순위 배열 (0 = 순위 없음)
+        self._load()
+
+    def _load(self):
+        """마켓 ID 표와 이력 파일 로드"""
+        try:
+            if os.path.exists(self.markets_file):
+                with open(self.markets_file, 'r') as f:
+                    self.markets = json.load(f)
+                self.market_ids = {market: idx for idx, market in enumerate(self.markets)}
+
+            if not os.path.exists(self.history_file):
+                return
+
+            with open(self.history_file, 'rb') as f:
+                raw = f.read()
+
+            offset = 0
+            while offset + RECORD_HEADER.size <= len(raw):
+                scan_time, count = RECORD_HEADER.unpack_from(raw, offset)
+                offset += RECORD_HEADER.size
+                end = offset + count * ENTRY_DTYPE.itemsize
+                if end > len(raw):
+                    print("⚠️ 순위 이력 마지막 레코드 손상 - 무시")
+                    break
+                entries = np.frombuffer(raw, dtype=ENTRY_DTYPE, count=count, offset=offset)
+                offset = end
+                self._add_snapshot(scan_time, entries)
+
+        except Exception as e:
+            print(f"❌ 순위 이력 로드 오류: {e}")
+
+    def _add_snapshot(self, scan_time, entries):
+        """메모리에 스냅샷 추가 (시각 순서 유지)"""
+        ranks = np.zeros(len(self.markets), dtype=np.uint16)
+        valid = entries['id'] < len(ranks)
+        ranks[entries['id'][valid]] = entries['rank'][valid]
+
+        idx = bisect.bisect_right(self.timestamps, scan_time)
+        self.timestamps.insert(idx, scan_time)
+        self.snapshots.insert(idx, ranks)
+
+    def _market_id(self, market):
+        """마켓 ID 조회 (신규 마켓은 새 ID 부여)"""
+        market_id = self.market_ids.get(market)
+        if market_id is None:
+            market_id = len(self.markets)
+            self.markets.append(market)
+            self.market_ids[market] = market_id
+        return market_id
+
+    def append(self, ranking, scan_time=None):
+        """현재 순위 스냅샷을 이력 파일 끝에 추가"""
+        scan_time = int(time.time() if scan_time is None else scan_time)
+        known_count = len(self.markets)
+
+        entries = np.array(
+            [(self._market_id(market), rank) for market, rank in ranking.items()],
+            dtype=ENTRY_DTYPE
+        )
+
+        # 신규 마켓이 생겼으면 ID 표 갱신
+        if len(self.markets) != known_count:
+            with open(self.markets_file, 'w') as f:
+                json.dump(self.markets, f)
+
+        with open(self.history_file, 'ab') as f:
+            f.write(RECORD_HEADER.pack(scan_time, len(entries)))
+            f.write(entries.tobytes())
+
+        self._add_snapshot(scan_time, entries)
+        self._compact_if_needed(scan_time)
+
+    def _compact_if_needed(self, now):
+        """보관 기간이 지난 스냅샷이 많이 쌓이면 파일 재작성"""
+        cutoff = now - self.retention_seconds
+        if not self.timestamps or self.timestamps[0] >= cutoff - self.retention_seconds // 4:
+            return
+
+        keep_from = bisect.bisect_left(self.timestamps, cutoff)
+        self.timestamps = self.timestamps[keep_from:]
+        self.snapshots = self.snapshots[keep_from:]
+
+        tmp_file = self.history_file + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            for scan_time, ranks in zip(self.timestamps, self.snapshots):
+                ids = np.flatnonzero(ranks)
+                entries = np.empty(len(ids), dtype=ENTRY_DTYPE)
+                entries['id'] = ids
+                entries['rank'] = ranks[ids]
+                f.write(RECORD_HEADER.pack(scan_time, len(entries)))
+                f.write(entries.tobytes())
+        os.replace(tmp_file, self.history_file)
+        print(f"🗜️ 순위 이력 정리 완료: {len(self.timestamps)}개 스냅샷 유지")
+
+    def snapshot_before(self, scan_time):
+        """scan_time 이전(포함) 가장 최근 스냅샷 인덱스 (없으면 None)"""
+        idx = bisect.bisect_right(self.timestamps, scan_time) - 1
+        return idx if idx >= 0 else None
+
+class RankingIndex:
+    """스캔 1회당 한 번 만드는 메모리 순위 인덱스 (순위/변동 O(1) 조회)"""
+
+    def __init__(self, history, current_ranking, now=None, windows=(3600, 21600, 86400)):
+        self.now = int(time.time() if now is None else now)
+        self.history = history
+        self.current = dict(current_ranking)
+        self.references = {}
+        self.previous_count = bisect.bisect_left(history.timestamps, self.now)
+
+        # 자주 쓰는 기간은 미리 결정, 그 밖의 기간은 처음 조회할 때 결정 후 캐시
+        for window in windows:
+            self.reference(window)
+
+    def reference(self, window):
+        """window초 전 기준 스냅샷 (현재 스냅샷 제외, 이력이 기간보다 짧으면 None)"""
+        if window not in self.references:
+            if window > 0:
+                idx = self.history.snapshot_before(self.now - window)
+            else:
+                # window=0이면 직전 스캔
+                idx = self.previous_count - 1 if self.previous_count else None
+            self.references[window] = self.history.snapshots[idx] if idx is not None else None
+        return self.references[window]
+
+    def rank(self, market):
+        """현재 거래량 순위"""
+        return self.current.get(market)
+
+    def rank_change(self, market, window):
+        """기간 내 순위 변동 (양수 = 상승한 계단 수, 기준 없으면 None)"""
+        current_rank = self.current.get(market)
+        reference = self.reference(window)
+        market_id = self.history.market_ids.get(market)
+        if current_rank is None or reference is None or market_id is None or market_id >= len(reference):
+            return None
+
+        previous_rank = int(reference[market_id])
+        if previous_rank == 0:
+            return None
+        return previous_rank - current_rank
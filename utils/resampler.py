@@ -0,0 +1,49 @@
+# utils/resampler.py - 기본 해상도 캔들을 상위 타임프레임으로 로컬 리샘플링 (추가 API 호출 없음)
+
+from functools import reduce
+from math import gcd
+import numpy as np
+
+from utils.fast_decode import KST_OFFSET_SECONDS
+
+# 빗썸 분봉 API가 지원하는 단위 (분)
+SUPPORTED_MINUTE_UNITS = (1, 3, 5, 10, 15, 30, 60, 240)
+
+# 빗썸 캔들 경계: 분봉 (1~240분) 은 UTC 0시 기준, 일봉은 KST 자정 (= UTC 15시, candle_date_time_kst 00:00)
+DAY_SECONDS = 86400
+
+def boundary_offset(interval):
+    """interval초 봉의 경계 오프셋 (봉 시작 = (t + offset) // interval * interval - offset)"""
+    return KST_OFFSET_SECONDS if interval >= DAY_SECONDS else 0
+
+def candle_start(timestamps, interval):
+    """epoch 타임스탬프 → 빗썸 기준 interval초 봉 시작 시각"""
+    offset = boundary_offset(interval)
+    return (timestamps + offset) // interval * interval - offset
+
+def base_unit_for(timeframes):
+    """요청 타임프레임을 모두 만들 수 있는 가장 큰 지원 분봉 단위"""
+    common = reduce(gcd, [int(tf) for tf in timeframes])
+    return max(unit for unit in SUPPORTED_MINUTE_UNITS if common % unit == 0)
+
+def resample_candles(timestamps, values, target_unit):
+    """(epoch 타임스탬프, OHLCV (5, n)) → target_unit분 봉 (빗썸 봉 경계 기준, 마지막 봉은 진행 중일 수 있음)"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if not len(timestamps):
+        return timestamps, np.empty((5, 0))
+
+    interval = int(target_unit) * 60
+    buckets = candle_start(timestamps, interval)
+
+    # 새 봉이 시작되는 위치들
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(timestamps)] - 1
+
+    resampled = np.empty((5, len(starts)), dtype=np.float64)
+    resampled[0] = values[0][starts]                            # 시가: 첫 봉
+    resampled[1] = np.maximum.reduceat(values[1], starts)       # 고가
+    resampled[2] = np.minimum.reduceat(values[2], starts)       # 저가
+    resampled[3] = values[3][ends]                              # 종가: 마지막 봉
+    resampled[4] = np.add.reduceat(values[4], starts)           # 거래량 합계
+
+    return buckets[starts], resampled
@@ -0,0 +1,168 @@
+# ws_replay_server.py - 녹화된 빗썸 WebSocket 메시지를 재생하는 로컬 대체 서버 (오프라인 테스트용)
+#
+# 녹화: python3 main.py --stream --duration 600 --record data/ws_record.jsonl
+# 재생: python3 ws_replay_server.py data/ws_record.jsonl --port 8765 --speed 10
+#       BITHUMB_WS_URL=ws://127.0.0.1:8765 python3 main.py --stream --offline
+# 체결 시각 (contDtm) 은 기본적으로 접속 시각의 같은 시 (정시 정렬 유지) 로 옮겨 보낸다 (--keep-time이면 원래 시각)
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import websockets
+
+from analysis.live_candle import LiveCandleBuilder
+
+HOUR = 3600
+
+class ReplayServer:
+    """클라이언트가 구독을 보내면 녹화 파일의 메시지를 원래 간격대로 재생"""
+    
+    def __init__(self, record_path, speed=1.0, loop=False, keep_time=False):
+        self.messages = self.load_messages(record_path)
+        self.speed = speed
+        self.loop = loop
+        self.keep_time = keep_time
+        self.first_trade_time = self.first_trade_time_of(self.messages)
+    
+    @staticmethod
+    def load_messages(record_path):
+        """JSONL 녹화 파일 로드 ({"t": 경과초, "msg": 원본 문자열})"""
+        messages = []
+        with open(record_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                messages.append((float(entry.get('t', 0)), entry['msg']))
+        messages.sort(key=lambda item: item[0])
+        print(f"📼 녹화 메시지 {len(messages)}개 로드")
+        return messages
+    
+    @staticmethod
+    def first_trade_time_of(messages):
+        """녹화의 첫 체결 시각 (epoch초), 체결이 없으면 None"""
+        for _, raw in messages:
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+            if message.get('type') == 'transaction':
+                for trade in (message.get('content') or {}).get('list', []):
+                    if trade.get('contDtm'):
+                        return LiveCandleBuilder.parse_trade_time(trade['contDtm'])
+        return None
+    
+    def time_shift(self, now=None):
+        """첫 체결이 지금 시각의 시 안에 오도록 옮길 시간 (정시 단위, 초)
+
+        녹화 당시 시각 그대로 보내면 저장소/REST로 준비한 봉보다 이전 체결이라 실시간 봉 생성기가 버린다.
+        """
+        if self.keep_time or self.first_trade_time is None:
+            return 0
+        now = time.time() if now is None else now
+        return int((now - self.first_trade_time) // HOUR) * HOUR
+    
+    @staticmethod
+    def shift_message(raw, shift):
+        """체결 메시지의 contDtm을 shift초 뒤로 (소수점 이하 자릿수는 그대로)"""
+        if not shift:
+            return raw
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return raw
+        if message.get('type') != 'transaction':
+            return raw
+        for trade in (message.get('content') or {}).get('list', []):
+            stamp = trade.get('contDtm')
+            if stamp:
+                moved = datetime.strptime(stamp[:19], "%Y-%m-%d %H:%M:%S") + timedelta(seconds=shift)
+                trade['contDtm'] = moved.strftime("%Y-%m-%d %H:%M:%S") + stamp[19:]
+        return json.dumps(message, ensure_ascii=False)
+    
+    @staticmethod
+    def subscribed_symbols(subscriptions):
+        """구독 요청들에서 (타입, 심볼) 집합 추출"""
+        symbols = set()
+        for subscription in subscriptions:
+            for symbol in subscription.get('symbols', []):
+                symbols.add((subscription.get('type'), symbol))
+        return symbols
+    
+    @staticmethod
+    def message_matches(raw, symbols):
+        """구독한 타입/심볼의 메시지인지 확인 (상태 메시지는 항상 전달)"""
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return False
+        message_type = message.get('type')
+        if message_type is None:
+            return True
+        content = message.get('content') or {}
+        if message_type == 'transaction':
+            return any((message_type, trade.get('symbol')) in symbols for trade in content.get('list', []))
+        return (message_type, content.get('symbol')) in symbols
+    
+    async def handler(self, websocket, path=None):
+        """연결 1개 처리: 접속 응답 → 구독 수신 → 녹화 재생"""
+        await websocket.send(json.dumps({"status": "0000", "resmsg": "Connected Successfully"}))
+        
+        # 첫 구독 후 잠시 더 들어오는 구독까지 모음
+        subscriptions = [json.loads(await websocket.recv())]
+        while True:
+            try:
+                subscriptions.append(json.loads(await asyncio.wait_for(websocket.recv(), timeout=0.2)))
+            except asyncio.TimeoutError:
+                break
+        for _ in subscriptions:
+            await websocket.send(json.dumps({"status": "0000", "resmsg": "Filter Registered Successfully"}))
+        
+        symbols = self.subscribed_symbols(subscriptions)
+        print(f"🔌 클라이언트 구독: {len(symbols)}개 (타입, 심볼)")
+        
+        while True:
+            shift = self.time_shift()
+            if shift:
+                print(f"🕒 체결 시각을 {shift // HOUR}시간 뒤로 옮겨 재생")
+            previous_t = None
+            for t, raw in self.messages:
+                if previous_t is not None and t > previous_t:
+                    await asyncio.sleep((t - previous_t) / self.speed)
+                previous_t = t
+                if self.message_matches(raw, symbols):
+                    await websocket.send(self.shift_message(raw, shift))
+            if not self.loop:
+                break
+        
+        print("📼 재생 완료 - 연결 유지 (클라이언트 종료 대기)")
+        await websocket.wait_closed()
+
+async def serve(record_path, host, port, speed, loop, keep_time=False):
+    """재생 서버 실행"""
+    server = ReplayServer(record_path, speed, loop, keep_time)
+    async with websockets.serve(server.handler, host, port):
+        print(f"🛰️ 재생 서버 시작: ws://{host}:{port} (속도 x{speed})")
+        await asyncio.Future()
+
+def main():
+    parser = argparse.ArgumentParser(description="빗썸 WebSocket 녹화 재생 서버")
+    parser.add_argument("record_path", help="녹화 파일 (JSONL)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속")
+    parser.add_argument("--loop", action="store_true", help="끝나면 처음부터 반복")
+    parser.add_argument("--keep-time", action="store_true", help="체결 시각을 옮기지 않고 녹화 그대로 재생")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(serve(args.record_path, args.host, args.port, args.speed, args.loop, args.keep_time))
+    except KeyboardInterrupt:
+        print("\n🛑 재생 서버 종료")
+
+if __name__ == "__main__":
+    main()